@@ -1,18 +1,25 @@
 import os
 import json
+import time
+import asyncio
 import logging
 from datetime import date
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Literal
-from sqlalchemy.orm import Session
-import google.generativeai as genai
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.task import Task
-from app.models.user import User
 from app.core.security import get_current_user
+from app.core.principal_cache import Principal
+from app.core.llm_cache import draft_cache, cache_key
+from app.core.llm import GEMINI_MODEL, get_llm_client, chunk_text
+from app.core.metrics_store import metrics_store
+from app.core.plan_cache import plan_cache
 
 logger = logging.getLogger("sprintsync")
 
@@ -27,7 +34,7 @@ class AISuggestRequest(BaseModel):
 class AISuggestResponse(BaseModel):
     mode: str
     suggestion: str
-    source: str  # "live" or "stub"
+    source: str  # "live", "cache" or "stub"
 
 
 # --------------- deterministic stubs ---------------
@@ -44,7 +51,7 @@ def _stub_draft_description(title: str) -> str:
     )
 
 
-def _stub_daily_plan(user: User, tasks: list[Task]) -> str:
+def _stub_daily_plan(user: Principal, tasks: list[Task]) -> str:
     todo = [t for t in tasks if t.status == "TODO"]
     in_progress = [t for t in tasks if t.status == "IN_PROGRESS"]
 
@@ -68,46 +75,35 @@ def _stub_daily_plan(user: User, tasks: list[Task]) -> str:
 
 # --------------- live LLM call ---------------
 
-def _get_gemini_model():
-    api_key = os.getenv("GOOGLE_API_KEY", "")
-    if not api_key:
-        raise ValueError("GOOGLE_API_KEY not set")
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-1.5-flash')
-
-
-async def _llm_draft_description(title: str) -> str:
-    """Call Gemini API to draft a task description."""
-    model = _get_gemini_model()
-    
-    prompt = (
+def _draft_description_prompt(title: str) -> str:
+    return (
         "You are a concise project-management assistant. "
         f"Draft a clear task description for: {title}. "
         "Include objective, acceptance criteria, and estimated effort."
     )
-    
-    response = await model.generate_content_async(prompt)
-    return response.text
 
 
-async def _llm_daily_plan(user: User, tasks: list[Task]) -> str:
-    """Call Gemini API to generate a daily plan."""
-    model = _get_gemini_model()
+async def _llm_draft_description(title: str) -> str:
+    """Call Gemini API to draft a task description."""
+    return await get_llm_client().generate(_draft_description_prompt(title))
+
 
+def _daily_plan_prompt(tasks: list[Task]) -> str:
     task_summary = "\n".join(
         f"- {t.title} [status={t.status}, minutes={t.total_minutes}]"
         for t in tasks
     )
-
-    prompt = (
+    return (
         "You are a concise project-management assistant. "
         "Given the following list of tasks, create a focused daily plan "
         "prioritising in-progress work, then TODO items.\n\n"
         f"Tasks:\n{task_summary}"
     )
 
-    response = await model.generate_content_async(prompt)
-    return response.text
+
+async def _llm_daily_plan(user: Principal, tasks: list[Task]) -> str:
+    """Call Gemini API to generate a daily plan."""
+    return await get_llm_client().generate(_daily_plan_prompt(tasks))
 
 
 # --------------- endpoint ---------------
@@ -124,8 +120,8 @@ def _use_stub() -> bool:
 @router.post("/suggest", response_model=AISuggestResponse)
 async def ai_suggest(
     body: AISuggestRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     use_stub = _use_stub()
 
@@ -138,15 +134,25 @@ async def ai_suggest(
             source = "stub"
         else:
             try:
-                suggestion = await _llm_draft_description(body.title)
-                source = "live"
+                # Identical (normalised) prompts share one cached / in-flight completion
+                key = cache_key(GEMINI_MODEL, _draft_description_prompt(body.title))
+                suggestion, cached = await draft_cache.get_or_compute(
+                    key, lambda: _llm_draft_description(body.title)
+                )
+                source = "cache" if cached else "live"
             except Exception as exc:
                 logger.warning("LLM call failed, falling back to stub: %s", exc)
                 suggestion = _stub_draft_description(body.title)
                 source = "stub"
 
     elif body.mode == "daily_plan":
-        tasks = db.query(Task).filter(Task.user_id == current_user.id).all()
+        # One aggregate query; tasks are only loaded when the plan must be rebuilt
+        version = await plan_cache.version(db, current_user.id)
+        cached_plan = plan_cache.get(current_user.id, version)
+        if cached_plan is not None:
+            return AISuggestResponse(mode=body.mode, suggestion=cached_plan, source="cache")
+
+        tasks = (await db.execute(select(Task).where(Task.user_id == current_user.id))).scalars().all()
 
         if use_stub:
             suggestion = _stub_daily_plan(current_user, tasks)
@@ -160,7 +166,100 @@ async def ai_suggest(
                 suggestion = _stub_daily_plan(current_user, tasks)
                 source = "stub"
 
+        # A stub served because the LLM failed is not worth keeping
+        if source == "live" or use_stub:
+            plan_cache.put(current_user.id, version, suggestion)
+
     else:
         raise HTTPException(status_code=400, detail="Invalid mode")
 
     return AISuggestResponse(mode=body.mode, suggestion=suggestion, source=source)
+
+
+# --------------- streaming endpoint ---------------
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_text(text: str):
+    """Replay a finished text (stub or cache hit) in chunks, like a live stream."""
+    for chunk in chunk_text(text):
+        yield chunk
+        await asyncio.sleep(0)
+
+
+@router.post("/suggest/stream")
+async def ai_suggest_stream(
+    body: AISuggestRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Server-sent-events variant of /suggest: a `chunk` event per piece of
+    text as it is generated, then a `done` event carrying the source.
+    """
+    started = time.perf_counter()
+    use_stub = _use_stub()
+    prompt = stub = cached = None
+
+    # Everything the stream needs is loaded up front; the session is not used once it starts
+    if body.mode == "draft_description":
+        if not body.title:
+            raise HTTPException(status_code=400, detail="title is required for draft_description mode")
+        prompt = _draft_description_prompt(body.title)
+        stub = _stub_draft_description(body.title)
+        key = cache_key(GEMINI_MODEL, prompt)
+        if not use_stub:
+            cached = await draft_cache.aget(key)
+        remember = None if use_stub else (lambda text: draft_cache.aput(key, text))
+    else:
+        version = await plan_cache.version(db, current_user.id)
+        cached = plan_cache.get(current_user.id, version)
+        if cached is None:
+            tasks = (await db.execute(select(Task).where(Task.user_id == current_user.id))).scalars().all()
+            prompt = _daily_plan_prompt(tasks)
+            stub = _stub_daily_plan(current_user, tasks)
+        async def remember(text):
+            plan_cache.put(current_user.id, version, text)
+
+    async def events():
+        sent = []
+
+        async def relay(chunks, source):
+            async for chunk in chunks:
+                if not sent:
+                    metrics_store.observe("ai_stream_ttfb_seconds", (body.mode, source), time.perf_counter() - started)
+                sent.append(chunk)
+                yield _sse("chunk", {"text": chunk})
+
+        if cached is not None:
+            source, chunks = "cache", _stream_text(cached)
+        elif use_stub:
+            source, chunks = "stub", _stream_text(stub)
+        else:
+            source, chunks = "live", get_llm_client().stream(prompt)
+
+        try:
+            async for event in relay(chunks, source):
+                yield event
+        except Exception as exc:
+            if sent:
+                # Part of the answer is already on the wire; don't splice a stub onto it
+                logger.warning("LLM stream interrupted: %s", exc)
+                yield _sse("error", {"detail": "stream interrupted"})
+                return
+            logger.warning("LLM stream failed, falling back to stub: %s", exc)
+            source = "stub"
+            async for event in relay(_stream_text(stub), source):
+                yield event
+
+        if remember is not None and (source == "live" or (use_stub and source == "stub")):
+            await remember("".join(sent))
+        yield _sse("done", {"mode": body.mode, "source": source})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
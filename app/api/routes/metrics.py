@@ -1,19 +1,59 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import PlainTextResponse
 from collections import defaultdict
+from typing import Optional
 
-from app.db.session import get_db
-from app.models.task import Task
-from app.models.user import User
-from app.core.middleware import get_metrics_store
+from app.db.session import SessionLocal
+from app.core.metrics_store import get_metrics_store
+from app.core.prometheus import CONTENT_TYPE, render_prometheus, wants_prometheus
+from app.core.log_pipeline import log_writer
+from app.core.principal_cache import principal_cache
+from app.db.pool_stats import get_pool_stats
+from app.core.passwords import password_pool
+from app.core.llm_cache import draft_cache
+from app.core.llm import llm_stats
+from app.core.embedding_batcher import embedding_batcher
+from app.core.gauges import app_gauges
+from app.core.report_cache import report_cache
 
 router = APIRouter(tags=["Metrics"])
 
 
+def _component_stats() -> dict:
+    """Per-worker stats of caches, pools and clients (not aggregated across workers)."""
+    return {
+        **log_writer.stats(),
+        **principal_cache.stats(),
+        "db_pool": get_pool_stats(),
+        "password_pool": password_pool.stats(),
+        "llm_cache": draft_cache.stats(),
+        "llm_client": llm_stats(),
+        "embedding_batcher": embedding_batcher.stats(),
+        "report_cache": report_cache.stats(),
+    }
+
+
 @router.get("/metrics")
-def metrics(db: Session = Depends(get_db)):
+def metrics(
+    format: Optional[str] = Query(None, pattern="^(json|prometheus|text)$"),
+    accept: Optional[str] = Header(None),
+):
     store = get_metrics_store()
 
+    # ── App-level gauges, maintained in memory by the write paths ──
+    # Scrapes only touch the DB (and a pooled connection) until the first
+    # background refresh has run
+    if app_gauges.reconciled_at is None:
+        app_gauges.reconcile_with(SessionLocal)
+    gauges = app_gauges.snapshot()
+
+    if wants_prometheus(accept, format):
+        tasks_by_status = gauges.pop("tasks_by_status")
+        return PlainTextResponse(
+            render_prometheus(store, tasks_by_status, {**gauges, **_component_stats()}),
+            media_type=CONTENT_TYPE,
+        )
+
     # ── HTTP request counters ──
     requests_total = []
     for (method, path, status), count in store["http_requests_total"].items():
@@ -24,40 +64,60 @@ def metrics(db: Session = Depends(get_db)):
             "count": count,
         })
 
-    # ── Duration histogram (simplified buckets) ──
-    durations = store["http_request_duration_seconds"]
-    buckets = {"le_0.01": 0, "le_0.05": 0, "le_0.1": 0, "le_0.5": 0, "le_1": 0, "le_inf": 0}
-    for _, _, d in durations:
-        if d <= 0.01:
-            buckets["le_0.01"] += 1
-        if d <= 0.05:
-            buckets["le_0.05"] += 1
-        if d <= 0.1:
-            buckets["le_0.1"] += 1
-        if d <= 0.5:
-            buckets["le_0.5"] += 1
-        if d <= 1.0:
-            buckets["le_1"] += 1
-        buckets["le_inf"] += 1
-
-    # ── App-level metrics from DB ──
-    active_users = db.query(User).count()
-
-    tasks_by_status = {}
-    for status, count in db.query(Task.status, db.query(Task).with_entities(Task.status).correlate(None).count()).group_by(Task.status).all():
-        tasks_by_status[status] = count
-
-    # safer query
-    from sqlalchemy import func
-    tasks_by_status = {}
-    for row in db.query(Task.status, func.count(Task.id)).group_by(Task.status).all():
-        tasks_by_status[row[0]] = row[1]
+    # ── Duration histograms (one per method/route/status series) ──
+    durations = []
+    buckets = defaultdict(int)
+    duration_count = 0
+    duration_sum = 0.0
+    for (method, path, status), hist in store["http_request_duration_seconds"].items():
+        series_buckets = hist.cumulative_buckets()
+        durations.append({
+            "method": method,
+            "path": path,
+            "status": status,
+            "buckets": series_buckets,
+            "count": hist.count,
+            "sum": round(hist.sum, 4),
+            **hist.quantiles(),
+        })
+        for label, n in series_buckets.items():
+            buckets[label] += n
+        duration_count += hist.count
+        duration_sum += hist.sum
+
+    # ── SQL per route: statements issued and DB time per request ──
+    db_by_route = []
+    for (method, path), hist in store["db_time_seconds"].items():
+        db_by_route.append({
+            "method": method,
+            "path": path,
+            "requests": hist.count,
+            "queries_total": store["db_queries_total"].get((method, path), 0),
+            "queries_per_request": round(store["db_queries_total"].get((method, path), 0) / hist.count, 2),
+            "n_plus_one_total": store["db_n_plus_one_total"].get((method, path), 0),
+            "db_time_seconds_sum": round(hist.sum, 4),
+            **hist.quantiles(),
+        })
+
+    # ── Time to first streamed chunk of /ai/suggest/stream ──
+    stream_ttfb = []
+    for (mode, source), hist in store["ai_stream_ttfb_seconds"].items():
+        stream_ttfb.append({
+            "mode": mode,
+            "source": source,
+            "count": hist.count,
+            "sum": round(hist.sum, 4),
+            **hist.quantiles(),
+        })
 
     return {
         "http_requests_total": requests_total,
-        "http_request_duration_seconds_bucket": buckets,
-        "http_request_duration_seconds_count": len(durations),
-        "http_request_duration_seconds_sum": round(sum(d for _, _, d in durations), 4),
-        "active_users": active_users,
-        "tasks_by_status": tasks_by_status,
+        "http_request_duration_seconds": durations,
+        "http_request_duration_seconds_bucket": dict(buckets),
+        "http_request_duration_seconds_count": duration_count,
+        "http_request_duration_seconds_sum": round(duration_sum, 4),
+        "ai_stream_ttfb_seconds": stream_ttfb,
+        "db_by_route": db_by_route,
+        **gauges,
+        **_component_stats(),
     }
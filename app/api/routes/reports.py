@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.core.security import get_current_user
+from app.core.principal_cache import Principal
+from app.core.reports import task_report
+from app.core.report_cache import report_cache
+from app.core.time_tracking import today
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+DEFAULT_WINDOW_DAYS = 30
+
+
+@router.get("/tasks")
+def tasks_report(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user_id: Optional[int] = Query(None, description="Assignee"),
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Throughput, cycle time and estimate accuracy (against Estimates.csv)
+    per assignee and per status, for tasks created or completed between
+    `start` and `end` (default: the last 30 days). Non-admins only see their
+    own tasks.
+    """
+    end = end or today()
+    start = start or end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if not current_user.is_admin:
+        if user_id not in (None, current_user.id):
+            raise HTTPException(status_code=403, detail="Not authorised")
+        user_id = current_user.id
+    status = status.upper() if status else None
+
+    key = (start, end, user_id, status)
+    cached = report_cache.get(key)
+    if cached is not None:
+        return {**cached, "source": "cache"}
+    generation = report_cache.generation
+    report = task_report(db, start, end, user_id=user_id, status=status)
+    report_cache.put(key, report, generation)
+    return {**report, "source": "computed"}
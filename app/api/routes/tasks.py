@@ -1,19 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 import os
+from sqlalchemy import func, select, insert, update, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
+from datetime import date
 from pydantic import BaseModel
 import logging
+from collections import Counter, defaultdict
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 from app.models.task import Task
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskOut, TaskUpdate, TaskUpdateStatus
+from app.models.time_entry import TimeEntry
+from app.schemas.task import (
+    TaskCreate, TaskOut, TaskUpdate, TaskUpdateStatus,
+    TaskBulkCreate, TaskBulkStatus, BulkItemResult, BulkResult,
+    TimeLog, TimeEntryOut, TimeLogResult, TimeSummary,
+)
 from app.core.security import get_current_user
+from app.core.principal_cache import Principal
+from app.core.pagination import encode_cursor, decode_cursor, sort_key
+from app.core.embeddings import get_embedding, skill_embeddings
+from app.core.skill_index import skill_index, top_k
+from app.core.workload import is_active, active_task_counts_async, adjust_active_task_count, adjust_active_task_counts
+from app.core.plan_cache import plan_cache
+from app.core.report_cache import report_cache
+from app.core.gauges import app_gauges
+from app.core.time_tracking import ENTRY_COLUMNS, record_time, remove_task_time, minutes_by_user, today, week_start
 
 logger = logging.getLogger("sprintsync")
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+# Read workload from the maintained users.active_task_count instead of a GROUP BY
+WORKLOAD_FROM_COUNTERS = os.getenv("WORKLOAD_FROM_COUNTERS", "").lower() in ("true", "1", "yes")
+
+def _tasks_changed(*owner_ids: int):
+    """Drop cached results derived from tasks after a committed write."""
+    plan_cache.invalidate(*owner_ids)
+    report_cache.invalidate()
+
+
 VALID_TRANSITIONS = {
     "TODO": ["IN_PROGRESS"],
     "IN_PROGRESS": ["DONE", "TODO"],
@@ -25,7 +54,7 @@ VALID_TRANSITIONS = {
 def create_task(
     task: TaskCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     # Default: assign to current user if not specified
     assignee_id = task.assigned_to if task.assigned_to is not None else current_user.id
@@ -44,26 +73,328 @@ def create_task(
         assigned_to=assignee_id,
     )
     db.add(new_task)
+    adjust_active_task_count(db, assignee_id, +1)  # new tasks start in TODO
+    if new_task.total_minutes:
+        db.flush()
+        record_time(db, [_initial_entry(new_task.id, assignee_id, new_task.total_minutes)], update_totals=False)
     db.commit()
+    _tasks_changed(current_user.id)
+    app_gauges.task_added("TODO")
     db.refresh(new_task)
     return new_task
 
 
-@router.get("/", response_model=List[TaskOut])
+def _initial_entry(task_id: int, user_id: int, minutes: int) -> dict:
+    # Minutes given at creation are logged like any other, so the total stays the sum of entries;
+    # like every adjustment they are credited to the assignee, not to whoever typed them in
+    return {
+        "task_id": task_id, "user_id": user_id, "minutes": minutes, "work_date": today(),
+        "kind": "adjustment", "note": "Logged at creation",
+    }
+
+
+TASK_FIELDS = tuple(TaskOut.model_fields)
+
+# The listing returns a sparse JSONResponse, so its shape is documented here rather than validated
+LIST_TASKS_RESPONSES = {
+    200: {
+        "description": "Tasks with only the requested `fields` (all TaskOut fields by default)",
+        "headers": {
+            "X-Next-Cursor": {
+                "description": "Cursor for the next page; absent on the last page",
+                "schema": {"type": "string"},
+            },
+        },
+        "content": {"application/json": {"schema": {
+            "type": "array",
+            "items": {**TaskOut.model_json_schema(), "required": []},
+        }}},
+    },
+}
+
+
+@router.get("/", response_model=None, response_class=JSONResponse, responses=LIST_TASKS_RESPONSES)
 def list_tasks(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: Literal["id", "updated_at"] = "id",
+    status: Optional[str] = None,
+    assigned_to: Optional[int] = None,
+    user_id: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated subset of task fields"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Keyset-paginated task listing. `sort=id` pages oldest-first by id,
+    `sort=updated_at` newest-first by (updated_at, id). When more rows exist
+    the `X-Next-Cursor` response header carries the cursor for the next page.
+    Only the requested `fields` are selected from the database.
+    """
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(selected) - set(TASK_FIELDS))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}. Allowed: {list(TASK_FIELDS)}")
+    else:
+        selected = list(TASK_FIELDS)
+    # id (and the sort key) are always needed to build the next cursor
+    query_fields = list(dict.fromkeys(["id", sort, *selected]))
+
+    dialect = db.get_bind().dialect.name
+    updated_key = sort_key(Task.updated_at, dialect)
+    columns = [getattr(Task, f) for f in query_fields]
+    if sort == "updated_at":
+        columns.append(updated_key.label("cursor_value"))   # as stored, for the next cursor
+    stmt = select(*columns)
+    if not current_user.is_admin:
+        stmt = stmt.where(Task.user_id == current_user.id)
+    if status is not None:
+        stmt = stmt.where(Task.status == status.upper())
+    if assigned_to is not None:
+        stmt = stmt.where(Task.assigned_to == assigned_to)
+    if user_id is not None:
+        stmt = stmt.where(Task.user_id == user_id)
+
+    if sort == "id":
+        if cursor:
+            last_id, _ = decode_cursor(cursor, sort)
+            stmt = stmt.where(Task.id > last_id)
+        stmt = stmt.order_by(Task.id)
+    else:
+        if cursor:
+            last_id, last_updated = decode_cursor(cursor, sort, as_text=dialect == "sqlite")
+            stmt = stmt.where(or_(
+                updated_key < last_updated,
+                and_(updated_key == last_updated, Task.id < last_id),
+            ))
+        stmt = stmt.order_by(updated_key.desc(), Task.id.desc())
+
+    rows = db.execute(stmt.limit(limit + 1)).all()
+
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers["X-Next-Cursor"] = encode_cursor(sort, last.id, last.cursor_value if sort == "updated_at" else None)
+
+    items = [{f: row._mapping[f] for f in selected} for row in rows]
+    return JSONResponse(content=jsonable_encoder(items), headers=headers)
+
+
+# ─── Bulk operations (declared before /{task_id} so "bulk" isn't taken as an id) ───
+
+TASK_COLUMNS = tuple(getattr(Task, f) for f in TASK_FIELDS)
+
+
+def _bulk_result(results: list[BulkItemResult]) -> BulkResult:
+    results.sort(key=lambda r: r.index)
+    succeeded = sum(r.ok for r in results)
+    return BulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+@router.post("/bulk", response_model=BulkResult)
+def bulk_create_tasks(
+    body: TaskBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Create many tasks in one transaction and one multi-row INSERT ... RETURNING."""
+    assignees = [
+        item.assigned_to if item.assigned_to is not None else current_user.id
+        for item in body.items
+    ]
+    existing = set(db.scalars(select(User.id).where(User.id.in_(set(assignees)))))
+
+    results, rows, row_indexes = [], [], []
+    for index, (item, assignee_id) in enumerate(zip(body.items, assignees)):
+        if assignee_id not in existing:
+            results.append(BulkItemResult(
+                index=index, ok=False, status_code=404,
+                error=f"User with id {assignee_id} not found",
+            ))
+            continue
+        rows.append({
+            "title": item.title,
+            "description": item.description,
+            "status": "TODO",
+            "total_minutes": item.total_minutes or 0,
+            "user_id": current_user.id,
+            "assigned_to": assignee_id,
+        })
+        row_indexes.append(index)
+
+    if rows:
+        created = db.execute(
+            insert(Task).returning(*TASK_COLUMNS, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        adjust_active_task_counts(db, Counter(row["assigned_to"] for row in rows))
+        initial = [
+            _initial_entry(task.id, task.assigned_to, task.total_minutes)
+            for task in created if task.total_minutes
+        ]
+        if initial:
+            record_time(db, initial, update_totals=False)
+        db.commit()
+        _tasks_changed(current_user.id)
+        app_gauges.task_added("TODO", len(rows))
+        for index, row in zip(row_indexes, created):
+            results.append(BulkItemResult(
+                index=index, ok=True, status_code=200,
+                task=TaskOut.model_validate(row._mapping),
+            ))
+
+    return _bulk_result(results)
+
+
+@router.patch("/bulk/status", response_model=BulkResult)
+def bulk_update_task_status(
+    body: TaskBulkStatus,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Apply many status transitions in one transaction: one locking SELECT
+    for all ids, VALID_TRANSITIONS checked per item, then one set-based
+    UPDATE per target status.
+    """
+    ids = {item.id for item in body.items}
+    current = {
+        row.id: row
+        for row in db.execute(
+            select(Task.id, Task.status, Task.user_id, Task.assigned_to)
+            .where(Task.id.in_(ids))
+            .with_for_update()
+        )
+    }
+
+    results, seen = [], set()
+    by_target: dict[str, list[tuple[int, int]]] = defaultdict(list)   # status -> [(index, id)]
+    deltas: Counter = Counter()
+    for index, item in enumerate(body.items):
+        task = current.get(item.id)
+        new_status = item.status.upper()
+        if item.id in seen:
+            error = (400, "Duplicate task id in request")
+        elif task is None:
+            error = (404, "Task not found")
+        elif not current_user.is_admin and task.user_id != current_user.id:
+            error = (403, "Not authorised")
+        elif new_status not in VALID_TRANSITIONS.get(task.status, []):
+            allowed = VALID_TRANSITIONS.get(task.status, [])
+            error = (400, f"Cannot transition from {task.status} to {new_status}. Allowed: {allowed}")
+        else:
+            error = None
+        seen.add(item.id)
+
+        if error:
+            results.append(BulkItemResult(index=index, ok=False, status_code=error[0], error=error[1]))
+            continue
+        by_target[new_status].append((index, item.id))
+        deltas[task.assigned_to] += is_active(new_status) - is_active(task.status)
+
+    updated = {}
+    for new_status, entries in by_target.items():
+        stmt = (
+            update(Task)
+            .where(Task.id.in_([task_id for _, task_id in entries]))
+            .values(status=new_status, completed_at=func.now() if new_status == "DONE" else None)
+            .returning(*TASK_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        updated.update({row.id: row for row in db.execute(stmt)})
+    adjust_active_task_counts(db, deltas)
+    db.commit()
+    _tasks_changed(*{
+        current[task_id].user_id for entries in by_target.values() for _, task_id in entries
+    })
+    for new_status, entries in by_target.items():
+        for _, task_id in entries:
+            app_gauges.task_moved(current[task_id].status, new_status)
+
+    for entries in by_target.values():
+        for index, task_id in entries:
+            results.append(BulkItemResult(
+                index=index, ok=True, status_code=200,
+                task=TaskOut.model_validate(updated[task_id]._mapping),
+            ))
+
+    return _bulk_result(results)
+
+
+# ─── Time tracking ───
+
+def _check_can_log(task: Task | None, current_user: Principal):
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not current_user.is_admin and current_user.id not in (task.user_id, task.assigned_to):
+        raise HTTPException(status_code=403, detail="Not authorised")
+
+
+@router.get("/time/summary", response_model=TimeSummary)
+def time_summary(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """
+    Minutes per user and day between `start` and `end` (default: this week
+    so far), read from the per-day rollup rather than the entries.
+    Non-admins only see their own time.
+    """
+    end = end or today()
+    start = start or week_start(end)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if not current_user.is_admin:
+        if user_id not in (None, current_user.id):
+            raise HTTPException(status_code=403, detail="Not authorised")
+        user_id = current_user.id
+    return TimeSummary(start=start, end=end, users=minutes_by_user(db, start, end, user_id))
+
+
+@router.post("/{task_id}/time", response_model=TimeLogResult)
+def log_time(
+    task_id: int,
+    body: TimeLog,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    """Append time entries for the current user; the owner, the assignee and admins may log."""
+    task = db.query(Task).filter(Task.id == task_id).first()
+    _check_can_log(task, current_user)
+
+    rows = record_time(db, [
+        {
+            "task_id": task_id, "user_id": current_user.id, "minutes": entry.minutes,
+            "work_date": entry.work_date or today(), "note": entry.note,
+        }
+        for entry in body.entries
+    ])
+    db.commit()
+    _tasks_changed(task.user_id)
+    db.refresh(task)
+    return TimeLogResult(task=task, entries=[TimeEntryOut.model_validate(row._mapping) for row in rows])
+
+
+@router.get("/{task_id}/time", response_model=List[TimeEntryOut])
+def list_time_entries(
+    task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    if current_user.is_admin:
-        return db.query(Task).all()
-    return db.query(Task).filter(Task.user_id == current_user.id).all()
+    _check_can_log(db.query(Task).filter(Task.id == task_id).first(), current_user)
+    return db.execute(select(*ENTRY_COLUMNS).where(TimeEntry.task_id == task_id).order_by(TimeEntry.id)).all()
 
 
 @router.get("/{task_id}", response_model=TaskOut)
 def get_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
@@ -78,19 +409,43 @@ def update_task(
     task_id: int,
     updates: TaskUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(Task.id == task_id).with_for_update().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if not current_user.is_admin and task.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorised")
 
     update_data = updates.model_dump(exclude_unset=True)
+
+    # Reassignment moves the task's weight between workload counters
+    if "assigned_to" in update_data and update_data["assigned_to"] != task.assigned_to:
+        new_assignee = update_data["assigned_to"]
+        if new_assignee is None:
+            raise HTTPException(status_code=400, detail="assigned_to cannot be cleared")
+        if not db.query(User.id).filter(User.id == new_assignee).first():
+            raise HTTPException(status_code=404, detail=f"User with id {new_assignee} not found")
+        if is_active(task.status):
+            adjust_active_task_counts(db, {task.assigned_to: -1, new_assignee: +1})
+
+    # total_minutes is derived from time entries; a new value is logged as the difference,
+    # credited to the assignee (or the owner) as the 0002 backfill did
+    new_total = update_data.pop("total_minutes", None)
+    if new_total is not None and new_total != (task.total_minutes or 0):
+        record_time(db, [{
+            "task_id": task.id, "user_id": task.assigned_to or task.user_id,
+            "minutes": new_total - (task.total_minutes or 0),
+            "work_date": today(), "kind": "adjustment", "note": f"total_minutes set to {new_total}",
+        }])
+        # Unlike a time log this is an edit; record_time leaves updated_at alone and the row isn't dirty
+        task.updated_at = func.now()
+
     for key, value in update_data.items():
         setattr(task, key, value)
 
     db.commit()
+    _tasks_changed(task.user_id)
     db.refresh(task)
     return task
 
@@ -100,9 +455,9 @@ def update_task_status(
     task_id: int,
     body: TaskUpdateStatus,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(Task.id == task_id).with_for_update().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if not current_user.is_admin and task.user_id != current_user.id:
@@ -116,8 +471,13 @@ def update_task_status(
             detail=f"Cannot transition from {task.status} to {new_status}. Allowed: {allowed}",
         )
 
+    adjust_active_task_count(db, task.assigned_to, is_active(new_status) - is_active(task.status))
+    old_status = task.status
     task.status = new_status
+    task.completed_at = func.now() if new_status == "DONE" else None
     db.commit()
+    _tasks_changed(task.user_id)
+    app_gauges.task_moved(old_status, new_status)
     db.refresh(task)
     return task
 
@@ -126,57 +486,40 @@ def update_task_status(
 def delete_task(
     task_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    task = db.query(Task).filter(Task.id == task_id).first()
+    task = db.query(Task).filter(Task.id == task_id).with_for_update().first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     if not current_user.is_admin and task.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorised")
 
+    if is_active(task.status):
+        adjust_active_task_count(db, task.assigned_to, -1)
+    owner_id, status = task.user_id, task.status
+    remove_task_time(db, task.id)
     db.delete(task)
     db.commit()
+    _tasks_changed(owner_id)
+    app_gauges.task_removed(status)
     return {"detail": "Task deleted"}
 
 
-import google.generativeai as genai
-import math
+import numpy as np
 
 class RecommendRequest(BaseModel):
     title: str
     description: Optional[str] = ""
 
 
-def cosine_similarity(v1, v2):
-    dot_product = sum(a * b for a, b in zip(v1, v2))
-    magnitude1 = math.sqrt(sum(a * a for a in v1))
-    magnitude2 = math.sqrt(sum(b * b for b in v2))
-    if not magnitude1 or not magnitude2:
-        return 0.0
-    return dot_product / (magnitude1 * magnitude2)
-
-
-async def get_embedding(text: str):
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        # Fallback to 0 if key not set during recommendation to avoid crash
-        return [0.0] * 768
-    genai.configure(api_key=api_key)
-    result = await genai.embed_content_async(
-        model="models/gemini-embedding-001",
-        content=text,
-        task_type="retrieval_document"
-    )
-    return result['embedding']
-
-
 @router.post("/recommend-user")
 async def recommend_user(
     req: RecommendRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    k: int = Query(5, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    users = db.query(User).all()
+    users = (await db.execute(select(User))).scalars().all()
     if not users:
         raise HTTPException(status_code=404, detail="No users found")
 
@@ -189,47 +532,47 @@ async def recommend_user(
         task_words = set(task_text.lower().split())
         task_vector = None
 
+    # 1. Similarity Score
+    if task_vector:
+        # One matrix-vector product over the skill index; skill vectors come
+        # from the embedding store, so the task text is the only embedding call.
+        await skill_embeddings.sync_index(db, users)
+        user_ids, similarities = skill_index.score(task_vector)
+    else:
+        # Fallback logic (keyword overlap)
+        user_ids = np.array([user.id for user in users], dtype=np.int64)
+        overlaps = []
+        for user in users:
+            skill_words = set((user.skills or "").lower().replace(",", " ").split())
+            overlaps.append(len(task_words.intersection(skill_words)))
+        similarities = np.array(overlaps, dtype=np.float32) / (len(task_words) + 1)
+
+    # 2. Workload Score (Active tasks)
+    if WORKLOAD_FROM_COUNTERS:
+        workload = {user.id: user.active_task_count for user in users}
+    else:
+        workload = await active_task_counts_async(db)
+    active_tasks = np.array([workload.get(int(user_id), 0) for user_id in user_ids], dtype=np.float32)
+
+    # 3. Final Score: Similarity penalized by workload
+    # Adding 1 to active_tasks to dampen the effect
+    scores = similarities / (1 + active_tasks)
+
+    users_by_id = {user.id: user for user in users}
     recommendations = []
-    for user in users:
-        # 1. Similarity Score
-        if task_vector:
-            user_skills = user.skills or "No skills listed"
-            try:
-                user_vector = await get_embedding(user_skills)
-                similarity = cosine_similarity(task_vector, user_vector)
-            except:
-                similarity = 0.0
-        else:
-            # Fallback logic (keyword overlap)
-            user_skills = (user.skills or "").lower()
-            skill_words = set(user_skills.replace(",", " ").split())
-            overlap = len(task_words.intersection(skill_words))
-            similarity = overlap / (len(task_words) + 1)
-
-        # 2. Workload Score (Active tasks)
-        active_tasks = db.query(Task).filter(
-            Task.assigned_to == user.id,
-            Task.status.in_(["TODO", "IN_PROGRESS"])
-        ).count()
-
-        # 3. Final Score: Similarity penalized by workload
-        # Adding 1 to active_tasks to dampen the effect
-        score = similarity / (1 + active_tasks)
-
+    for i in top_k(scores, k):
+        user = users_by_id[int(user_ids[i])]
         recommendations.append({
             "user_id": user.id,
             "email": user.email,
             "skills": user.skills,
-            "active_tasks": active_tasks,
-            "score": score,
-            "semantic_similarity": similarity
+            "active_tasks": int(active_tasks[i]),
+            "score": float(scores[i]),
+            "semantic_similarity": float(similarities[i])
         })
 
-    # Sort by score descending
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-
     return {
         "recommended_user": recommendations[0] if recommendations else None,
-        "all_scores": recommendations,
+        "recommendations": recommendations,
         "method": "semantic" if task_vector else "keyword_fallback"
     }
@@ -1,29 +1,62 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserOut
-from app.core.security import hash_password
+from app.schemas.user import UserCreate, UserOut, UserUpdate
+from app.core.security import get_current_user
+from app.core.passwords import hash_password_async
+from app.core.principal_cache import Principal, principal_cache
+from app.core.embeddings import skill_embeddings
+from app.core.gauges import app_gauges
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
 @router.post("/", response_model=UserOut)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
 
     # check if email already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
+    existing_user = (await db.execute(select(User.id).where(User.email == user.email))).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = User(
         email=user.email,
-        hashed_password=hash_password(user.password),
+        # bcrypt runs in the password process pool, off the event loop
+        hashed_password=await hash_password_async(user.password),
         skills=user.skills
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    app_gauges.user_added()
 
-    return new_user
\ No newline at end of file
+    # Embed skills up front so recommendations never pay for it
+    await skill_embeddings.refresh(db, new_user)
+
+    return new_user
+
+
+@router.patch("/me", response_model=UserOut)
+async def update_me(
+    updates: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    user = await db.get(User, current_user.id)
+    update_data = updates.model_dump(exclude_unset=True)
+
+    skills_changed = "skills" in update_data and update_data["skills"] != user.skills
+    for key, value in update_data.items():
+        setattr(user, key, value)
+
+    await db.commit()
+    await db.refresh(user)
+    principal_cache.invalidate(user.id)
+
+    if skills_changed:
+        await skill_embeddings.refresh(db, user)
+
+    return user
@@ -0,0 +1,273 @@
+"""
+Generate a large synthetic dataset for scale testing.
+
+    python -m app.commands.generate_data [--users 10000] [--tasks 5000000]
+                                         [--seed 42] [--batch-size 20000]
+                                         [--days 365] [--password password]
+                                         [--truncate]
+
+Users get a role and a skill set drawn from that role's vocabulary. Task
+ownership is Zipf-skewed (a few users own most of the work), most tasks are
+assigned to their owner, statuses follow a realistic mix, and timestamps
+spread over the last `--days` days. The same seed always produces the same
+rows. Postgres is loaded with COPY, SQLite with batched executemany.
+"""
+import io
+import csv
+import time
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import exists, func, insert, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.db.session import Base, engine as default_engine
+from app.models.task import Task
+from app.models.user import User
+from app.models.time_entry import TimeEntry, UserDailyMinutes
+from app.core.passwords import hash_password
+from app.core.workload import reconcile_active_task_counts
+
+EMAIL_DOMAIN = "gen.example.com"
+
+# role -> (weight, skills, task subjects)
+ROLES = {
+    "backend": (0.25, ["python", "fastapi", "django", "java", "spring boot", "go", "rest apis", "microservices", "postgres", "redis"],
+                ["API endpoint", "auth service", "payment webhook", "rate limiter", "background worker", "search API"]),
+    "frontend": (0.18, ["react", "typescript", "javascript", "css", "next.js", "redux", "accessibility", "storybook"],
+                 ["login page", "dashboard widget", "settings form", "onboarding flow", "dark mode", "table pagination"]),
+    "data": (0.14, ["data science", "machine learning", "python", "pandas", "pytorch", "sql", "statistics", "forecasting"],
+             ["churn model", "feature pipeline", "A/B test analysis", "forecast dashboard", "training dataset"]),
+    "data_eng": (0.10, ["data engineering", "spark", "airflow", "etl", "sql", "kafka", "dbt", "hadoop"],
+                 ["ETL job", "Kafka consumer", "warehouse schema", "Airflow DAG", "backfill script"]),
+    "devops": (0.12, ["devops", "docker", "kubernetes", "terraform", "aws", "ci/cd", "monitoring", "linux"],
+               ["CI pipeline", "Helm chart", "Terraform module", "alerting rules", "staging cluster"]),
+    "qa": (0.09, ["qa", "testing", "selenium", "cypress", "automation", "pytest", "load testing"],
+           ["regression suite", "e2e checkout test", "flaky test", "load test plan", "test fixtures"]),
+    "mobile": (0.07, ["ios", "android", "swift", "kotlin", "react native", "flutter"],
+               ["push notifications", "offline sync", "app store release", "deep links"]),
+    "security": (0.05, ["security", "oauth", "penetration testing", "owasp", "iam", "cryptography"],
+                 ["token rotation", "dependency audit", "SSO integration", "secrets scanning"]),
+}
+GENERAL_SKILLS = ["git", "agile", "code review", "documentation", "mentoring", "sql", "python"]
+VERBS = ["Implement", "Fix", "Refactor", "Test", "Document", "Optimize", "Review", "Migrate", "Design", "Deploy"]
+
+STATUSES = np.array(["DONE", "TODO", "IN_PROGRESS"])
+STATUS_WEIGHTS = [0.55, 0.27, 0.18]
+ZIPF_EXPONENT = 1.1          # owner skew: rank-r user owns ~1/r^s of the work
+SELF_ASSIGNED = 0.8          # share of tasks assigned to their owner
+
+USER_COLUMNS = ("email", "hashed_password", "is_admin", "skills")
+TASK_COLUMNS = (
+    "title", "description", "status", "total_minutes", "user_id", "assigned_to",
+    "created_at", "updated_at", "completed_at",
+)
+
+
+# ─── Row generation ───
+
+def generate_users(rng: np.random.Generator, n: int, hashed_password: str) -> tuple[list[tuple], np.ndarray]:
+    """User rows plus each user's role index (used to theme their tasks)."""
+    names = list(ROLES)
+    weights = np.array([ROLES[name][0] for name in names])
+    roles = rng.choice(len(names), size=n, p=weights / weights.sum())
+    rows = []
+    for i, role in enumerate(roles):
+        vocab = ROLES[names[role]][1]
+        picked = list(rng.choice(vocab, size=min(int(rng.integers(3, 7)), len(vocab)), replace=False))
+        if rng.random() < 0.5:
+            picked.append(str(rng.choice(GENERAL_SKILLS)))
+        skills = ", ".join(dict.fromkeys(picked))
+        rows.append((f"user{i + 1}@{EMAIL_DOMAIN}", hashed_password, False, skills))
+    return rows, roles
+
+
+def _owner_weights(rng: np.random.Generator, n_users: int) -> np.ndarray:
+    ranks = rng.permutation(n_users) + 1   # heavy users are spread over the id range
+    weights = 1.0 / ranks ** ZIPF_EXPONENT
+    return weights / weights.sum()
+
+
+def generate_tasks(rng, user_ids: np.ndarray, roles: np.ndarray, n: int, batch_size: int, now: datetime, days: int):
+    """Yield batches of task row tuples; every draw comes from `rng`, so output is fully seeded."""
+    names = list(ROLES)
+    owner_p = _owner_weights(rng, len(user_ids))
+    window = days * 86400
+    for start in range(0, n, batch_size):
+        size = min(batch_size, n - start)
+        owners = rng.choice(len(user_ids), size=size, p=owner_p)
+        others = rng.choice(len(user_ids), size=size, p=owner_p)
+        assignees = np.where(rng.random(size) < SELF_ASSIGNED, owners, others)
+        statuses = rng.choice(STATUSES, size=size, p=STATUS_WEIGHTS)
+        created_ago = rng.random(size) * window
+        # Done work has been touched since creation; open work less so
+        touched = np.minimum(rng.exponential(3 * 86400, size), created_ago)
+        minutes = np.where(
+            statuses == "DONE", rng.lognormal(5.0, 0.7, size),
+            np.where(statuses == "IN_PROGRESS", rng.lognormal(4.0, 0.8, size), 0),
+        ).astype(int)
+        verbs = rng.integers(0, len(VERBS), size)
+        subjects = rng.integers(0, 1 << 30, size)
+
+        batch = []
+        for j in range(size):
+            owner = owners[j]
+            subject_pool = ROLES[names[roles[owner]]][2]
+            subject = subject_pool[subjects[j] % len(subject_pool)]
+            created = now - timedelta(seconds=float(created_ago[j]))
+            touched_at = created + timedelta(seconds=float(touched[j]))
+            batch.append((
+                f"{VERBS[verbs[j]]} {subject}",
+                f"{VERBS[verbs[j]]} the {subject} (generated task {start + j + 1}).",
+                str(statuses[j]),
+                int(minutes[j]),
+                int(user_ids[owner]),
+                int(user_ids[assignees[j]]),
+                created,
+                touched_at,
+                touched_at if statuses[j] == "DONE" else None,
+            ))
+        yield batch
+
+
+# ─── Loading ───
+
+def _copy(engine, table: str, columns: tuple, rows: list[tuple]):
+    """COPY rows into a Postgres table (psycopg2 or psycopg 3)."""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        if hasattr(cursor, "copy_expert"):   # psycopg2
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in rows
+            )
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+        else:                                # psycopg 3
+            with cursor.copy(statement) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def load(engine, table, columns: tuple, rows: list[tuple]):
+    if engine.dialect.name == "postgresql":
+        _copy(engine, table.name, columns, rows)
+        return
+    with engine.begin() as conn:
+        conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+def truncate(engine):
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("TRUNCATE tasks, user_skill_embeddings, users RESTART IDENTITY CASCADE"))
+        else:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+def backfill_time_entries(engine) -> int:
+    """
+    One adjustment entry per task that has minutes but no entries, dated the
+    day the task was last touched and credited to its assignee (or owner),
+    then those entries added to the per-day rollups. Two set-based
+    statements, so tasks.total_minutes stays the sum of each task's entries.
+    """
+    with engine.begin() as conn:
+        first_new = (conn.execute(select(func.max(TimeEntry.id))).scalar() or 0) + 1
+        inserted = conn.execute(insert(TimeEntry).from_select(
+            ["task_id", "user_id", "minutes", "work_date", "kind", "note"],
+            select(
+                Task.id, func.coalesce(Task.assigned_to, Task.user_id), Task.total_minutes,
+                func.date(Task.updated_at), literal("adjustment"), literal("Generated data"),
+            ).where(
+                Task.total_minutes != 0,
+                ~exists().where(TimeEntry.task_id == Task.id),
+            ),
+        )).rowcount
+
+        dialect_insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+        stmt = dialect_insert(UserDailyMinutes).from_select(
+            ["user_id", "work_date", "minutes", "entries"],
+            select(TimeEntry.user_id, TimeEntry.work_date, func.sum(TimeEntry.minutes), func.count(TimeEntry.id))
+            .where(TimeEntry.id >= first_new)   # a WHERE also keeps SQLite's INSERT ... SELECT ... ON CONFLICT unambiguous
+            .group_by(TimeEntry.user_id, TimeEntry.work_date),
+        )
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[UserDailyMinutes.user_id, UserDailyMinutes.work_date],
+            set_={
+                "minutes": UserDailyMinutes.minutes + stmt.excluded.minutes,
+                "entries": UserDailyMinutes.entries + stmt.excluded.entries,
+            },
+        ))
+    return inserted
+
+
+def generate(engine, users: int, tasks: int, seed: int = 42, batch_size: int = 20000,
+             days: int = 365, password: str = "password", now: datetime | None = None, log=print) -> dict:
+    rng = np.random.default_rng(seed)
+    now = now or datetime(2026, 1, 1, tzinfo=timezone.utc)   # fixed, so reruns match
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    user_rows, roles = generate_users(rng, users, hash_password(password))
+    for i in range(0, len(user_rows), batch_size):
+        load(engine, User.__table__, USER_COLUMNS, user_rows[i:i + batch_size])
+    with engine.connect() as conn:
+        ids = dict(conn.execute(select(User.email, User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))).all())
+    user_ids = np.array([ids[row[0]] for row in user_rows])
+    log(f"users: {users} in {time.perf_counter() - started:.1f}s")
+
+    loaded = 0
+    for batch in generate_tasks(rng, user_ids, roles, tasks, batch_size, now, days):
+        load(engine, Task.__table__, TASK_COLUMNS, batch)
+        loaded += len(batch)
+        if loaded % (batch_size * 25) == 0 or loaded == tasks:
+            elapsed = time.perf_counter() - started
+            log(f"tasks: {loaded}/{tasks} ({loaded / elapsed:,.0f} rows/s)")
+
+    # Generated rows bypass the write paths, so fill the workload counters and time entries in one pass each
+    with Session(engine) as db:
+        drift = reconcile_active_task_counts(db)
+    entries = backfill_time_entries(engine)
+    return {
+        "users": users,
+        "tasks": loaded,
+        "counters_set": len(drift),
+        "time_entries": entries,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--tasks", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=365, help="spread task timestamps over this many days")
+    parser.add_argument("--password", default="password", help="password shared by every generated user")
+    parser.add_argument("--truncate", action="store_true", help="delete all users and tasks first")
+    args = parser.parse_args(argv)
+
+    if args.truncate:
+        truncate(default_engine)
+    summary = generate(
+        default_engine, args.users, args.tasks, seed=args.seed,
+        batch_size=args.batch_size, days=args.days, password=args.password,
+    )
+    print(f"loaded {summary['users']} users and {summary['tasks']} tasks in {summary['seconds']}s; "
+          f"set active_task_count for {summary['counters_set']} user(s), "
+          f"logged {summary['time_entries']} time entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Apply pending SQL migrations from db/migrations.
+
+    python -m app.commands.migrate [--dry-run]
+
+Files named `<number>_<name>.sql` run in order. Each one runs in its own
+transaction and is recorded in `schema_migrations`, so it runs only once per
+database. Migrations use IF NOT EXISTS, so a database created from a current
+`db/schema.sql` can be migrated safely. Like schema.sql they are written for
+Postgres. On SQLite the runner swaps the two constructs it lacks: `SERIAL`
+keys become `INTEGER PRIMARY KEY`, and `ADD COLUMN IF NOT EXISTS` is skipped
+when the column is already there.
+"""
+import re
+import argparse
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+from app.db.session import engine as default_engine
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "db" / "migrations"
+
+_SERIAL_KEY = re.compile(r"\bSERIAL PRIMARY KEY\b", re.IGNORECASE)
+_ADD_COLUMN_IF_NOT_EXISTS = re.compile(r"^ALTER TABLE (\w+) ADD COLUMN IF NOT EXISTS (\w+)", re.IGNORECASE)
+
+
+def migration_files(directory: Path = MIGRATIONS_DIR) -> list[Path]:
+    return sorted(directory.glob("[0-9]*_*.sql"))
+
+
+def statements(sql: str) -> list[str]:
+    """Split a migration into statements (no procedural blocks allowed)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def _for_sqlite(conn, stmt: str) -> str | None:
+    """The statement as SQLite accepts it, or None if it has nothing to do."""
+    stmt = _SERIAL_KEY.sub("INTEGER PRIMARY KEY", stmt)
+    match = _ADD_COLUMN_IF_NOT_EXISTS.match(stmt)
+    if match:
+        table, column = match.groups()
+        if column in {c["name"] for c in inspect(conn).get_columns(table)}:
+            return None
+        stmt = re.sub(r"IF NOT EXISTS ", "", stmt, count=1, flags=re.IGNORECASE)
+    return stmt
+
+
+def applied_migrations(engine) -> set[str]:
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version VARCHAR(255) PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        return set(conn.scalars(text("SELECT version FROM schema_migrations")))
+
+
+def migrate(engine, directory: Path = MIGRATIONS_DIR, dry_run: bool = False) -> list[str]:
+    """Apply every migration not yet recorded; returns the versions applied (or pending, if dry_run)."""
+    done = applied_migrations(engine)
+    pending = [path for path in migration_files(directory) if path.stem not in done]
+    if dry_run:
+        return [path.stem for path in pending]
+    for path in pending:
+        with engine.begin() as conn:
+            for stmt in statements(path.read_text()):
+                if engine.dialect.name == "sqlite":
+                    stmt = _for_sqlite(conn, stmt)
+                if stmt:
+                    conn.exec_driver_sql(stmt)
+            conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": path.stem})
+    return [path.stem for path in pending]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    args = parser.parse_args(argv)
+
+    versions = migrate(default_engine, dry_run=args.dry_run)
+    if not versions:
+        print("Database is up to date.")
+        return
+    verb = "Pending" if args.dry_run else "Applied"
+    for version in versions:
+        print(f"{verb}: {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Fix drift between users.active_task_count and the tasks table.
+
+    python -m app.commands.reconcile_workload [--dry-run]
+"""
+import argparse
+
+from app.db.session import SessionLocal
+from app.core.workload import reconcile_active_task_counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="report drift without writing")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        drift = reconcile_active_task_counts(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    for d in drift:
+        print(f"user {d['user_id']}: stored={d['stored']} actual={d['actual']}")
+    verb = "found" if args.dry_run else "fixed"
+    print(f"{verb} {len(drift)} drifted user(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import os
+import asyncio
+import weakref
+
+from app.core.metrics import QuantileSketch
+from app.core.llm import get_llm_client
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched calls.
+
+    Requests queue up until `max_batch` texts are waiting or `linger`
+    seconds have passed since the first one, then a single `embed_many`
+    call is made and each caller receives its own vector (or the batch's
+    exception). Identical texts within a batch are embedded once. Queues
+    are kept per event loop, since the futures are bound to one.
+    """
+
+    def __init__(self, embed_many=None, max_batch: int = 32, linger: float = 0.01):
+        self._embed_many = embed_many
+        self.max_batch = max_batch
+        self.linger = linger
+        self._pending: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._timers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.full_flushes = 0
+        self.fill = QuantileSketch()
+
+    async def _call(self, texts: list[str]) -> list[list[float]]:
+        if self._embed_many is not None:
+            return await self._embed_many(texts)
+        return await get_llm_client().embed_many(texts)
+
+    async def embed(self, text: str) -> list[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(loop, [])
+        batch.append((text, future))
+        if len(batch) >= self.max_batch:
+            self.full_flushes += 1
+            self._flush(loop)
+        elif len(batch) == 1:
+            self._timers[loop] = loop.call_later(self.linger, self._flush, loop)
+        return await future
+
+    def _flush(self, loop):
+        timer = self._timers.pop(loop, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(loop, None)
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        self.fill.add(len(batch) / self.max_batch)
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(texts, await self._call(texts)))
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for text, future in batch:
+            if not future.done():  # the caller may have been cancelled meanwhile
+                future.set_result(vectors[text])
+
+    def stats(self) -> dict:
+        return {
+            "max_batch": self.max_batch,
+            "linger_ms": self.linger * 1000,
+            "batches_total": self.batches,
+            "items_total": self.items,
+            "full_batches_total": self.full_flushes,
+            "avg_fill_ratio": round(self.items / (self.batches * self.max_batch), 4) if self.batches else None,
+            "fill_ratio_p50": self.fill.quantile(0.5),
+        }
+
+
+embedding_batcher = EmbeddingBatcher(
+    max_batch=int(os.getenv("EMBED_BATCH_SIZE", "32")),
+    linger=float(os.getenv("EMBED_BATCH_LINGER_MS", "10")) / 1000,
+)
@@ -0,0 +1,205 @@
+import os
+import asyncio
+import hashlib
+import logging
+from array import array
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.skill_embedding import UserSkillEmbedding
+from app.core.skill_index import skill_index
+from app.core.llm import EMBEDDING_MODEL
+from app.core.embedding_batcher import embedding_batcher
+
+logger = logging.getLogger("sprintsync")
+
+EMBEDDING_DIM = 768
+NO_SKILLS_TEXT = "No skills listed"
+
+
+async def get_embedding(text: str):
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        # Fallback to 0 if key not set during recommendation to avoid crash
+        return [0.0] * EMBEDDING_DIM
+    # Concurrent callers are coalesced into batched upstream requests
+    return await embedding_batcher.embed(text)
+
+
+def skills_text(skills: str | None) -> str:
+    return skills or NO_SKILLS_TEXT
+
+
+def skills_hash(text: str) -> str:
+    """Fingerprint of the embedded text; the model is part of the key so a model change re-embeds."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _pack(vector) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+# ─── Skill-embedding store ───
+
+class SkillEmbeddingStore:
+    """
+    User skill embeddings persisted in `user_skill_embeddings`, fronted by an
+    in-process LRU keyed by (user_id, skills_hash).
+
+    Rows are written when a user is created or edits their skills, so a
+    recommendation only embeds the task text. A row whose hash no longer
+    matches the user's skills is treated as a miss and re-embedded.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._lru: OrderedDict[tuple[int, str], list[float]] = OrderedDict()
+
+    def _cache_get(self, key):
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+        return vector
+
+    def _cache_put(self, key, vector):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def clear(self):
+        self._lru.clear()
+
+    @staticmethod
+    def _persist(db: AsyncSession, user_id: int, digest: str, vector, row: UserSkillEmbedding | None):
+        if row is None:
+            db.add(UserSkillEmbedding(user_id=user_id, skills_hash=digest, embedding=_pack(vector)))
+        else:
+            row.skills_hash = digest
+            row.embedding = _pack(vector)
+
+    async def refresh(self, db: AsyncSession, user) -> list[float] | None:
+        """Embed the user's current skills and persist them. Never raises."""
+        text = skills_text(user.skills)
+        digest = skills_hash(text)
+        try:
+            vector = await get_embedding(text)
+        except Exception as exc:
+            logger.warning("Skill embedding failed for user %s: %s", user.id, exc)
+            return None
+
+        if not any(vector):
+            # Zero vector means embeddings are disabled; nothing worth storing.
+            return vector
+
+        row = await db.get(UserSkillEmbedding, user.id)
+        self._persist(db, user.id, digest, vector, row)
+        await db.commit()
+        self._cache_put((user.id, digest), vector)
+        skill_index.upsert(user.id, vector, digest)
+        return vector
+
+    async def get_many(self, db: AsyncSession, users) -> dict[int, list[float]]:
+        """
+        Return {user_id: vector} for the given users. LRU hits cost nothing,
+        the remaining users are resolved with a single IN query, and only
+        users with no up-to-date row are embedded (and persisted). Users whose
+        embedding failed are left out.
+        """
+        vectors: dict[int, list[float]] = {}
+        missing = []
+        for user in users:
+            text = skills_text(user.skills)
+            digest = skills_hash(text)
+            vector = self._cache_get((user.id, digest))
+            if vector is not None:
+                vectors[user.id] = vector
+            else:
+                missing.append((user.id, text, digest))
+
+        if not missing:
+            return vectors
+
+        rows = (await db.execute(
+            select(UserSkillEmbedding).where(
+                UserSkillEmbedding.user_id.in_([user_id for user_id, _, _ in missing])
+            )
+        )).scalars().all()
+        stored = {row.user_id: row for row in rows}
+
+        stale = [
+            (user_id, text, digest) for user_id, text, digest in missing
+            if stored.get(user_id) is None or stored[user_id].skills_hash != digest
+        ]
+        # Issued together so the batcher can fold them into few upstream calls
+        fresh = await asyncio.gather(
+            *(get_embedding(text) for _, text, _ in stale), return_exceptions=True
+        )
+        embedded = {user_id: vector for (user_id, _, _), vector in zip(stale, fresh)}
+
+        dirty = False
+        for user_id, text, digest in missing:
+            row = stored.get(user_id)
+            if user_id not in embedded:
+                vector = _unpack(row.embedding)
+            else:
+                vector = embedded[user_id]
+                if isinstance(vector, Exception):
+                    logger.warning("Skill embedding failed for user %s: %s", user_id, vector)
+                    continue
+                if not any(vector):
+                    vectors[user_id] = vector
+                    continue
+                self._persist(db, user_id, digest, vector, row)
+                dirty = True
+            self._cache_put((user_id, digest), vector)
+            vectors[user_id] = vector
+
+        if dirty:
+            await db.commit()
+        return vectors
+
+    async def sync_index(self, db: AsyncSession, users):
+        """
+        Bring `skill_index` in line with `users`: rows for users that no longer
+        exist are dropped, and only users whose skills hash changed (or who
+        were never indexed) go through `get_many`. A user whose embedding
+        failed is indexed with a zero vector, so they still rank (at
+        similarity 0, as before the index) and are retried on the next sync.
+        """
+        live_ids = {user.id for user in users}
+        for user_id in skill_index.user_ids - live_ids:
+            skill_index.remove(user_id)
+
+        stale = []
+        for user in users:
+            digest = skills_hash(skills_text(user.skills))
+            if not skill_index.is_current(user.id, digest):
+                stale.append((user, digest))
+        if not stale:
+            return
+
+        vectors = await self.get_many(db, [user for user, _ in stale])
+        failed = []
+        for user, digest in stale:
+            vector = vectors.get(user.id)
+            if vector is None:
+                failed.append(user.id)
+            else:
+                skill_index.upsert(user.id, vector, digest)
+        for user_id in failed:
+            # A zero row is stored without a hash, so it is never current
+            skill_index.upsert(user_id, [0.0] * (skill_index.dim or EMBEDDING_DIM), None)
+
+
+skill_embeddings = SkillEmbeddingStore(
+    max_entries=int(os.getenv("SKILL_EMBEDDING_CACHE_SIZE", "4096")),
+)
@@ -0,0 +1,92 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.user import User
+
+logger = logging.getLogger("sprintsync")
+
+# Seconds between background reconciles of the gauges against the DB (0 disables)
+GAUGE_REFRESH_INTERVAL = float(os.getenv("METRICS_GAUGE_REFRESH_SECONDS", "60"))
+
+
+class AppGauges:
+    """
+    In-process `active_users` and `tasks_by_status` gauges for /metrics.
+
+    The user and task write paths adjust them as they commit, so a scrape
+    never touches the database. Each worker only sees its own writes (and
+    the DB can be changed directly), so a background refresher periodically
+    replaces the values with a fresh count.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next scrape reconciles from the DB."""
+        self.active_users = 0
+        self.tasks_by_status: Counter = Counter()
+        self.reconciled_at: float | None = None
+
+    # ── write-path hooks ──
+
+    def user_added(self, n: int = 1):
+        with self._lock:
+            self.active_users += n
+
+    def task_added(self, status: str, n: int = 1):
+        with self._lock:
+            self.tasks_by_status[status] += n
+
+    def task_removed(self, status: str, n: int = 1):
+        with self._lock:
+            self.tasks_by_status[status] -= n
+
+    def task_moved(self, old_status: str, new_status: str, n: int = 1):
+        with self._lock:
+            self.tasks_by_status[old_status] -= n
+            self.tasks_by_status[new_status] += n
+
+    # ── reconcile ──
+
+    def reconcile(self, db: Session):
+        active_users = db.scalar(select(func.count(User.id)))
+        by_status = Counter(dict(db.execute(select(Task.status, func.count(Task.id)).group_by(Task.status)).all()))
+        with self._lock:
+            self.active_users = active_users
+            self.tasks_by_status = by_status
+            self.reconciled_at = time.time()
+
+    async def run_refresher(self, session_factory, interval: float):
+        """Reconcile every `interval` seconds until cancelled (started from the app lifespan)."""
+        while True:
+            try:
+                await asyncio.to_thread(self.reconcile_with, session_factory)
+            except Exception as exc:
+                logger.warning("Gauge refresh failed: %s", exc)
+            await asyncio.sleep(interval)
+
+    def reconcile_with(self, session_factory):
+        """Reconcile on a short-lived session from `session_factory`."""
+        with session_factory() as db:
+            self.reconcile(db)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "active_users": self.active_users,
+                "tasks_by_status": {status: n for status, n in sorted(self.tasks_by_status.items()) if n},
+                "gauges_reconciled_at": self.reconciled_at,
+            }
+
+
+app_gauges = AppGauges()
@@ -0,0 +1,311 @@
+import os
+import time
+import asyncio
+import weakref
+
+import google.generativeai as genai
+
+GEMINI_MODEL = "gemini-1.5-flash"
+EMBEDDING_MODEL = "models/gemini-embedding-001"
+
+
+class LLMUnavailable(Exception):
+    """The upstream was not called: circuit open or no capacity before the deadline."""
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+def chunk_text(text: str, size: int = 48) -> list[str]:
+    """Split text into stream-sized pieces (stubs and fakes stream like the real model)."""
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+# ─── Providers ───
+
+class GeminiProvider:
+    """Configures the SDK and builds the model once, not per request."""
+
+    def __init__(self, api_key: str, model: str = GEMINI_MODEL, embedding_model: str = EMBEDDING_MODEL):
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model)
+        self.embedding_model = embedding_model
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    async def stream(self, prompt: str):
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    async def embed(self, text: str) -> list[float]:
+        result = await genai.embed_content_async(
+            model=self.embedding_model,
+            content=text,
+            task_type="retrieval_document",
+        )
+        return result["embedding"]
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        # A list `content` is embedded in one request and returns one vector per text
+        result = await genai.embed_content_async(
+            model=self.embedding_model,
+            content=texts,
+            task_type="retrieval_document",
+        )
+        return result["embedding"]
+
+
+class FakeProvider:
+    """Local stand-in for tests and benchmarks: canned replies, optional latency and failures."""
+
+    def __init__(self, reply: str = "fake completion", dim: int = 768, delay: float = 0.0, fail: bool = False):
+        self.reply = reply
+        self.dim = dim
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def _respond(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("fake provider failure")
+
+    async def generate(self, prompt: str) -> str:
+        await self._respond()
+        return self.reply
+
+    async def stream(self, prompt: str):
+        await self._respond()
+        for chunk in chunk_text(self.reply, 8):
+            yield chunk
+            if self.delay:
+                await asyncio.sleep(self.delay)
+
+    async def embed(self, text: str) -> list[float]:
+        await self._respond()
+        return [1.0] * self.dim
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        await self._respond()
+        return [[1.0] * self.dim for _ in texts]
+
+
+# ─── Circuit breaker ───
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After `failure_threshold` consecutive
+    failures it opens and rejects calls outright; once `reset_timeout`
+    seconds have passed a single probe call is let through (half-open),
+    and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def abandon(self):
+        """The allowed call never reached the upstream; let another caller probe."""
+        self._probing = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+# ─── Client ───
+
+class LLMClient:
+    """
+    Shared entry point for every upstream LLM call.
+
+    At most `max_concurrency` calls are in flight at once; each call,
+    including its wait for a slot, must finish within `timeout` seconds.
+    Failures and timeouts feed the circuit breaker, and while it is open
+    calls raise `CircuitOpenError` immediately so callers can serve their
+    stub instead of waiting on a struggling upstream.
+    """
+
+    def __init__(self, provider, max_concurrency: int = 8, timeout: float = 10.0, breaker: CircuitBreaker | None = None):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        # Semaphores are bound to an event loop; one per loop (a single one in production)
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.short_circuited = 0
+        self.saturated = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def generate(self, prompt: str, timeout: float | None = None) -> str:
+        return await self._call(self.provider.generate, prompt, timeout)
+
+    async def embed(self, text: str, timeout: float | None = None) -> list[float]:
+        return await self._call(self.provider.embed, text, timeout)
+
+    async def embed_many(self, texts: list[str], timeout: float | None = None) -> list[list[float]]:
+        return await self._call(self.provider.embed_many, texts, timeout)
+
+    async def _acquire(self, deadline: float) -> asyncio.Semaphore:
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError("LLM circuit is open")
+
+        semaphore = self._semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            # Local queueing, not an upstream fault: don't trip the breaker
+            self.saturated += 1
+            self.breaker.abandon()
+            raise LLMUnavailable("no LLM capacity before deadline") from None
+        return semaphore
+
+    async def stream(self, prompt: str, timeout: float | None = None):
+        """
+        Yield completion chunks as they arrive. The deadline applies per
+        chunk rather than to the whole generation, so long answers are fine
+        as long as the upstream keeps producing.
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        semaphore = await self._acquire(time.monotonic() + timeout)
+        self.in_flight += 1
+        self.calls += 1
+        chunks = aiter(self.provider.stream(prompt))
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        except TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away mid-stream; says nothing about upstream health
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        else:
+            self.breaker.record_success()
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+            await chunks.aclose()
+
+    async def _call(self, fn, arg, timeout: float | None):
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout)
+        semaphore = await self._acquire(deadline)
+
+        self.in_flight += 1
+        self.calls += 1
+        try:
+            result = await asyncio.wait_for(fn(arg), max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            raise
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+        self.breaker.record_success()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "circuit_state": self.breaker.state,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "calls_total": self.calls,
+            "failures_total": self.failures,
+            "timeouts_total": self.timeouts,
+            "short_circuited_total": self.short_circuited,
+            "saturated_total": self.saturated,
+        }
+
+
+# ─── Process-wide client ───
+
+_client: LLMClient | None = None
+
+
+def get_llm_client() -> LLMClient:
+    """Build the Gemini-backed client on first use; requires GOOGLE_API_KEY."""
+    global _client
+    if _client is None:
+        api_key = os.getenv("GOOGLE_API_KEY", "")
+        if not api_key:
+            raise ValueError("GOOGLE_API_KEY not set")
+        _client = LLMClient(
+            GeminiProvider(api_key),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            timeout=float(os.getenv("LLM_TIMEOUT", "10")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+            ),
+        )
+    return _client
+
+
+def set_llm_client(client: LLMClient | None):
+    """Swap the process-wide client (tests, benchmarks); `None` rebuilds from env on next use."""
+    global _client
+    _client = client
+
+
+def llm_stats() -> dict:
+    return _client.stats() if _client is not None else {}
@@ -0,0 +1,181 @@
+import os
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form, so near-identical prompts share an entry."""
+    return " ".join(prompt.lower().split())
+
+
+def cache_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+class _ComputeAbandoned(Exception):
+    """Set on an in-flight future when the caller computing it was cancelled."""
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM completions.
+
+    Tier 1 is an in-process LRU; tier 2, when `sqlite_path` is set, is an
+    on-disk SQLite table shared by every worker on the host and surviving
+    restarts. Entries expire after `ttl` seconds. `get_or_compute` adds
+    single-flight: concurrent callers for the same key await one upstream
+    call instead of each making their own. Async callers use `aget`/`aput`,
+    which run the SQLite tier in a worker thread instead of on the loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 86400.0, sqlite_path: str | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lru: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()      # LRU and counters
+        self._db_lock = threading.Lock()   # the SQLite connection, used from worker threads
+        self._db: sqlite3.Connection | None = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    # ── tiers ──
+
+    def get(self, key: str) -> str | None:
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = self._disk_get(key)
+        return value
+
+    async def aget(self, key: str) -> str | None:
+        value = self._memory_get(key)
+        if value is None and self._db is not None:
+            value = await asyncio.to_thread(self._disk_get, key)
+        return value
+
+    def put(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._db is not None:
+            self._disk_put(key, value, expires_at)
+
+    async def aput(self, key: str, value: str):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, value, expires_at)
+
+    def _memory_get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self._lru.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._lru[key]
+        return None
+
+    def _disk_get(self, key: str) -> str | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            self._remember(key, row[0], row[1])
+            self.disk_hits += 1
+        return row[0]
+
+    def _disk_put(self, key: str, value: str, expires_at: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._lru[key] = (expires_at, value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    # ── single-flight ──
+
+    async def get_or_compute(self, key: str, compute) -> tuple[str, bool]:
+        """
+        Return (value, from_cache). `compute` is an async callable invoked at
+        most once per key at a time; failures are propagated to every waiter
+        and never cached. If the caller running `compute` is cancelled (a
+        client disconnect), the waiters are not: one of them takes over.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            value = await self.aget(key)
+            if value is not None:
+                return value, True
+
+            pending = self._inflight.get(key)
+            if pending is None or pending.get_loop() is not loop:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending), True
+            except _ComputeAbandoned:
+                self.coalesced -= 1   # retried: counted again as a miss or a coalesced wait
+
+        self.misses += 1
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.set_exception(_ComputeAbandoned())
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            future.set_result(value)   # before the disk write, so waiters never hang on it
+            await self.aput(key, value)
+            return value, False
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits + self.coalesced
+        lookups = hits + self.misses
+        return {
+            "memory_hits_total": self.memory_hits,
+            "disk_hits_total": self.disk_hits,
+            "coalesced_total": self.coalesced,
+            "misses_total": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "entries": len(self._lru),
+        }
+
+
+draft_cache = ResponseCache(
+    max_entries=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+    sqlite_path=os.getenv("LLM_CACHE_SQLITE_PATH") or None,
+)
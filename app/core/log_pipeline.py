@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+import traceback
+
+# No blocking policy: submit() runs on the event loop, where any wait stalls every request
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest")
+
+
+class QueueLogWriter:
+    """
+    Hands structured log records to a background thread that batches,
+    serialises and flushes them, so request handling never waits on
+    `json.dumps`, traceback formatting or a slow stdout.
+
+    The queue is bounded. When it is full the overflow policy decides what
+    happens: `drop_newest` discards the incoming record and `drop_oldest`
+    evicts the oldest queued one. `submit` never waits. Every discarded
+    record is counted; the counters are shared with the writer thread and
+    updated under a lock.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        max_queue: int = 10000,
+        overflow: str = "drop_newest",
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.stream = stream
+        self.overflow = overflow
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._counts_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self._processed = 0  # records taken off the queue (written, failed or evicted)
+
+    # ── producer side (request path) ──
+
+    def submit(self, record: dict, error: BaseException | None = None) -> bool:
+        """Queue a record; `error`'s traceback is formatted on the writer thread."""
+        self._ensure_started()
+        item = (record, error)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow != "drop_oldest" or not self._evict_and_put(item):
+                self._count(dropped=1)
+                return False
+        self._count(enqueued=1)
+        return True
+
+    def _count(self, enqueued: int = 0, written: int = 0, dropped: int = 0, processed: int = 0):
+        with self._counts_lock:
+            self.enqueued += enqueued
+            self.written += written
+            self.dropped += dropped
+            self._processed += processed
+
+    def _evict_and_put(self, item) -> bool:
+        try:
+            self._queue.get_nowait()
+            self._count(dropped=1, processed=1)
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    # ── consumer side (writer thread) ──
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    @staticmethod
+    def _serialise(record: dict, error: BaseException | None) -> str:
+        if error is not None:
+            record["stacktrace"] = "".join(traceback.format_exception(error))
+        return json.dumps(record)
+
+    def _write(self, batch):
+        lines = []
+        for record, error in batch:
+            try:
+                lines.append(self._serialise(record, error))
+            except Exception:
+                pass
+        failed = len(batch) - len(lines)
+        stream = self.stream or sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+            self._count(written=len(lines), dropped=failed, processed=len(batch))
+        except Exception:
+            self._count(dropped=len(batch), processed=len(batch))
+
+    def stop(self, timeout: float = 2.0):
+        """Drain what is queued and stop the writer thread."""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float = 2.0):
+        """Block until everything queued so far has been written (tests, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._processed < self.enqueued and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            return {
+                "log_records_enqueued_total": self.enqueued,
+                "log_records_written_total": self.written,
+                "log_records_dropped_total": self.dropped,
+                "log_queue_depth": self._queue.qsize(),
+            }
+
+
+# ─── Process-wide writer, enabled with LOG_MODE=queue ───
+
+LOG_MODE = os.getenv("LOG_MODE", "sync").lower()
+
+log_writer = QueueLogWriter(
+    max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+    overflow=os.getenv("LOG_OVERFLOW_POLICY", "drop_newest"),
+    batch_size=int(os.getenv("LOG_BATCH_SIZE", "256")),
+    flush_interval=float(os.getenv("LOG_FLUSH_INTERVAL", "0.5")),
+)
+
+
+def queue_logging_enabled() -> bool:
+    return LOG_MODE == "queue"
@@ -0,0 +1,98 @@
+import math
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def bucket_label(upper: float) -> str:
+    return "le_inf" if upper == math.inf else f"le_{upper:g}"
+
+
+class QuantileSketch:
+    """
+    Streaming quantile estimator with bounded memory (DDSketch-style).
+
+    Values are counted in logarithmic bins of width `gamma`, so any reported
+    quantile is within `relative_accuracy` of the true value. Bin indices are
+    clamped to [min_value, max_value], which caps the number of bins no
+    matter how many observations arrive.
+    """
+
+    __slots__ = ("_gamma", "_log_gamma", "_min_key", "_max_key", "bins", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-6, max_value: float = 1e4):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._min_key = self._key(min_value)
+        self._max_key = self._key(max_value)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def bin_key(self, value: float) -> int | None:
+        """Bin a value falls into; None for the zero bucket."""
+        if value <= 0:
+            return None
+        return min(max(self._key(value), self._min_key), self._max_key)
+
+    def add(self, value: float, n: int = 1):
+        self.add_to_bin(self.bin_key(value), n)
+
+    def add_to_bin(self, key: int | None, n: int = 1):
+        """Count `n` values in bin `key`; merging sketches is just adding bins."""
+        self.count += n
+        if key is None:
+            self.zero_count += n
+        else:
+            self.bins[key] = self.bins.get(key, 0) + n
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self._gamma ** key / (self._gamma + 1)
+        return 2 * self._gamma ** self._max_key / (self._gamma + 1)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram plus a quantile sketch; O(1) memory per series."""
+
+    __slots__ = ("counts", "sum", "count", "sketch")
+
+    def __init__(self):
+        self.counts = [0] * (len(DURATION_BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.sketch = QuantileSketch()
+
+    @staticmethod
+    def bucket_index(value: float) -> int:
+        return bisect_left(DURATION_BUCKETS, value)
+
+    def observe(self, value: float):
+        self.counts[self.bucket_index(value)] += 1
+        self.sum += value
+        self.count += 1
+        self.sketch.add(value)
+
+    def cumulative_buckets(self) -> dict[str, int]:
+        """Prometheus-style cumulative counts keyed `le_<bound>`."""
+        out, running = {}, 0
+        for upper, n in zip(DURATION_BUCKETS + (math.inf,), self.counts):
+            running += n
+            out[bucket_label(upper)] = running
+        return out
+
+    def quantiles(self) -> dict[str, float | None]:
+        return {f"p{round(q * 100)}": self.sketch.quantile(q) for q in QUANTILES}
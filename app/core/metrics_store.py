@@ -0,0 +1,195 @@
+import os
+import json
+import mmap
+import glob
+import struct
+import threading
+from collections import defaultdict
+
+from app.core.metrics import Histogram, QuantileSketch
+
+# Series recorded by the app and their label names. Counter values are
+# ints, histogram values are `Histogram`s; both are keyed by a tuple of
+# label values in this order.
+COUNTERS = {
+    "http_requests_total": ("method", "path", "status"),
+    "db_queries_total": ("method", "path"),
+    "db_n_plus_one_total": ("method", "path"),
+}
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("method", "path", "status"),
+    "ai_stream_ttfb_seconds": ("mode", "source"),
+    "db_time_seconds": ("method", "path"),   # DB time per request
+}
+
+
+# ─── Single-process store ───
+
+class MetricsStore:
+    """Plain in-memory series; what a single worker (and the test suite) uses."""
+
+    def __init__(self):
+        self._series = {name: defaultdict(int) for name in COUNTERS}
+        self._series.update({name: defaultdict(Histogram) for name in HISTOGRAMS})
+
+    def inc(self, name: str, key: tuple, amount: int = 1):
+        self._series[name][key] += amount
+
+    def observe(self, name: str, key: tuple, value: float):
+        self._series[name][key].observe(value)
+
+    def collect(self) -> dict:
+        return self._series
+
+
+# ─── Multi-process store ───
+
+_HEADER = struct.Struct("i4x")    # bytes used, padded to 8
+_KEY_LEN = struct.Struct("i")
+_VALUE = struct.Struct("d")
+_INITIAL_SIZE = 1 << 20
+_SKETCH = QuantileSketch()   # only used to map values to sketch bins
+
+
+def _padded(n: int) -> int:
+    return n + (-n % 8)
+
+
+class MmapedValues:
+    """
+    Append-only file of (key, float64) entries, written by a single process
+    and readable by any other. An entry is fully written before the header's
+    used-bytes count moves past it, and values are 8-byte aligned, so a
+    reader never sees a torn entry.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._used = _HEADER.unpack_from(self._map, 0)[0] or _HEADER.size
+        self._positions = {key: pos for key, _, pos in self._entries(self._map, self._used)}
+
+    @staticmethod
+    def _entries(data, used: int):
+        pos = _HEADER.size
+        while pos < used:
+            (length,) = _KEY_LEN.unpack_from(data, pos)
+            start = pos + _KEY_LEN.size
+            key = bytes(data[start:start + length]).decode("utf-8")
+            value_pos = start + _padded(length + _KEY_LEN.size) - _KEY_LEN.size
+            yield key, _VALUE.unpack_from(data, value_pos)[0], value_pos
+            pos = value_pos + _VALUE.size
+
+    @classmethod
+    def read(cls, path: str) -> list[tuple[str, float]]:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            return []
+        used = _HEADER.unpack_from(data, 0)[0]
+        return [(key, value) for key, value, _ in cls._entries(data, used)]
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        entry_size = _padded(_KEY_LEN.size + len(encoded)) + _VALUE.size
+        while self._used + entry_size > len(self._map):
+            self._map.close()
+            self._file.truncate(os.fstat(self._file.fileno()).st_size * 2)
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        pos = self._used
+        _KEY_LEN.pack_into(self._map, pos, len(encoded))
+        self._map[pos + _KEY_LEN.size:pos + _KEY_LEN.size + len(encoded)] = encoded
+        value_pos = pos + entry_size - _VALUE.size
+        _VALUE.pack_into(self._map, value_pos, 0.0)
+        self._used += entry_size
+        _HEADER.pack_into(self._map, 0, self._used)
+        self._positions[key] = value_pos
+        return value_pos
+
+    def inc(self, key: str, amount: float):
+        with self._lock:
+            pos = self._positions.get(key)
+            if pos is None:
+                pos = self._append(key)
+            _VALUE.pack_into(self._map, pos, _VALUE.unpack_from(self._map, pos)[0] + amount)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class MultiProcessMetricsStore:
+    """
+    Each worker writes its series to `<directory>/metrics_<pid>.db`; a
+    scrape on any worker reads and sums every file, so `/metrics` reports
+    the whole server rather than whichever worker answered. Histograms are
+    stored as bucket counts, sum, count and sketch bins, all of which merge
+    by addition. Files of exited workers are kept so counters never go
+    backwards; empty the directory before starting the server.
+    """
+
+    def __init__(self, directory: str, pid: int | None = None):
+        self.directory = directory
+        self._pid = pid
+        self._values: MmapedValues | None = None
+        self._values_pid: int | None = None
+
+    def _file(self) -> MmapedValues:
+        pid = self._pid or os.getpid()
+        if self._values is None or self._values_pid != pid:
+            # Reopen after a fork so each worker owns its own file
+            self._values = MmapedValues(os.path.join(self.directory, f"metrics_{pid}.db"))
+            self._values_pid = pid
+        return self._values
+
+    @staticmethod
+    def _prefix(name: str, key: tuple) -> str:
+        return json.dumps([name, list(key)]) + "|"
+
+    def inc(self, name: str, key: tuple, amount: int = 1):
+        self._file().inc(self._prefix(name, key) + "value", amount)
+
+    def observe(self, name: str, key: tuple, value: float):
+        values, prefix = self._file(), self._prefix(name, key)
+        bin_key = _SKETCH.bin_key(value)
+        values.inc(f"{prefix}b{Histogram.bucket_index(value)}", 1)
+        values.inc(f"{prefix}k{'z' if bin_key is None else bin_key}", 1)
+        values.inc(prefix + "sum", value)
+
+    def collect(self) -> dict:
+        series = MetricsStore().collect()
+        for path in glob.glob(os.path.join(self.directory, "metrics_*.db")):
+            for field, value in MmapedValues.read(path):
+                head, _, part = field.rpartition("|")
+                name, labels = json.loads(head)
+                key = tuple(labels)
+                if name in COUNTERS:
+                    series[name][key] += int(value)
+                    continue
+                hist, n = series[name][key], int(value)
+                if part == "sum":
+                    hist.sum += value
+                elif part[0] == "b":
+                    hist.counts[int(part[1:])] += n
+                    hist.count += n
+                else:
+                    hist.sketch.add_to_bin(None if part == "kz" else int(part[1:]), n)
+        return series
+
+
+# ─── Process-wide store ───
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+
+metrics_store = (
+    MultiProcessMetricsStore(METRICS_MULTIPROC_DIR) if METRICS_MULTIPROC_DIR else MetricsStore()
+)
+
+
+def get_metrics_store() -> dict:
+    """{series name: {label values: int | Histogram}}, aggregated across workers when multiprocess."""
+    return metrics_store.collect()
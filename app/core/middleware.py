@@ -2,77 +2,111 @@ import time
 import json
 import logging
 import traceback
-from collections import defaultdict
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-from jose import jwt, JWTError
-import os
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics_store import metrics_store
+from app.core.security import decode_access_token, TOKEN_CLAIMS_STATE_KEY
+from app.core.log_pipeline import log_writer, queue_logging_enabled
+from app.db.query_stats import RequestQueryStats, begin_request, end_request
 
 logger = logging.getLogger("sprintsync")
 
-# ─── In-memory metrics store ───
+# Label used for requests that matched no route, so scanners probing random
+# paths cannot blow up the number of series.
+UNMATCHED_ROUTE = "<unmatched>"
 
-_metrics = {
-    "http_requests_total": defaultdict(int),       # key: (method, path, status)
-    "http_request_duration_seconds": [],            # list of (method, path, duration)
-}
 
+# ─── Middleware ───
 
-def get_metrics_store():
-    return _metrics
+class ObservabilityMiddleware:
+    """
+    Pure ASGI middleware: logs and records metrics for every HTTP request
+    without BaseHTTPMiddleware's task and stream wrapping. The bearer token
+    is verified here once and its claims are left on the request state for
+    `get_current_user` to reuse. SQL issued while handling the request is
+    attributed to it through a context variable (see `app/db/query_stats.py`).
+    """
 
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-# ─── Middleware ───
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class ObservabilityMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
         start = time.perf_counter()
-        user_id = self._extract_user_id(request)
+        query_token = begin_request()
+        claims = self._authenticate(scope)
+        user_id = claims.get("sub") if claims else None
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
             duration = time.perf_counter() - start
-            self._log_request(request, 500, duration, user_id, error=exc)
-            self._record_metric(request, 500, duration)
+            queries = end_request(query_token)
+            self._log_request(scope, 500, duration, user_id, queries, error=exc)
+            self._record_metric(scope, 500, duration, queries)
             raise
 
         duration = time.perf_counter() - start
-        self._log_request(request, response.status_code, duration, user_id)
-        self._record_metric(request, response.status_code, duration)
-        return response
+        queries = end_request(query_token)
+        self._log_request(scope, status_code, duration, user_id, queries)
+        self._record_metric(scope, status_code, duration, queries)
 
     @staticmethod
-    def _extract_user_id(request: Request) -> str | None:
-        auth_header = request.headers.get("authorization", "")
+    def _authenticate(scope: Scope) -> dict | None:
+        auth_header = ""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
         if not auth_header.startswith("Bearer "):
             return None
         token = auth_header[7:]
-        try:
-            secret = os.getenv("SECRET_KEY", "super-secret-key")
-            payload = jwt.decode(token, secret, algorithms=["HS256"])
-            return payload.get("sub")
-        except JWTError:
-            return None
+        claims = decode_access_token(token)
+        scope.setdefault("state", {})[TOKEN_CLAIMS_STATE_KEY] = (token, claims)
+        return claims
 
     @staticmethod
     def _log_request(
-        request: Request,
+        scope: Scope,
         status_code: int,
         duration: float,
         user_id: str | None,
+        queries: RequestQueryStats,
         error: Exception | None = None,
     ):
         log_entry = {
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
-            "method": request.method,
-            "path": str(request.url.path),
+            "method": scope["method"],
+            "path": scope["path"],
             "userId": user_id,
             "status_code": status_code,
             "latency_ms": round(duration * 1000, 2),
+            "db_queries": queries.count,
+            "db_time_ms": round(queries.total_seconds * 1000, 2),
         }
+        if queries.slowest_statement is not None:
+            log_entry["db_slowest_ms"] = round(queries.slowest_seconds * 1000, 2)
+            log_entry["db_slowest_statement"] = queries.slowest_statement[:500]
+        if queries.repeated:
+            log_entry["db_n_plus_one"] = sorted(queries.repeated)
+
+        if queue_logging_enabled():
+            # Serialisation and traceback formatting happen on the writer thread
+            if error or status_code >= 500:
+                log_entry["error"] = str(error) if error else "Internal Server Error"
+            log_writer.submit(log_entry, error)
+            return
 
         if error or status_code >= 500:
             log_entry["error"] = str(error) if error else "Internal Server Error"
@@ -82,8 +116,19 @@ class ObservabilityMiddleware(BaseHTTPMiddleware):
             logger.info(json.dumps(log_entry))
 
     @staticmethod
-    def _record_metric(request: Request, status_code: int, duration: float):
-        path = str(request.url.path)
-        method = request.method
-        _metrics["http_requests_total"][(method, path, status_code)] += 1
-        _metrics["http_request_duration_seconds"].append((method, path, duration))
+    def _route_template(scope: Scope) -> str:
+        route = scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+    @classmethod
+    def _record_metric(cls, scope: Scope, status_code: int, duration: float, queries: RequestQueryStats):
+        route = cls._route_template(scope)
+        key = (scope["method"], route, status_code)
+        metrics_store.inc("http_requests_total", key)
+        metrics_store.observe("http_request_duration_seconds", key, duration)
+
+        route_key = (scope["method"], route)
+        metrics_store.inc("db_queries_total", route_key, queries.count)
+        metrics_store.observe("db_time_seconds", route_key, queries.total_seconds)
+        if queries.repeated:
+            metrics_store.inc("db_n_plus_one_total", route_key)
@@ -0,0 +1,44 @@
+import json
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import String, type_coerce
+
+
+def sort_key(column, dialect: str):
+    """
+    The expression a keyset page orders and compares on. SQLite stores
+    timestamps as text, in two shapes: 'YYYY-MM-DD HH:MM:SS' from
+    CURRENT_TIMESTAMP and '... HH:MM:SS.ffffff' when written from Python.
+    Its index orders that text, so the cursor carries the stored text and is
+    compared as text; a bound datetime would never equal the stored value.
+    """
+    return type_coerce(column, String) if dialect == "sqlite" else column
+
+
+def encode_cursor(sort: str, last_id: int, last_value: datetime | str | None = None) -> str:
+    """Opaque keyset cursor pointing just past the last row of a page."""
+    payload = {"s": sort, "id": last_id}
+    if last_value is not None:
+        payload["v"] = last_value if isinstance(last_value, str) else last_value.isoformat()
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, as_text: bool = False) -> tuple[int, datetime | str | None]:
+    """
+    Return (last_id, last_value) from a cursor, or 400 if it is malformed or
+    for another sort. `as_text` keeps the value as stored (see `sort_key`).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["s"] != sort:
+            raise ValueError("cursor was issued for a different sort")
+        value = datetime.fromisoformat(payload["v"]) if "v" in payload else None
+        if as_text and value is not None:
+            value = payload["v"]
+        return int(payload["id"]), value
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {exc}")
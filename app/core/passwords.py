@@ -0,0 +1,125 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.core.metrics import Histogram
+
+# bcrypt cost factor for new hashes; existing hashes at another cost are
+# upgraded transparently on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# ─── Sync primitives (also what the worker processes run) ───
+
+def _truncate(password: str) -> str:
+    # bcrypt supports max 72 bytes
+    return password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    # Cost is passed explicitly so worker processes follow the parent's setting
+    bcrypt = pwd_context.handler("bcrypt").using(rounds=rounds or BCRYPT_ROUNDS)
+    return bcrypt.hash(_truncate(password))
+
+
+def verify_password(plain_password, hashed_password) -> bool:
+    return pwd_context.verify(_truncate(plain_password), hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """True when pwd_context would hash differently now (another bcrypt cost or a deprecated scheme)."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except ValueError:   # passlib's UnknownHashError
+        return True
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+# ─── Process pool ───
+
+class PasswordPool:
+    """
+    Dedicated process pool for bcrypt so hashing neither holds the GIL nor
+    occupies the threadpool shared by sync endpoints. At most `max_pending`
+    jobs may be queued or running; beyond that requests are shed with a 503
+    instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait = Histogram()   # time queued before a worker picked the job up
+        self.work = Histogram()   # time spent inside bcrypt
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
+
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, work_seconds = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self.work.observe(work_seconds)
+        self.wait.observe(max(time.perf_counter() - start - work_seconds, 0.0))
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "bcrypt_rounds": BCRYPT_ROUNDS,
+            "queue_depth": self.pending,
+            "max_pending": self.max_pending,
+            "completed_total": self.completed,
+            "rejected_total": self.rejected,
+            "wait_seconds": {"count": self.wait.count, "sum": round(self.wait.sum, 6), **self.wait.quantiles()},
+            "work_seconds": {"count": self.work.count, "sum": round(self.work.sum, 6), **self.work.quantiles()},
+        }
+
+
+password_pool = PasswordPool(
+    workers=int(os.getenv("PASSWORD_POOL_SIZE", str(min(4, os.cpu_count() or 1)))),
+    max_pending=int(os.getenv("PASSWORD_POOL_MAX_PENDING", "64")),
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password, BCRYPT_ROUNDS)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
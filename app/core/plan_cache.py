@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+
+
+class PlanCache:
+    """
+    Last generated daily plan per user, tagged with the version of the task
+    set it was built from: (task count, max `updated_at`, total logged
+    minutes, today's date). Logging time does not touch `updated_at`, so
+    the minutes are part of the version on their own.
+
+    A lookup costs one aggregate query; if the version still matches, the
+    plan is served without loading tasks or calling the LLM. Task writes in
+    `app/api/routes/tasks.py` also invalidate the owner's entry, which covers
+    edits that land within the timestamp's resolution. Writes made by other
+    workers are caught by the version check.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[tuple, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    async def version(db: AsyncSession, user_id: int) -> tuple:
+        count, last_updated, minutes = (await db.execute(
+            select(func.count(Task.id), func.max(Task.updated_at), func.coalesce(func.sum(Task.total_minutes), 0))
+            .where(Task.user_id == user_id)
+        )).one()
+        return count, str(last_updated), int(minutes), date.today().isoformat()
+
+    def get(self, user_id: int, version: tuple) -> str | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user_id: int, version: tuple, plan: str):
+        with self._lock:
+            self._entries[user_id] = (version, plan)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *user_ids: int):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "plan_cache_hits_total": self.hits,
+            "plan_cache_misses_total": self.misses,
+            "plan_cache_size": len(self._entries),
+        }
+
+
+plan_cache = PlanCache(max_entries=int(os.getenv("PLAN_CACHE_SIZE", "10000")))
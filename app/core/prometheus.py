@@ -0,0 +1,75 @@
+import re
+import math
+
+from app.core.metrics import DURATION_BUCKETS
+from app.core.metrics_store import COUNTERS, HISTOGRAMS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "sprintsync_"
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_]")
+_LE = tuple(f"{upper:g}" for upper in DURATION_BUCKETS) + ("+Inf",)
+
+
+def wants_prometheus(accept: str | None, fmt: str | None) -> bool:
+    """`?format=prometheus` or a scraper's Accept header (text/plain, OpenMetrics) selects text."""
+    if fmt:
+        return fmt.lower() in ("prometheus", "text")
+    accept = (accept or "").lower()
+    return "text/plain" in accept or "openmetrics" in accept
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def render_prometheus(series: dict, tasks_by_status: dict, stats: dict) -> str:
+    """
+    Prometheus text exposition (v0.0.4) written in one pass over the
+    series store. Nested component stats are flattened into untyped
+    `sprintsync_*` samples; non-numeric values are skipped.
+    """
+    lines = []
+    out = lines.append
+
+    for name, label_names in COUNTERS.items():
+        out(f"# TYPE {name} counter")
+        for key, value in series[name].items():
+            out(f"{name}{{{_labels(label_names, key)}}} {value}")
+
+    for name, label_names in HISTOGRAMS.items():
+        out(f"# TYPE {name} histogram")
+        for key, hist in series[name].items():
+            labels = _labels(label_names, key)
+            running = 0
+            for le, n in zip(_LE, hist.counts):
+                running += n
+                out(f'{name}_bucket{{{labels},le="{le}"}} {running}')
+            out(f"{name}_sum{{{labels}}} {_number(hist.sum)}")
+            out(f"{name}_count{{{labels}}} {hist.count}")
+
+    out(f"# TYPE {PREFIX}tasks gauge")
+    for status, n in tasks_by_status.items():
+        out(f'{PREFIX}tasks{{status="{_escape(status)}"}} {n}')
+
+    _flatten(out, PREFIX.rstrip("_"), stats)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _flatten(out, name: str, value):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(out, f"{name}_{key}", child)
+    elif isinstance(value, (int, float)) and not (isinstance(value, float) and math.isnan(value)):
+        out(f"{_INVALID_NAME.sub('_', name)} {_number(value)}")
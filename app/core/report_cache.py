@@ -0,0 +1,66 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+
+class ReportCache:
+    """
+    Computed `/reports` results keyed by (window, filters).
+
+    Any task or time write clears the whole cache: a single write can move
+    numbers in every window that contains it, and reports are cheap to
+    rebuild compared with tracking which windows a write touched. Writes
+    made by other workers are not seen, so entries also expire after `ttl`
+    seconds. A result computed while a write landed is not stored
+    (`generation` changed), so a stale report never outlives the write.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, report: dict, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic(), report)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    clear = invalidate
+
+    def stats(self) -> dict:
+        return {
+            "hits_total": self.hits,
+            "misses_total": self.misses,
+            "size": len(self._entries),
+        }
+
+
+report_cache = ReportCache(
+    max_entries=int(os.getenv("REPORT_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("REPORT_CACHE_TTL", "300")),
+)
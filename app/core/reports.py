@@ -0,0 +1,220 @@
+import os
+import csv
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+
+# Estimates sheet: Story, Task, Estimate min (hr), Estimate max (hr), Actual, Comment
+ESTIMATES_CSV = os.getenv("ESTIMATES_CSV", str(Path(__file__).resolve().parents[2] / "Estimates.csv"))
+
+_estimates_lock = threading.Lock()
+_estimates_cache: dict[str, tuple[float, dict]] = {}   # path -> (mtime, estimates)
+
+
+# ─── Estimates ───
+
+def normalize_title(title: str) -> str:
+    return title.strip().lower()
+
+
+def load_estimates(path: str = ESTIMATES_CSV) -> dict[str, tuple[float, float]]:
+    """{normalized task title: (min minutes, max minutes)}; re-read only when the file changes."""
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return {}
+    with _estimates_lock:
+        cached = _estimates_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    estimates = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            title = (row.get("Task") or "").strip()
+            try:
+                low, high = float(row["Estimate min (hr)"]), float(row["Estimate max (hr)"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if title:
+                estimates[normalize_title(title)] = (low * 60, high * 60)
+    with _estimates_lock:
+        _estimates_cache[path] = (mtime, estimates)
+    return estimates
+
+
+# ─── Aggregation ───
+
+def _seconds_since_creation(column, dialect: str):
+    """column - created_at in seconds, computed by the database (no datetime parsing per row)."""
+    if dialect == "sqlite":
+        return (func.julianday(column) - func.julianday(Task.created_at)) * 86400
+    return func.extract("epoch", column - Task.created_at)
+
+
+def _summary(values: np.ndarray) -> dict:
+    if not len(values):
+        return {"mean": None, "p50": None, "p90": None}
+    p50, p90 = np.percentile(values, [50, 90])
+    return {"mean": round(float(values.mean()), 2), "p50": round(float(p50), 2), "p90": round(float(p90), 2)}
+
+
+def _grouped(keys: np.ndarray, values: np.ndarray) -> dict:
+    """Split `values` by `keys` with one sort instead of one mask per key."""
+    if not len(keys):
+        return {}
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    uniques, starts = np.unique(keys, return_index=True)
+    return dict(zip(uniques.tolist(), np.split(values, starts[1:])))
+
+
+def _in_window(column, start: date, end: date):
+    return and_(
+        column >= datetime.combine(start, datetime.min.time()),
+        column < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+    )
+
+
+def _task_filters(user_id: int | None, status: str | None) -> list:
+    filters = []
+    if user_id is not None:
+        filters.append(Task.assigned_to == user_id)
+    if status is not None:
+        filters.append(Task.status == status)
+    return filters
+
+
+def _user_order(item: tuple) -> tuple:
+    # Assignee ids in numeric order, unassigned last
+    return (item[0] is None, item[0] or 0)
+
+
+def _estimate_accuracy(db: Session, filters: list, estimates: dict) -> dict:
+    """Tasks completed in the window matched to the estimates sheet by title, compared with their logged minutes."""
+    rows = db.execute(
+        select(Task.id, Task.title, Task.assigned_to, Task.total_minutes)
+        .where(*filters, Task.status == "DONE", func.lower(func.trim(Task.title)).in_(list(estimates)))
+        .order_by(Task.id)
+    ).all() if estimates else []
+
+    tasks, by_user = [], {}
+    for row in rows:
+        low, high = estimates[normalize_title(row.title)]
+        actual = row.total_minutes or 0
+        midpoint = (low + high) / 2
+        error_pct = (actual - midpoint) / midpoint * 100 if midpoint else None
+        tasks.append({
+            "task_id": row.id,
+            "title": row.title,
+            "assigned_to": row.assigned_to,
+            "estimate_min_minutes": low,
+            "estimate_max_minutes": high,
+            "actual_minutes": actual,
+            "within_range": low <= actual <= high,
+            "error_pct": None if error_pct is None else round(error_pct, 1),
+        })
+        by_user.setdefault(row.assigned_to, []).append(tasks[-1])
+
+    def accuracy(items: list[dict]) -> dict:
+        midpoints = np.array([(t["estimate_min_minutes"] + t["estimate_max_minutes"]) / 2 for t in items])
+        actuals = np.array([t["actual_minutes"] for t in items], dtype=np.float64)
+        errors = ((actuals - midpoints) / midpoints * 100)[midpoints > 0] if items else np.empty(0)
+        within = sum(t["within_range"] for t in items)
+        return {
+            "matched": len(items),
+            "within_range": within,
+            "within_range_ratio": round(within / len(items), 3) if items else None,
+            "mean_abs_error_pct": round(float(np.abs(errors).mean()), 1) if len(errors) else None,
+            "mean_error_pct": round(float(errors.mean()), 1) if len(errors) else None,   # > 0: underestimated
+        }
+
+    matched_titles = {normalize_title(t["title"]) for t in tasks}
+    return {
+        **accuracy(tasks),
+        "by_user": [{"user_id": user_id, **accuracy(items)} for user_id, items in sorted(by_user.items(), key=_user_order)],
+        "unmatched_estimates": sorted(title for title in estimates if title not in matched_titles),
+        "tasks": tasks,
+    }
+
+
+def task_report(db: Session, start: date, end: date, user_id: int | None = None,
+                status: str | None = None, estimates: dict | None = None) -> dict:
+    """
+    Throughput, cycle time and workload per assignee and per status for
+    tasks created or completed in [start, end], plus estimate accuracy.
+    Throughput and cycle time (created_at to completed_at) count only tasks
+    completed in the window. Task columns are fetched once as tuples and
+    aggregated with NumPy; no ORM objects.
+    """
+    filters = _task_filters(user_id, status)
+    completed = _in_window(Task.completed_at, start, end)
+    # Tasks created or completed in the window; time logs and edits do not move a task into it
+    in_window = or_(_in_window(Task.created_at, start, end), completed)
+    dialect = db.get_bind().dialect.name
+    rows = db.execute(
+        select(
+            Task.status, func.coalesce(Task.assigned_to, -1), func.coalesce(Task.total_minutes, 0),
+            case((completed, 1), else_=0),
+            _seconds_since_creation(Task.completed_at, dialect),
+            _seconds_since_creation(Task.updated_at, dialect),
+        )
+        .where(in_window, *filters)
+    ).all()
+    n = len(rows)
+    statuses, assignees, minutes, done, cycle, elapsed = zip(*rows) if rows else ((),) * 6
+
+    statuses = np.array(statuses, dtype=object)
+    assignees = np.array(assignees, dtype=np.int64)
+    minutes = np.array(minutes, dtype=np.float64)
+    done = np.array(done, dtype=bool)
+    cycle_hours = np.array(cycle, dtype=np.float64) / 3600        # NaN for tasks not completed
+    update_hours = np.array(elapsed, dtype=np.float64) / 3600
+    days = (end - start).days + 1
+
+    by_user = []
+    cycle_by_user = _grouped(assignees[done], cycle_hours[done])
+    users, inverse = np.unique(assignees, return_inverse=True)
+    tasks_n = np.bincount(inverse, minlength=len(users))
+    done_n = np.bincount(inverse, weights=done, minlength=len(users))
+    minutes_n = np.bincount(inverse, weights=minutes, minlength=len(users))
+    for i, user in enumerate(users.tolist()):
+        by_user.append({
+            "user_id": None if user == -1 else user,
+            "tasks": int(tasks_n[i]),
+            "done": int(done_n[i]),
+            "throughput_per_day": round(float(done_n[i]) / days, 3),
+            "minutes_logged": int(minutes_n[i]),
+            "cycle_time_hours": _summary(cycle_by_user.get(user, np.empty(0))),
+        })
+
+    by_status = []
+    for status_name, ages in sorted(_grouped(statuses, update_hours).items()):
+        mask = statuses == status_name
+        by_status.append({
+            "status": status_name,
+            "tasks": int(mask.sum()),
+            "minutes_logged": int(minutes[mask].sum()),
+            # Hours from creation to the last edit of the task (time logs do not count as edits)
+            "hours_to_last_update": _summary(ages),
+        })
+
+    return {
+        "window": {"start": start.isoformat(), "end": end.isoformat(), "days": days},
+        "filters": {"user_id": user_id, "status": status},
+        "tasks": n,
+        "done": int(done.sum()),
+        "throughput_per_day": round(float(done.sum()) / days, 3),
+        "cycle_time_hours": _summary(cycle_hours[done]),
+        "by_user": by_user,
+        "by_status": by_status,
+        "estimates": _estimate_accuracy(
+            db, [completed, *filters], load_estimates() if estimates is None else estimates
+        ),
+    }
@@ -1,40 +1,20 @@
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, Request
 from jose import JWTError
 from sqlalchemy.orm import Session
 
-from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
 import os
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-# pwd_context = CryptContext(
-#     schemes=["bcrypt_sha256"],
-#     deprecated="auto"
-# )
+# Password hashing lives in app.core.passwords (process pool, configurable cost)
+from app.core.passwords import pwd_context, hash_password, verify_password
 
 SECRET_KEY = os.getenv("SECRET_KEY", "super-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 
-# def hash_password(password: str) -> str:
-#     return pwd_context.hash(password)
-
-
-# def verify_password(plain_password, hashed_password):
-#     return pwd_context.verify(plain_password, hashed_password)
-
-def hash_password(password: str) -> str:
-    # bcrypt supports max 72 bytes
-    password = password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-    return pwd_context.hash(password)
-
-def verify_password(plain_password, hashed_password):
-    plain_password = plain_password.encode("utf-8")[:72].decode("utf-8", errors="ignore")
-    return pwd_context.verify(plain_password, hashed_password)
-
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -43,35 +23,66 @@ def create_access_token(data: dict):
 
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def decode_access_token(token: str) -> dict | None:
+    """Verify a bearer token and return its claims, or None if it is invalid."""
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
+# Key under request.state where ObservabilityMiddleware leaves (token, claims)
+TOKEN_CLAIMS_STATE_KEY = "token_claims"
+
+
+def token_claims(request: Request, token: str) -> dict | None:
+    """
+    Claims for `token`, reusing the ones the middleware already verified for
+    this request so the JWT is decoded once. Falls back to decoding when the
+    middleware is absent or saw a different token.
+    """
+    verified = request.scope.get("state", {}).get(TOKEN_CLAIMS_STATE_KEY)
+    if verified is not None and verified[0] == token:
+        return verified[1]
+    return decode_access_token(token)
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 from app.db.session import get_db
 from app.models.user import User
+from app.core.principal_cache import Principal, principal_cache
 
 
 def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-):
+) -> Principal:
 
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials"
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-
-        if user_id is None:
-            raise credentials_exception
+    payload = token_claims(request, token)
+    if payload is None:
+        raise credentials_exception
 
-    except JWTError:
+    user_id: str = payload.get("sub")
+    if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Cached principals skip the users lookup entirely
+    principal = principal_cache.get(int(user_id))
+    if principal is not None:
+        return principal
+
+    row = db.query(User.id, User.email, User.is_admin, User.skills).filter(User.id == int(user_id)).first()
 
-    if user is None:
+    if row is None:
         raise credentials_exception
 
-    return user
\ No newline at end of file
+    principal = Principal(id=row.id, email=row.email, is_admin=bool(row.is_admin), skills=row.skills)
+    principal_cache.put(principal)
+    return principal
\ No newline at end of file
@@ -0,0 +1,125 @@
+import numpy as np
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, in O(n + k log k)."""
+    n = scores.shape[0]
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+class SkillIndex:
+    """
+    In-memory matrix of L2-normalised skill vectors, one row per user.
+
+    Rows live in a contiguous float32 buffer that grows geometrically, so
+    upserts are amortised O(dim) and scoring every user is a single
+    matrix-vector product. Each row remembers the skills hash it was built
+    from, which lets callers detect stale rows cheaply.
+    """
+
+    def __init__(self, initial_capacity: int = 64):
+        self._initial_capacity = initial_capacity
+        self._matrix: np.ndarray | None = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._rows: dict[int, int] = {}            # user_id -> row
+        self._hashes: dict[int, str | None] = {}   # user_id -> skills hash
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dim(self) -> int | None:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    @property
+    def user_ids(self) -> set[int]:
+        return set(self._rows)
+
+    def is_current(self, user_id: int, digest: str) -> bool:
+        return self._hashes.get(user_id) == digest
+
+    def _reset(self, dim: int):
+        self._matrix = np.zeros((self._initial_capacity, dim), dtype=np.float32)
+        self._ids = np.zeros(self._initial_capacity, dtype=np.int64)
+        self._size = 0
+        self._rows.clear()
+        self._hashes.clear()
+
+    def _grow(self):
+        capacity = self._matrix.shape[0] * 2
+        matrix = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+        matrix[: self._size] = self._matrix[: self._size]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[: self._size] = self._ids[: self._size]
+        self._matrix, self._ids = matrix, ids
+
+    def upsert(self, user_id: int, vector, digest: str | None):
+        """
+        Insert or replace a user's row. An all-zero vector carries no signal
+        (embeddings disabled), so it is stored without a hash and will be
+        treated as stale on the next sync.
+        """
+        vec = np.asarray(vector, dtype=np.float32)
+        if self._matrix is None or self._matrix.shape[1] != vec.shape[0]:
+            # First vector, or the embedding model changed dimension.
+            self._reset(vec.shape[0])
+
+        norm = float(np.linalg.norm(vec))
+        if norm:
+            vec = vec / norm
+        else:
+            digest = None
+
+        row = self._rows.get(user_id)
+        if row is None:
+            if self._size == self._matrix.shape[0]:
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._rows[user_id] = row
+            self._ids[row] = user_id
+        self._matrix[row] = vec
+        self._hashes[user_id] = digest
+
+    def clear(self):
+        self._matrix = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._rows.clear()
+        self._hashes.clear()
+
+    def remove(self, user_id: int):
+        row = self._rows.pop(user_id, None)
+        self._hashes.pop(user_id, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            # Move the last row into the hole to keep the buffer contiguous.
+            moved_id = int(self._ids[last])
+            self._matrix[row] = self._matrix[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._size = last
+
+    def score(self, query) -> tuple[np.ndarray, np.ndarray]:
+        """Cosine similarity of `query` against every row: (user_ids, similarities)."""
+        if self._size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        q = np.asarray(query, dtype=np.float32)
+        if q.shape[0] != self._matrix.shape[1]:
+            raise ValueError(f"query has dim {q.shape[0]}, index has dim {self._matrix.shape[1]}")
+        norm = float(np.linalg.norm(q))
+        if not norm:
+            return self._ids[: self._size].copy(), np.zeros(self._size, dtype=np.float32)
+        sims = self._matrix[: self._size] @ (q / norm)
+        return self._ids[: self._size].copy(), sims
+
+
+skill_index = SkillIndex()
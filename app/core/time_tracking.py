@@ -0,0 +1,118 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.time_entry import TimeEntry, UserDailyMinutes
+
+ENTRY_COLUMNS = tuple(
+    getattr(TimeEntry, c) for c in ("id", "task_id", "user_id", "minutes", "work_date", "kind", "note", "created_at")
+)
+
+
+def today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _upsert_rollups(db: Session, per_day: dict[tuple[int, date], list[int]]):
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(UserDailyMinutes).values([
+        {"user_id": user_id, "work_date": day, "minutes": minutes, "entries": n}
+        for (user_id, day), (minutes, n) in sorted(per_day.items())   # fixed order: no upsert deadlocks
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserDailyMinutes.user_id, UserDailyMinutes.work_date],
+        set_={
+            "minutes": UserDailyMinutes.minutes + stmt.excluded.minutes,
+            "entries": UserDailyMinutes.entries + stmt.excluded.entries,
+        },
+    ))
+
+
+def record_time(db: Session, entries: list[dict], update_totals: bool = True) -> list:
+    """
+    Append time entries (task_id, user_id, minutes, work_date, kind, note)
+    inside the caller's transaction: one multi-row INSERT for the entries,
+    one upsert for the per-(user, day) rollups and an in-SQL increment of
+    each task's `total_minutes`, so concurrent loggers never lose minutes.
+    Pass `update_totals=False` when the tasks were inserted with their total.
+    """
+    rows = db.execute(
+        insert(TimeEntry).returning(*ENTRY_COLUMNS, sort_by_parameter_order=True),
+        [{"kind": "log", "note": None, **entry} for entry in entries],
+    ).all()
+
+    per_day: dict[tuple[int, date], list[int]] = defaultdict(lambda: [0, 0])
+    per_task: dict[int, int] = defaultdict(int)
+    for entry in entries:
+        rollup = per_day[(entry["user_id"], entry["work_date"])]
+        rollup[0] += entry["minutes"]
+        rollup[1] += 1
+        per_task[entry["task_id"]] += entry["minutes"]
+    _upsert_rollups(db, per_day)
+
+    if update_totals:
+        for task_id, minutes in sorted(per_task.items()):
+            db.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                # Logging time is not an edit of the task: keep updated_at where it was
+                .values(total_minutes=func.coalesce(Task.total_minutes, 0) + minutes, updated_at=Task.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+    return rows
+
+
+def remove_task_time(db: Session, task_id: int):
+    """
+    Delete a task's time entries and take their minutes back out of the
+    per-(user, day) rollups, inside the caller's transaction. Call before
+    deleting the task: the FK cascade would drop the entries but leave
+    their minutes in the rollup (and SQLite does not cascade at all).
+    One DELETE ... RETURNING when the task has no time; the rollup
+    statements only run when it does.
+    """
+    removed = db.execute(
+        delete(TimeEntry).where(TimeEntry.task_id == task_id)
+        .returning(TimeEntry.user_id, TimeEntry.work_date, TimeEntry.minutes)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not removed:
+        return
+    per_day: dict[tuple[int, date], list[int]] = defaultdict(lambda: [0, 0])
+    for user_id, day, minutes in removed:
+        rollup = per_day[(user_id, day)]
+        rollup[0] -= minutes
+        rollup[1] -= 1
+    _upsert_rollups(db, per_day)
+    # Days left with no entries at all would otherwise show up as 0-minute days
+    db.execute(
+        delete(UserDailyMinutes)
+        .where(UserDailyMinutes.user_id.in_({user_id for user_id, _ in per_day}), UserDailyMinutes.entries <= 0)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def minutes_by_user(db: Session, start: date, end: date, user_id: int | None = None) -> list[dict]:
+    """Per-user totals and per-day minutes for [start, end], read from the rollup table only."""
+    stmt = (
+        select(UserDailyMinutes.user_id, UserDailyMinutes.work_date, UserDailyMinutes.minutes)
+        .where(UserDailyMinutes.work_date.between(start, end))
+        .order_by(UserDailyMinutes.user_id, UserDailyMinutes.work_date)
+    )
+    if user_id is not None:
+        stmt = stmt.where(UserDailyMinutes.user_id == user_id)
+
+    users: dict[int, dict] = {}
+    for row in db.execute(stmt):
+        summary = users.setdefault(row.user_id, {"user_id": row.user_id, "total_minutes": 0, "days": {}})
+        summary["total_minutes"] += row.minutes
+        summary["days"][row.work_date] = row.minutes
+    return list(users.values())
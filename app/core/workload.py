@@ -0,0 +1,74 @@
+from typing import Mapping
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.task import Task
+from app.models.user import User
+
+# Statuses that count towards a user's workload
+ACTIVE_STATUSES = ("TODO", "IN_PROGRESS")
+
+
+def is_active(status: str | None) -> bool:
+    return status in ACTIVE_STATUSES
+
+
+def _active_task_counts_stmt():
+    return select(Task.assigned_to, func.count(Task.id)).where(
+        Task.assigned_to.isnot(None),
+        Task.status.in_(ACTIVE_STATUSES),
+    ).group_by(Task.assigned_to)
+
+
+def active_task_counts(db: Session) -> dict[int, int]:
+    """Active tasks per assignee in a single GROUP BY."""
+    return {user_id: count for user_id, count in db.execute(_active_task_counts_stmt())}
+
+
+async def active_task_counts_async(db: AsyncSession) -> dict[int, int]:
+    return {user_id: count for user_id, count in await db.execute(_active_task_counts_stmt())}
+
+
+def adjust_active_task_counts(db: Session, deltas: Mapping[int | None, int]):
+    """
+    Shift maintained `active_task_count`s by {user_id: delta} inside the
+    caller's transaction, in one UPDATE whatever the number of users
+    (`+ CASE id WHEN ... END`). The increment happens in SQL, so concurrent
+    writers never lose updates.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if user_id is not None and delta}
+    if not deltas:
+        return
+    db.execute(
+        update(User)
+        .where(User.id.in_(deltas))
+        .values(active_task_count=User.active_task_count + case(deltas, value=User.id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def adjust_active_task_count(db: Session, user_id: int | None, delta: int):
+    """Shift one user's `active_task_count` by `delta` (see `adjust_active_task_counts`)."""
+    adjust_active_task_counts(db, {user_id: delta})
+
+
+def reconcile_active_task_counts(db: Session, dry_run: bool = False) -> list[dict]:
+    """
+    Recompute every user's active-task count and fix the ones that drifted.
+    Returns one {"user_id", "stored", "actual"} entry per corrected user.
+    """
+    actual = active_task_counts(db)
+    drift = [
+        {"user_id": user_id, "stored": stored, "actual": actual.get(user_id, 0)}
+        for user_id, stored in db.query(User.id, User.active_task_count).all()
+        if stored != actual.get(user_id, 0)
+    ]
+    if drift and not dry_run:
+        db.execute(
+            update(User),
+            [{"id": d["user_id"], "active_task_count": d["actual"]} for d in drift],
+        )
+        db.commit()
+    return drift
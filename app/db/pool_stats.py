@@ -0,0 +1,92 @@
+import time
+
+from sqlalchemy import event, exc as sa_exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import Histogram
+
+
+class PoolStats:
+    """Counters for one engine's connection pool; gauges are read live from the pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkout_wait = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def attach(self, engine):
+        """Hook pool events of `engine` (a sync Engine, or an AsyncEngine's sync_engine)."""
+        self.pool = engine.pool
+
+        @event.listens_for(engine, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        gauges = {}
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        return {
+            **gauges,
+            "checkouts_total": self.checkouts,
+            "timeouts_total": self.timeouts,
+            "connects_total": self.connects,
+            "invalidations_total": self.invalidations,
+            "checkout_wait_seconds": {
+                "buckets": self.checkout_wait.cumulative_buckets(),
+                "count": self.checkout_wait.count,
+                "sum": round(self.checkout_wait.sum, 6),
+                **self.checkout_wait.quantiles(),
+            },
+        }
+
+
+def instrumented_pool_class(base: type[QueuePool], stats: PoolStats) -> type[QueuePool]:
+    """
+    Subclass of `base` that times every checkout, including the wait for a
+    free connection, and counts checkout timeouts. The class (not the
+    instance) carries the stats, so they survive `pool.recreate()`.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return base._do_get(self)
+        except sa_exc.TimeoutError:
+            stats.timeouts += 1
+            raise
+        finally:
+            stats.checkout_wait.observe(time.perf_counter() - start)
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+_registry: dict[str, PoolStats] = {}
+
+
+def pool_stats(name: str) -> PoolStats:
+    if name not in _registry:
+        _registry[name] = PoolStats(name)
+    return _registry[name]
+
+
+def get_pool_stats() -> dict:
+    return {name: stats.snapshot() for name, stats in _registry.items()}
@@ -0,0 +1,119 @@
+import os
+import re
+import time
+import logging
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("sprintsync")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|%s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Statement shape with literals and expanded IN-lists folded, so loop iterations compare equal."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(?)", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+class RequestQueryStats:
+    """SQL issued while serving one request."""
+
+    __slots__ = ("count", "total_seconds", "slowest_seconds", "slowest_statement", "shapes", "repeated")
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: str | None = None
+        self.shapes: Counter = Counter()
+        self.repeated: set[str] = set()   # shapes that crossed the N+1 threshold
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+class NPlusOneDetector:
+    """
+    Flags a request once the same normalized statement has run more than
+    `threshold` times in it (0 disables). `mode="warn"` logs the shape;
+    `mode="raise"` fails the offending execute, which is what tests want.
+    """
+
+    def __init__(self, threshold: int = 0, mode: str = "warn"):
+        if mode not in ("warn", "raise"):
+            raise ValueError(f"mode must be 'warn' or 'raise', got {mode!r}")
+        self.threshold = threshold
+        self.mode = mode
+
+    def check(self, stats: RequestQueryStats, statement: str):
+        shape = normalize_statement(statement)
+        stats.shapes[shape] += 1
+        if stats.shapes[shape] <= self.threshold or shape in stats.repeated:
+            return
+        stats.repeated.add(shape)
+        message = f"Possible N+1: statement ran more than {self.threshold} times in one request: {shape[:300]}"
+        if self.mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+
+n_plus_one = NPlusOneDetector(
+    threshold=int(os.getenv("N_PLUS_ONE_THRESHOLD", "0")),
+    mode=os.getenv("N_PLUS_ONE_MODE", "warn").lower(),
+)
+
+_current: ContextVar[RequestQueryStats | None] = ContextVar("request_query_stats", default=None)
+
+
+def begin_request():
+    """Start attributing statements in this context to a fresh stats object; returns a reset token."""
+    return _current.set(RequestQueryStats())
+
+
+def end_request(token) -> RequestQueryStats:
+    stats = _current.get()
+    _current.reset(token)
+    return stats
+
+
+def current_query_stats() -> RequestQueryStats | None:
+    return _current.get()
+
+
+# ─── Engine hooks ───
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.record(statement, time.perf_counter() - context._query_started)
+    if n_plus_one.threshold:
+        n_plus_one.check(stats, statement)
+
+
+def install_query_hooks():
+    """Listen on the Engine class, so every engine (sync, async, test) is covered. Idempotent."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
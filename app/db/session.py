@@ -1,13 +1,40 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
 from dotenv import load_dotenv
 
+from app.db.pool_stats import pool_stats, instrumented_pool_class
+from app.db.query_stats import install_query_hooks
+
 # load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Per-request query count / DB time / N+1 detection for every engine
+install_query_hooks()
+
+
+def pool_options(url: str, name: str, base: type[QueuePool] = QueuePool) -> dict:
+    """
+    Env-driven pool settings plus an instrumented pool class. SQLite keeps
+    SQLAlchemy's own pool choice, since size/overflow don't apply to it.
+    """
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(base, pool_stats(name)),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "").lower() in ("true", "1", "yes"),
+    }
+
+
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL, "sync"))
+pool_stats("sync").attach(engine)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -24,4 +51,41 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ─── Async engine (asyncpg for Postgres, aiosqlite for SQLite) ───
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a DATABASE_URL for its async counterpart."""
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    **pool_options(DATABASE_URL, "async", base=AsyncAdaptedQueuePool),
+)
+pool_stats("async").attach(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+# Dependency for async routes; queries are awaited instead of blocking the event loop
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,5 +1,7 @@
 import logging
 import sys
+import asyncio
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
@@ -9,6 +11,11 @@ from app.api.routes.auth import router as auth_router
 from app.api.routes.tasks import router as tasks_router
 from app.api.routes.ai import router as ai_router
 from app.api.routes.metrics import router as metrics_router
+from app.api.routes.reports import router as reports_router
+from app.core.passwords import password_pool
+from app.core.log_pipeline import log_writer
+from app.core.gauges import app_gauges, GAUGE_REFRESH_INTERVAL
+from app.db.session import SessionLocal
 
 # ─── Structured logging setup ───
 logging.basicConfig(
@@ -17,10 +24,25 @@ logging.basicConfig(
     stream=sys.stdout,
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ─── Startup: keep /metrics gauges reconciled with the DB ───
+    refresher = None
+    if GAUGE_REFRESH_INTERVAL > 0:
+        refresher = asyncio.create_task(app_gauges.run_refresher(SessionLocal, GAUGE_REFRESH_INTERVAL))
+    yield
+    # ─── Shutdown: stop worker processes, drain queued log records ───
+    if refresher is not None:
+        refresher.cancel()
+    password_pool.shutdown()
+    log_writer.stop()
+
+
 app = FastAPI(
     title="SprintSync API",
     description="Lean internal tool for logging work, tracking time, and AI-powered planning.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # ─── Middleware ───
@@ -32,6 +54,7 @@ app.include_router(users_router)
 app.include_router(tasks_router)
 app.include_router(ai_router)
 app.include_router(metrics_router)
+app.include_router(reports_router)
 
 
 @app.get("/", tags=["Health"])
@@ -1,2 +1,4 @@
 from .user import User
-from .task import Task
\ No newline at end of file
+from .task import Task
+from .skill_embedding import UserSkillEmbedding
+from .time_entry import TimeEntry, UserDailyMinutes
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class UserSkillEmbedding(Base):
+    __tablename__ = "user_skill_embeddings"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skills_hash = Column(String(64), nullable=False)
+    embedding = Column(LargeBinary, nullable=False)  # packed float32 vector
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -6,6 +6,16 @@ from app.db.session import Base
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Kept in step with db/schema.sql and db/migrations (tests/test_query_plans.py checks)
+    __table_args__ = (
+        Index("ix_tasks_user_id", "user_id", "id"),                            # own tasks, sort=id
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at", "id"),   # sort=updated_at, plan cache version
+        Index("ix_tasks_assigned_to_status", "assigned_to", "status"),         # workload counts, assignee filter
+        Index("ix_tasks_status", "status"),                                    # tasks_by_status gauge
+        Index("ix_tasks_updated_at_id", "updated_at", "id"),                   # admin sort=updated_at
+        Index("ix_tasks_created_at", "created_at"),                            # report window: created
+        Index("ix_tasks_completed_at", "completed_at"),                        # report window: completed
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -17,7 +27,8 @@ class Task(Base):
     assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)  # set on the move to DONE, cleared on leaving it
 
     owner = relationship("User", foreign_keys=[user_id])
     assignee = relationship("User", foreign_keys=[assigned_to])
\ No newline at end of file
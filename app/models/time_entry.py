@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+
+class TimeEntry(Base):
+    """One append-only time log against a task; tasks.total_minutes is their sum."""
+    __tablename__ = "time_entries"
+    __table_args__ = (
+        Index("ix_time_entries_task_id", "task_id", "id"),
+        Index("ix_time_entries_user_id_work_date", "user_id", "work_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # who did the work
+    minutes = Column(Integer, nullable=False)           # negative for downward adjustments
+    work_date = Column(Date, nullable=False)
+    kind = Column(String, nullable=False, default="log")  # "log" or "adjustment"
+    note = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class UserDailyMinutes(Base):
+    """Rollup of time_entries per (user, day), upserted in the same transaction as the entries."""
+    __tablename__ = "user_daily_minutes"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    work_date = Column(Date, primary_key=True)
+    minutes = Column(Integer, nullable=False, default=0)
+    entries = Column(Integer, nullable=False, default=0)
@@ -1,2 +1,6 @@
-from .user import UserCreate, UserOut
-from .task import TaskCreate, TaskOut, TaskUpdate, TaskUpdateStatus
\ No newline at end of file
+from .user import UserCreate, UserOut, UserUpdate
+from .task import (
+    TaskCreate, TaskOut, TaskUpdate, TaskUpdateStatus,
+    TaskBulkCreate, TaskStatusChange, TaskBulkStatus, BulkItemResult, BulkResult,
+    TimeEntryCreate, TimeLog, TimeEntryOut, TimeLogResult, UserTimeSummary, TimeSummary,
+)
\ No newline at end of file
@@ -1,19 +1,20 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 
 class TaskCreate(BaseModel):
     title: str
     description: Optional[str] = None
-    total_minutes: Optional[int] = 0
+    total_minutes: Optional[int] = Field(0, ge=0)
     assigned_to: Optional[int] = None  # user_id to assign to; defaults to current user
 
 
 class TaskUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
-    total_minutes: Optional[int] = None
+    total_minutes: Optional[int] = Field(None, ge=0)  # recorded as an adjustment time entry
+    assigned_to: Optional[int] = None  # reassign to another user
 
 
 class TaskUpdateStatus(BaseModel):
@@ -30,6 +31,79 @@ class TaskOut(BaseModel):
     assigned_to: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# ─── Bulk operations ───
+
+class TaskBulkCreate(BaseModel):
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class TaskStatusChange(BaseModel):
+    id: int
+    status: str
+
+
+class TaskBulkStatus(BaseModel):
+    items: List[TaskStatusChange] = Field(..., min_length=1, max_length=1000)
+
+
+class BulkItemResult(BaseModel):
+    index: int                       # position in the request's items
+    ok: bool
+    status_code: int
+    task: Optional[TaskOut] = None
+    error: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+# ─── Time tracking ───
+
+class TimeEntryCreate(BaseModel):
+    minutes: int = Field(..., ge=1, le=24 * 60)
+    work_date: Optional[date] = None   # defaults to today (UTC)
+    note: Optional[str] = None
+
+
+class TimeLog(BaseModel):
+    entries: List[TimeEntryCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class TimeEntryOut(BaseModel):
+    id: int
+    task_id: int
+    user_id: int
+    minutes: int
+    work_date: date
+    kind: str
+    note: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TimeLogResult(BaseModel):
+    task: TaskOut
+    entries: List[TimeEntryOut]
+
+
+class UserTimeSummary(BaseModel):
+    user_id: int
+    total_minutes: int
+    days: Dict[date, int]
+
+
+class TimeSummary(BaseModel):
+    start: date
+    end: date
+    users: List[UserTimeSummary]
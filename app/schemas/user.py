@@ -10,6 +10,11 @@ class UserCreate(BaseModel):
     skills: Optional[str] = None
 
 
+# Request → update own profile
+class UserUpdate(BaseModel):
+    skills: Optional[str] = None
+
+
 # Response → send back to client
 class UserOut(BaseModel):
     id: int
@@ -0,0 +1,310 @@
+"""
+Per-route latency, throughput and query budget, checked against a baseline.
+
+    python -m benchmarks.endpoints [--sizes 1000,10000] [--requests 200]
+                                   [--concurrency 8] [--tolerance 0.5]
+                                   [--baseline benchmarks/baseline.json]
+                                   [--update-baseline]
+
+Runs the real app in-process with the test suite's setup (`tests/conftest.py`:
+temp-file SQLite, dependency overrides, `USE_AI_STUB=true`). For each dataset
+size it seeds users and tasks, then drives every route below with `--requests`
+requests spread over `--concurrency` concurrent clients, after a short
+warm-up. Queries per request come from the per-route SQL counters in the
+metrics store.
+
+For every (size, route) it reports throughput, p50/p95/p99 and queries per
+request. If a baseline exists, a route fails when it issues more queries per
+request than recorded, or when its p95 or throughput is worse than the
+baseline by more than `--tolerance` (0.5 = 50%). Any failure, or any non-2xx
+response, exits non-zero. `--update-baseline` records the current run instead.
+
+The baseline also records the machine and runtime it was measured on
+(`environment()`). Timings only mean something on that setup, so the p95 and
+throughput gates are skipped when the current environment differs; the query
+budgets are always checked.
+"""
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import sqlite3
+import argparse
+import platform
+
+import httpx
+from sqlalchemy import insert
+
+from tests.conftest import app, engine
+from app.db.session import Base
+from app.models.task import Task
+from app.models.user import User
+from app.core.passwords import hash_password
+from app.core.metrics_store import get_metrics_store
+from app.core.principal_cache import principal_cache
+from app.core.plan_cache import plan_cache
+from app.core.gauges import app_gauges
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "benchpass"
+WARMUP = 5
+SKILLS = ("Python, FastAPI", "React, TypeScript", "Postgres, SQL", "Docker, Kubernetes", "Figma, UX")
+
+
+# ─── Dataset ───
+
+def seed(n_tasks: int, transition_tasks: int):
+    """
+    `n_tasks` tasks spread over n_tasks // 100 users (at least 10). User 1
+    is the benchmark user and also owns `transition_tasks` TODO tasks kept
+    for the status-transition route.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
+    plan_cache.clear()
+    app_gauges.reset()
+
+    n_users = max(10, n_tasks // 100)
+    hashed = hash_password(BENCH_PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "id": user_id,
+                "email": BENCH_EMAIL if user_id == 1 else f"user{user_id}@example.com",
+                "hashed_password": hashed,
+                "skills": SKILLS[user_id % len(SKILLS)],
+            }
+            for user_id in range(1, n_users + 1)
+        ])
+        rows = [
+            {"title": f"task {i}", "status": "TODO", "user_id": i % n_users + 1, "assigned_to": i % n_users + 1}
+            for i in range(n_tasks)
+        ]
+        rows += [
+            {"title": f"transition {i}", "status": "TODO", "user_id": 1, "assigned_to": 1}
+            for i in range(transition_tasks)
+        ]
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(Task), rows[start:start + 5000])
+
+    with engine.connect() as conn:
+        owned = conn.execute(
+            Task.__table__.select().with_only_columns(Task.id, Task.title).where(Task.user_id == 1)
+        ).all()
+    return {
+        "own_task_ids": [row.id for row in owned if row.title.startswith("task ")],
+        "transition_ids": [row.id for row in owned if row.title.startswith("transition ")],
+        "created_ids": [],
+    }
+
+
+# ─── Routes ───
+# Each route yields (method, url, request kwargs) for the i-th request and
+# names its route template, which is how the metrics store keys it.
+
+def _routes(ctx):
+    def pick(ids, i):
+        return ids[i % len(ids)]
+
+    return [
+        ("login", "POST", "/auth/login",
+         lambda i: ("POST", "/auth/login", {"data": {"username": BENCH_EMAIL, "password": BENCH_PASSWORD}})),
+        ("create_task", "POST", "/tasks/",
+         lambda i: ("POST", "/tasks/", {"json": {"title": f"bench {i}", "description": "created by benchmark"}})),
+        ("get_task", "GET", "/tasks/{task_id}",
+         lambda i: ("GET", f"/tasks/{pick(ctx['own_task_ids'], i)}", {})),
+        ("update_task", "PATCH", "/tasks/{task_id}",
+         lambda i: ("PATCH", f"/tasks/{pick(ctx['own_task_ids'], i)}", {"json": {"title": f"renamed {i}"}})),
+        ("list_tasks", "GET", "/tasks/",
+         lambda i: ("GET", "/tasks/", {"params": {"limit": 50}})),
+        ("status_transition", "PATCH", "/tasks/{task_id}/status",
+         lambda i: ("PATCH", f"/tasks/{ctx['transition_ids'][i]}/status", {"json": {"status": "IN_PROGRESS"}})),
+        ("delete_task", "DELETE", "/tasks/{task_id}",
+         lambda i: ("DELETE", f"/tasks/{ctx['created_ids'][i]}", {})),
+        ("ai_suggest", "POST", "/ai/suggest",
+         lambda i: ("POST", "/ai/suggest", {"json": {"mode": "draft_description", "title": f"Feature {i}"}})),
+        ("recommend_user", "POST", "/tasks/recommend-user",
+         lambda i: ("POST", "/tasks/recommend-user", {"json": {"title": "Build API endpoint", "description": "Python"}})),
+        ("metrics", "GET", "/metrics",
+         lambda i: ("GET", "/metrics", {})),
+    ]
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+def _route_counters(method: str, template: str) -> tuple[int, int]:
+    store = get_metrics_store()
+    key = (method, template)
+    return store["db_queries_total"].get(key, 0), store["db_time_seconds"][key].count
+
+
+async def run_route(client, make_request, indexes, concurrency: int, on_response=None):
+    latencies, errors = [], []
+    remaining = iter(indexes)
+
+    async def worker():
+        for i in remaining:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            resp = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if resp.status_code >= 300:
+                errors.append(f"{method} {url} -> {resp.status_code}: {resp.text[:200]}")
+            elif on_response is not None:
+                on_response(resp)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start, errors
+
+
+async def run_size(n_tasks: int, requests: int, concurrency: int) -> tuple[dict, list[str]]:
+    # Warm-up plus measured requests each consume a fresh task for transitions / deletes
+    ctx = seed(n_tasks, transition_tasks=requests + WARMUP)
+    results, problems = {}, []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        login = await client.post("/auth/login", data={"username": BENCH_EMAIL, "password": BENCH_PASSWORD})
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        for name, method, template, make_request in _routes(ctx):
+            on_response = None
+            if name == "create_task":
+                on_response = lambda resp: ctx["created_ids"].append(resp.json()["id"])
+
+            # Warm-up (process pools, caches, connections) is excluded from every figure
+            await run_route(client, make_request, range(WARMUP), 1, on_response)
+            queries_before, requests_before = _route_counters(method, template)
+            latencies, elapsed, errors = await run_route(
+                client, make_request, range(WARMUP, WARMUP + requests), concurrency, on_response,
+            )
+            queries_after, requests_after = _route_counters(method, template)
+
+            latencies.sort()
+            served = max(requests_after - requests_before, 1)
+            results[name] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+                "queries_per_request": round((queries_after - queries_before) / served, 2),
+            }
+            problems += [f"[{n_tasks} tasks] {name}: {error}" for error in errors[:3]]
+    return results, problems
+
+
+# ─── Baseline comparison ───
+
+def environment() -> dict:
+    """Machine and runtime the timings were measured on."""
+    return {
+        "machine": platform.node(),
+        "cpu": _cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "os": f"{platform.system()} {platform.release()}",
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+        "sqlite": sqlite3.sqlite_version,
+    }
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def compare(results: dict, baseline: dict, tolerance: float, timing: bool = True) -> list[str]:
+    """
+    Query budgets are always checked; p95 and throughput only when `timing`
+    is set, i.e. when the baseline was recorded in the same environment.
+    """
+    regressions = []
+    for size, routes in results.items():
+        for name, current in routes.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            label = f"[{size} tasks] {name}"
+            if current["queries_per_request"] > base["queries_per_request"] + 0.01:
+                regressions.append(
+                    f"{label}: {current['queries_per_request']} queries/request, budget {base['queries_per_request']}"
+                )
+            if not timing:
+                continue
+            # Ignore sub-millisecond differences; they are scheduler noise
+            if current["p95_ms"] > base["p95_ms"] * (1 + tolerance) and current["p95_ms"] - base["p95_ms"] > 1:
+                regressions.append(f"{label}: p95 {current['p95_ms']} ms, baseline {base['p95_ms']} ms")
+            if current["throughput_rps"] < base["throughput_rps"] / (1 + tolerance):
+                regressions.append(
+                    f"{label}: {current['throughput_rps']} req/s, baseline {base['throughput_rps']} req/s"
+                )
+    return regressions
+
+
+def print_table(size: str, routes: dict):
+    print(f"\n{size} tasks")
+    print(f"{'route':<20}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>7}")
+    for name, r in routes.items():
+        print(
+            f"{name:<20}{r['throughput_rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+            f"{r['p99_ms']:>9}{r['queries_per_request']:>7}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Endpoint benchmark with baseline comparison")
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated task counts to seed")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95/throughput slowdown")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results, problems = {}, []
+    for size in (int(s) for s in args.sizes.split(",")):
+        results[str(size)], errors = asyncio.run(run_size(size, args.requests, args.concurrency))
+        problems += errors
+        print_table(str(size), results[str(size)])
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"environment": environment(), **results}, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        timing = baseline.get("environment") == environment()
+        if not timing:
+            print(
+                "\nBaseline was recorded on a different machine or runtime; "
+                "checking query budgets only (re-record with --update-baseline to gate timings)"
+            )
+        problems += compare(results, baseline, args.tolerance, timing)
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one")
+
+    if problems:
+        print("\nFAILED:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("\nOK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
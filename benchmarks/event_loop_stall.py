@@ -0,0 +1,149 @@
+"""
+Event-loop stall caused by DB access in async routes, sync Session vs AsyncSession.
+
+    python -m benchmarks.event_loop_stall [--tasks 200] [--latency-ms 20]
+                                          [--requests 100] [--concurrency 16]
+
+Two endpoints load one user's tasks exactly like the daily-plan path:
+`sync` uses the blocking Session inside `async def` (the old code), `async`
+awaits an AsyncSession. While requests run, a heartbeat coroutine sleeps
+1 ms in a loop and records how late it wakes up; that lateness is time the
+event loop could not serve anyone else.
+
+SQLite answers in microseconds, so each request first runs
+`SELECT bench_sleep(latency)`, a SQL function that sleeps inside the
+driver, to stand in for a Postgres round trip.
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, select, insert, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.db.session import Base, async_database_url
+from app.models.task import Task
+from app.models.user import User
+
+
+def _bench_sleep(ms):
+    time.sleep(ms / 1000)
+    return 0
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("bench_sleep", 1, _bench_sleep)
+
+
+def build_app(database_url: str, latency_ms: float) -> FastAPI:
+    engine = create_engine(database_url)
+    SessionLocal = sessionmaker(bind=engine)
+    async_engine = create_async_engine(async_database_url(database_url))
+    event.listen(engine, "connect", _register_sleep)
+    event.listen(async_engine.sync_engine, "connect", _register_sleep)
+    round_trip = text("SELECT bench_sleep(:ms)").bindparams(ms=latency_ms)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+    app = FastAPI()
+
+    @app.get("/sync")
+    async def sync_plan():
+        db = SessionLocal()
+        try:
+            db.execute(round_trip)
+            tasks = db.query(Task).filter(Task.user_id == 1).all()
+        finally:
+            db.close()
+        return {"n": len(tasks)}
+
+    @app.get("/async")
+    async def async_plan():
+        async with AsyncSessionLocal() as db:
+            await db.execute(round_trip)
+            tasks = (await db.execute(select(Task).where(Task.user_id == 1))).scalars().all()
+        return {"n": len(tasks)}
+
+    return app
+
+
+def seed(database_url: str, n_tasks: int):
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "bench@example.com", "hashed_password": "x"}])
+        conn.execute(insert(Task), [
+            {"title": f"task {i}", "status": "TODO", "user_id": 1, "assigned_to": 1}
+            for i in range(n_tasks)
+        ])
+    engine.dispose()
+
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int) -> dict:
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                resp = await client.get(path)
+                assert resp.status_code == 200, resp.text
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await beat
+
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "stall_total_ms": sum(lags) * 1000,
+        "stall_max_ms": lags[-1] * 1000 if lags else 0.0,
+        "stall_p99_ms": lags[int(0.99 * (len(lags) - 1))] * 1000 if lags else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Event-loop stall benchmark")
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stall.db')}"
+    seed(database_url, args.tasks)
+    app = build_app(database_url, args.latency_ms)
+
+    print(
+        f"{args.requests} requests x {args.tasks} rows, {args.latency_ms:g} ms simulated DB latency, "
+        f"concurrency {args.concurrency}"
+    )
+    print(f"{'variant':<8}{'elapsed s':>11}{'stall total ms':>16}{'stall p99 ms':>14}{'stall max ms':>14}")
+    for variant in ("sync", "async"):
+        asyncio.run(measure(app, f"/{variant}", 2, 1))  # warm-up
+        r = asyncio.run(measure(app, f"/{variant}", args.requests, args.concurrency))
+        print(
+            f"{variant:<8}{r['elapsed_s']:>11.2f}{r['stall_total_ms']:>16.1f}"
+            f"{r['stall_p99_ms']:>14.2f}{r['stall_max_ms']:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
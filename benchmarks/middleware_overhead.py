@@ -0,0 +1,133 @@
+"""
+Per-request overhead of ObservabilityMiddleware, before and after the move to
+pure ASGI with a single JWT decode.
+
+    python -m benchmarks.middleware_overhead [--requests 5000] [--concurrency 64]
+
+Three apps serve the same authenticated no-op endpoint in-process (no sockets,
+no DB), so the difference between them is middleware + token handling only:
+
+  baseline  no middleware, endpoint decodes the token once
+  legacy    BaseHTTPMiddleware that decodes the token, endpoint decodes again
+  current   ObservabilityMiddleware, endpoint reuses the verified claims
+"""
+import os
+import time
+import json
+import asyncio
+import logging
+import argparse
+import statistics
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import httpx
+from fastapi import FastAPI, Depends, HTTPException, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.middleware import ObservabilityMiddleware
+from app.core.security import (
+    create_access_token, decode_access_token, oauth2_scheme, token_claims,
+)
+
+
+class LegacyObservabilityMiddleware(BaseHTTPMiddleware):
+    """The pre-ASGI middleware, trimmed to what it cost per request."""
+
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        auth_header = request.headers.get("authorization", "")
+        claims = decode_access_token(auth_header[7:]) if auth_header.startswith("Bearer ") else None
+        response = await call_next(request)
+        logging.getLogger("sprintsync").info(json.dumps({
+            "method": request.method,
+            "path": str(request.url.path),
+            "userId": claims and claims.get("sub"),
+            "status_code": response.status_code,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }))
+        return response
+
+
+def _decode_again(token: str = Depends(oauth2_scheme)):
+    claims = decode_access_token(token)
+    if claims is None:
+        raise HTTPException(status_code=401)
+    return claims
+
+
+def _reuse_claims(request: Request, token: str = Depends(oauth2_scheme)):
+    claims = token_claims(request, token)
+    if claims is None:
+        raise HTTPException(status_code=401)
+    return claims
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+    dependency = _reuse_claims if variant == "current" else _decode_again
+
+    @app.get("/ping")
+    def ping(claims: dict = Depends(dependency)):
+        return {"sub": claims["sub"]}
+
+    if variant == "legacy":
+        app.add_middleware(LegacyObservabilityMiddleware)
+    elif variant == "current":
+        app.add_middleware(ObservabilityMiddleware)
+    return app
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int, headers: dict) -> list[float]:
+    latencies: list[float] = []
+    remaining = iter(range(requests))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                resp = await client.get("/ping", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert resp.status_code == 200, resp.text
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ObservabilityMiddleware overhead benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args(argv)
+
+    # Keep the terminal readable; the log call itself is still made.
+    logging.getLogger("sprintsync").addHandler(logging.NullHandler())
+    logging.getLogger("sprintsync").propagate = False
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    results = {}
+    for variant in ("baseline", "legacy", "current"):
+        app = build_app(variant)
+        asyncio.run(drive(app, 200, args.concurrency, headers))  # warm-up
+        start = time.perf_counter()
+        latencies = asyncio.run(drive(app, args.requests, args.concurrency, headers))
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        results[variant] = {
+            "rps": args.requests / elapsed,
+            "per_request_us": elapsed / args.requests * 1e6,
+            "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        }
+
+    base = results["baseline"]["per_request_us"]
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    print(f"{'variant':<10}{'req/s':>10}{'us/req':>10}{'overhead us':>13}{'p50 ms':>9}{'p99 ms':>9}")
+    for variant, r in results.items():
+        print(
+            f"{variant:<10}{r['rps']:>10.0f}{r['per_request_us']:>10.1f}"
+            f"{r['per_request_us'] - base:>13.1f}{r['p50_ms']:>9.2f}{r['p99_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
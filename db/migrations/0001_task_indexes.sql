@@ -0,0 +1,8 @@
+-- Indexes for the task access paths (mirrors Task.__table_args__).
+-- Plain CREATE INDEX locks writes to tasks while it builds; on a large live
+-- table run these by hand with CREATE INDEX CONCURRENTLY instead.
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id ON tasks (user_id, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id_updated_at ON tasks (user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_assigned_to_status ON tasks (assigned_to, status);
+CREATE INDEX IF NOT EXISTS ix_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS ix_tasks_updated_at_id ON tasks (updated_at, id);
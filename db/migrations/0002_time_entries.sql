@@ -0,0 +1,34 @@
+-- Append-only time entries with a per-(user, day) rollup (mirrors app/models/time_entry.py).
+-- tasks.total_minutes stays as the per-task rollup: the sum of the task's entries.
+CREATE TABLE IF NOT EXISTS time_entries (
+    id SERIAL PRIMARY KEY,
+    task_id INT NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    minutes INT NOT NULL,
+    work_date DATE NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'log',
+    note TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_time_entries_task_id ON time_entries (task_id, id);
+CREATE INDEX IF NOT EXISTS ix_time_entries_user_id_work_date ON time_entries (user_id, work_date);
+
+CREATE TABLE IF NOT EXISTS user_daily_minutes (
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    work_date DATE NOT NULL,
+    minutes INT NOT NULL DEFAULT 0,
+    entries INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, work_date)
+);
+
+-- Existing totals become one adjustment entry each, credited to the assignee
+INSERT INTO time_entries (task_id, user_id, minutes, work_date, kind, note)
+SELECT id, COALESCE(assigned_to, user_id), total_minutes, DATE(COALESCE(updated_at, created_at)), 'adjustment', 'Backfilled from total_minutes'
+FROM tasks
+WHERE total_minutes <> 0
+  AND COALESCE(assigned_to, user_id) IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM time_entries e WHERE e.task_id = tasks.id);
+
+DELETE FROM user_daily_minutes;
+INSERT INTO user_daily_minutes (user_id, work_date, minutes, entries)
+SELECT user_id, work_date, SUM(minutes), COUNT(*) FROM time_entries GROUP BY user_id, work_date;
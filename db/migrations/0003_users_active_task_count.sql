@@ -0,0 +1,9 @@
+-- Maintained workload counter (users.active_task_count), for databases created
+-- before the column was added to db/schema.sql.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS active_task_count INT NOT NULL DEFAULT 0;
+
+-- Backfill: TODO + IN_PROGRESS tasks per assignee (same as app.commands.reconcile_workload)
+UPDATE users SET active_task_count = (
+    SELECT COUNT(*) FROM tasks
+    WHERE tasks.assigned_to = users.id AND tasks.status IN ('TODO', 'IN_PROGRESS')
+);
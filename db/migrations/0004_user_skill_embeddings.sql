@@ -0,0 +1,10 @@
+-- Stored skill embeddings for /tasks/recommend-user (mirrors app/models/skill_embedding.py):
+-- one row per user, re-embedded when skills change. Part of the cached-skill-vectors
+-- change; it needs only the original users table, so it can ship with that change
+-- alone, for databases created before the table was added to db/schema.sql.
+CREATE TABLE IF NOT EXISTS user_skill_embeddings (
+    user_id INT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    skills_hash VARCHAR(64) NOT NULL,
+    embedding BYTEA NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
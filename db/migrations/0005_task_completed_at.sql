@@ -0,0 +1,9 @@
+-- When a task reached DONE (mirrors Task.completed_at); reports measure cycle time
+-- and throughput from it instead of updated_at, which every edit and time log moves.
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP;
+
+-- Best available value for tasks finished before the column existed
+UPDATE tasks SET completed_at = updated_at WHERE status = 'DONE' AND completed_at IS NULL;
+
+CREATE INDEX IF NOT EXISTS ix_tasks_created_at ON tasks (created_at);
+CREATE INDEX IF NOT EXISTS ix_tasks_completed_at ON tasks (completed_at);
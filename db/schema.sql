@@ -5,6 +5,7 @@ CREATE TABLE IF NOT EXISTS users (
     hashed_password TEXT NOT NULL,
     is_admin BOOLEAN DEFAULT FALSE,
     skills TEXT,
+    active_task_count INT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -30,5 +31,46 @@ CREATE TABLE IF NOT EXISTS tasks (
     user_id INT REFERENCES users(id) ON DELETE CASCADE,
     assigned_to INT REFERENCES users(id) ON DELETE SET NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP
+);
+
+-- TASK INDEXES (same as Task.__table_args__ and db/migrations/0001_task_indexes.sql)
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id ON tasks (user_id, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_user_id_updated_at ON tasks (user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_assigned_to_status ON tasks (assigned_to, status);
+CREATE INDEX IF NOT EXISTS ix_tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS ix_tasks_updated_at_id ON tasks (updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_tasks_created_at ON tasks (created_at);
+CREATE INDEX IF NOT EXISTS ix_tasks_completed_at ON tasks (completed_at);
+
+-- SKILL EMBEDDINGS (one row per user, re-embedded when skills change)
+CREATE TABLE IF NOT EXISTS user_skill_embeddings (
+    user_id INT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    skills_hash VARCHAR(64) NOT NULL,
+    embedding BYTEA NOT NULL,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+-- TIME ENTRIES (append-only; tasks.total_minutes is the sum per task)
+CREATE TABLE IF NOT EXISTS time_entries (
+    id SERIAL PRIMARY KEY,
+    task_id INT NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    minutes INT NOT NULL,
+    work_date DATE NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'log',
+    note TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_time_entries_task_id ON time_entries (task_id, id);
+CREATE INDEX IF NOT EXISTS ix_time_entries_user_id_work_date ON time_entries (user_id, work_date);
+
+-- MINUTES PER USER AND DAY (rollup of time_entries, upserted with every log)
+CREATE TABLE IF NOT EXISTS user_daily_minutes (
+    user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    work_date DATE NOT NULL,
+    minutes INT NOT NULL DEFAULT 0,
+    entries INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, work_date)
+);
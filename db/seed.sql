@@ -56,3 +56,20 @@ INSERT INTO tasks (title, description, status, total_minutes, user_id, assigned_
   ('Performance Testing', 'Load test the API under high concurrency.', 'TODO', 0, 5, 5),
   ('Security Audit', 'Check for common OWASP vulnerabilities.', 'TODO', 0, 5, 5),
   ('Verify Bug Fixes', 'Manual testing of the reported UI issues.', 'TODO', 0, 5, 5);
+
+-- Seeded DONE tasks count as completed now
+UPDATE tasks SET completed_at = CURRENT_TIMESTAMP WHERE status = 'DONE';
+
+-- Maintained workload counters (TODO + IN_PROGRESS tasks per assignee)
+UPDATE users u SET active_task_count = (
+  SELECT COUNT(*) FROM tasks t
+  WHERE t.assigned_to = u.id AND t.status IN ('TODO', 'IN_PROGRESS')
+);
+
+-- Seeded totals as time entries (tasks.total_minutes is the sum of a task's entries)
+INSERT INTO time_entries (task_id, user_id, minutes, work_date, kind, note)
+SELECT id, assigned_to, total_minutes, CURRENT_DATE, 'adjustment', 'Seed data'
+FROM tasks WHERE total_minutes <> 0;
+
+INSERT INTO user_daily_minutes (user_id, work_date, minutes, entries)
+SELECT user_id, work_date, SUM(minutes), COUNT(*) FROM time_entries GROUP BY user_id, work_date;
@@ -1,27 +1,44 @@
 import os
 import sys
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 # Ensure USE_AI_STUB is true for tests
 os.environ["USE_AI_STUB"] = "true"
 os.environ["DATABASE_URL"] = "sqlite://"
 os.environ["SECRET_KEY"] = "test-secret"
+os.environ["BCRYPT_ROUNDS"] = "4"
 
-from app.db.session import Base, get_db
+from app.db.session import Base, SessionLocal, get_db, get_async_db
 from app.main import app
+from app.core.principal_cache import principal_cache
+from app.core.plan_cache import plan_cache
+from app.core.report_cache import report_cache
+from app.core.gauges import app_gauges
+from app.core.skill_index import skill_index
+from app.core.embeddings import skill_embeddings
 
 
-# ─── In-memory SQLite engine for tests ───
+# ─── Temp-file SQLite shared by the sync and async (aiosqlite) engines ───
+_db_path = os.path.join(tempfile.mkdtemp(prefix="sprintsync-tests-"), "test.db")
+
 engine = create_engine(
-    "sqlite://",
+    f"sqlite:///{_db_path}",
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Code that opens sessions itself rather than through get_db (e.g. /metrics)
+SessionLocal.configure(bind=engine)
+
+# TestClient may run each request on a fresh event loop, so async
+# connections are never pooled across requests.
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{_db_path}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 
 def override_get_db():
@@ -32,7 +49,13 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture(autouse=True)
@@ -41,6 +64,12 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    principal_cache.clear()
+    plan_cache.clear()
+    report_cache.clear()
+    app_gauges.reset()
+    skill_index.clear()
+    skill_embeddings.clear()
 
 
 @pytest.fixture
@@ -52,7 +81,7 @@ def client():
 def auth_token(client):
     """Register a user and return a valid JWT token."""
     client.post("/users/", json={"email": "testuser@example.com", "password": "testpass123"})
-    resp = client.post("/auth/login", json={"email": "testuser@example.com", "password": "testpass123"})
+    resp = client.post("/auth/login", data={"username": "testuser@example.com", "password": "testpass123"})
     return resp.json()["access_token"]
 
 
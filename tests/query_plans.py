@@ -0,0 +1,56 @@
+"""
+EXPLAIN helpers for plan regression tests: capture the SELECTs a block of
+requests issues, explain each one and report full table scans.
+"""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+_POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+@contextmanager
+def capture_selects():
+    """Collect (statement, parameters) for every SELECT run on any engine inside the block."""
+    captured = []
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", before)
+    try:
+        yield captured
+    finally:
+        event.remove(Engine, "before_cursor_execute", before)
+
+
+def explain(engine, statement: str, parameters) -> list[str]:
+    """Plan lines for one statement, in the dialect's own EXPLAIN format."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            return [row[-1] for row in rows]
+        return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()]
+
+
+def full_scans(plan: list[str], tables: tuple[str, ...]) -> list[str]:
+    """Tables from `tables` that the plan reads end to end without an index."""
+    scanned = []
+    for line in plan:
+        match = _SQLITE_FULL_SCAN.match(line.strip()) or _POSTGRES_FULL_SCAN.search(line)
+        if match and match.group(1) in tables:
+            scanned.append(match.group(1))
+    return scanned
+
+
+def assert_no_full_scans(engine, captured, tables: tuple[str, ...] = ("tasks",)):
+    problems = []
+    for statement, parameters in captured:
+        plan = explain(engine, statement, parameters)
+        if full_scans(plan, tables):
+            problems.append(f"{' '.join(statement.split())}\n    " + "\n    ".join(plan))
+    assert not problems, "Full table scan in hot queries:\n" + "\n".join(problems)
@@ -35,3 +35,55 @@ def test_ai_suggest_daily_plan_stub(client, auth_headers):
     assert data["mode"] == "daily_plan"
     assert data["source"] == "stub"
     assert "Daily Plan" in data["suggestion"] or "Review PRs" in data["suggestion"]
+
+
+def test_daily_plan_cached_until_tasks_change(client, auth_headers):
+    """A repeat daily_plan is served from cache; any task write invalidates it."""
+    created = client.post("/tasks/", json={"title": "Review PRs"}, headers=auth_headers).json()
+
+    first = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers).json()
+    second = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers).json()
+    assert first["source"] == "stub"
+    assert second["source"] == "cache"
+    assert second["suggestion"] == first["suggestion"]
+
+    client.patch(f"/tasks/{created['id']}/status", json={"status": "IN_PROGRESS"}, headers=auth_headers)
+    third = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers).json()
+    assert third["source"] == "stub"
+    assert "Continue In-Progress" in third["suggestion"]
+
+
+def test_daily_plan_version_catches_writes_from_elsewhere(client, auth_headers):
+    """Without in-process invalidation the task-set version still detects a change."""
+    from app.core.plan_cache import plan_cache
+    from tests.conftest import TestingSessionLocal
+    from app.models.task import Task
+
+    client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers)
+    with TestingSessionLocal() as db:
+        owner_id = next(iter(plan_cache._entries))
+        db.add(Task(title="Written by another worker", user_id=owner_id, assigned_to=owner_id))
+        db.commit()
+
+    resp = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers).json()
+    assert resp["source"] == "stub"
+    assert "Written by another worker" in resp["suggestion"]
+
+
+def test_daily_plan_version_catches_time_logged_elsewhere(client, auth_headers):
+    """Time logged by another worker leaves updated_at alone but still changes the version."""
+    from app.core.time_tracking import record_time, today
+    from tests.conftest import TestingSessionLocal
+
+    task = client.post("/tasks/", json={"title": "Review PRs"}, headers=auth_headers).json()
+    client.patch(f"/tasks/{task['id']}/status", json={"status": "IN_PROGRESS"}, headers=auth_headers)
+    first = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers).json()
+    assert "(0 min logged)" in first["suggestion"]
+
+    with TestingSessionLocal() as db:
+        record_time(db, [{"task_id": task["id"], "user_id": task["user_id"], "minutes": 90, "work_date": today()}])
+        db.commit()
+
+    resp = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers).json()
+    assert resp["source"] == "stub"
+    assert "(90 min logged)" in resp["suggestion"]
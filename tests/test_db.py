@@ -0,0 +1,108 @@
+"""Tests for database session helpers."""
+from app.db.session import async_database_url
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+    assert async_database_url("postgresql+psycopg2://u@db/app") == "postgresql+asyncpg://u@db/app"
+    assert async_database_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+    assert async_database_url("sqlite://") == "sqlite+aiosqlite://"
+
+
+def test_instrumented_pool_records_waits_and_timeouts(tmp_path):
+    import pytest
+    from sqlalchemy import create_engine, exc
+    from sqlalchemy.pool import QueuePool
+    from app.db.pool_stats import PoolStats, instrumented_pool_class
+
+    stats = PoolStats("test")
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class(QueuePool, stats),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    stats.attach(engine)
+
+    held = engine.connect()
+    assert stats.snapshot()["checked_out"] == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+
+    snap = stats.snapshot()
+    assert snap["checked_out"] == 0
+    assert snap["timeouts_total"] == 1
+    assert snap["checkouts_total"] == 1
+    assert snap["checkout_wait_seconds"]["count"] == 2
+    assert snap["checkout_wait_seconds"]["sum"] >= 0.05
+
+
+def test_normalize_statement_folds_literals_and_in_lists():
+    from app.db.query_stats import normalize_statement
+
+    a = normalize_statement("SELECT * FROM tasks WHERE id IN (?, ?, ?) AND title = 'x'")
+    b = normalize_statement("SELECT *\n  FROM tasks WHERE id IN (?) AND title = 'other'")
+    assert a == b == "SELECT * FROM tasks WHERE id IN (?) AND title = ?"
+    assert normalize_statement("SELECT 1 FROM t WHERE a = $1 AND b IN ($2, $3)").endswith("b IN (?)")
+
+
+def _request_logs(caplog, method, path):
+    import json
+    entries = []
+    for record in caplog.records:
+        try:
+            entry = json.loads(record.getMessage())
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and (entry.get("method"), entry.get("path")) == (method, path):
+            entries.append(entry)
+    return entries
+
+
+def test_request_log_carries_sql_stats(client, auth_headers, caplog):
+    import logging
+
+    client.post("/tasks/", json={"title": "A"}, headers=auth_headers)
+    with caplog.at_level(logging.INFO, logger="sprintsync"):
+        client.get("/tasks/", headers=auth_headers)              # sync session, threadpool
+        client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers)  # async session
+
+    for method, path in (("GET", "/tasks/"), ("POST", "/ai/suggest")):
+        (entry,) = _request_logs(caplog, method, path)
+        assert entry["db_queries"] >= 1
+        assert entry["db_time_ms"] >= 0
+        assert entry["db_slowest_statement"].startswith("SELECT")
+
+    by_route = {(s["method"], s["path"]): s for s in client.get("/metrics").json()["db_by_route"]}
+    assert by_route[("GET", "/tasks/")]["queries_total"] >= 1
+    assert by_route[("POST", "/ai/suggest")]["requests"] >= 1
+
+
+def test_n_plus_one_detector(monkeypatch, caplog):
+    import pytest
+    from sqlalchemy import select
+    from app.db import query_stats
+    from app.db.query_stats import NPlusOneDetector, NPlusOneError, begin_request, end_request
+    from app.models.task import Task
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(query_stats, "n_plus_one", NPlusOneDetector(threshold=2, mode="warn"))
+    token = begin_request()
+    with TestingSessionLocal() as db:
+        for task_id in range(4):
+            db.execute(select(Task).where(Task.id == task_id)).all()
+    stats = end_request(token)
+    assert stats.count == 4
+    assert len(stats.repeated) == 1
+    assert any("Possible N+1" in r.getMessage() for r in caplog.records)
+
+    monkeypatch.setattr(query_stats, "n_plus_one", NPlusOneDetector(threshold=2, mode="raise"))
+    token = begin_request()
+    try:
+        with TestingSessionLocal() as db, pytest.raises(NPlusOneError):
+            for task_id in range(3):
+                db.execute(select(Task).where(Task.id == task_id)).all()
+    finally:
+        end_request(token)
@@ -0,0 +1,62 @@
+"""Tests for the micro-batching embedding queue."""
+import asyncio
+
+import pytest
+
+from app.core.embedding_batcher import EmbeddingBatcher
+
+
+class FakeEmbedder:
+    """Records each batch and returns a one-dimensional vector per text."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("quota exceeded")
+        return [[float(len(text))] for text in texts]
+
+
+def _embed_all(batcher, texts):
+    async def main():
+        return await asyncio.gather(*(batcher.embed(text) for text in texts), return_exceptions=True)
+    return asyncio.run(main())
+
+
+def test_requests_are_batched_and_fanned_out():
+    fake = FakeEmbedder()
+    batcher = EmbeddingBatcher(fake, max_batch=4, linger=0.01)
+    texts = ["a" * n for n in range(1, 11)]
+
+    vectors = _embed_all(batcher, texts)
+
+    assert vectors == [[float(n)] for n in range(1, 11)]
+    assert [len(batch) for batch in fake.batches] == [4, 4, 2]
+    stats = batcher.stats()
+    assert stats["batches_total"] == 3
+    assert stats["full_batches_total"] == 2
+    assert stats["avg_fill_ratio"] == pytest.approx(10 / 12, abs=1e-4)
+
+
+def test_linger_flushes_partial_batch():
+    fake = FakeEmbedder()
+    batcher = EmbeddingBatcher(fake, max_batch=100, linger=0.005)
+    assert asyncio.run(batcher.embed("solo")) == [4.0]
+    assert fake.batches == [["solo"]]
+
+
+def test_duplicate_texts_embedded_once():
+    fake = FakeEmbedder()
+    batcher = EmbeddingBatcher(fake, max_batch=8)
+    vectors = _embed_all(batcher, ["python", "python", "sql"])
+    assert vectors == [[6.0], [6.0], [3.0]]
+    assert fake.batches == [["python", "sql"]]
+
+
+def test_batch_failure_reaches_every_caller():
+    batcher = EmbeddingBatcher(FakeEmbedder(fail=True), max_batch=8)
+    results = _embed_all(batcher, ["a", "b", "c"])
+    assert all(isinstance(result, RuntimeError) for result in results)
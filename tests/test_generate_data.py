@@ -0,0 +1,58 @@
+"""Tests for the synthetic dataset generator."""
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from tests.conftest import engine, TestingSessionLocal
+from app.models.task import Task
+from app.models.user import User
+from app.models.time_entry import TimeEntry, UserDailyMinutes
+from app.core.workload import active_task_counts
+from app.commands.generate_data import generate, truncate
+
+
+def _dump():
+    db = TestingSessionLocal()
+    try:
+        users = db.execute(select(User.email, User.skills, User.active_task_count).order_by(User.id)).all()
+        tasks = db.execute(
+            select(Task.title, Task.status, Task.total_minutes, Task.user_id, Task.assigned_to,
+                   Task.created_at, Task.updated_at).order_by(Task.id)
+        ).all()
+        return users, tasks, active_task_counts(db)
+    finally:
+        db.close()
+
+
+def test_generate_is_deterministic_and_consistent():
+    summary = generate(engine, users=20, tasks=1500, seed=7, batch_size=400, log=lambda _: None)
+    assert summary["users"] == 20 and summary["tasks"] == 1500
+    users, tasks, actual = _dump()
+
+    assert len(users) == 20 and len(tasks) == 1500
+    assert all(skills for _, skills, _ in users)
+    assert all(updated >= created for *_, created, updated in tasks)
+    assert all(minutes == 0 for _, status, minutes, *_ in tasks if status == "TODO")
+    # Stored workload counters match the rows
+    assert {i + 1: n for i, (*_, n) in enumerate(users) if n} == actual
+
+    # Time entries and rollups agree with total_minutes, as if logged through the API
+    db = TestingSessionLocal()
+    try:
+        per_task = dict(db.execute(select(TimeEntry.task_id, func.sum(TimeEntry.minutes)).group_by(TimeEntry.task_id)).all())
+        totals = dict(db.execute(select(Task.id, Task.total_minutes).where(Task.total_minutes != 0)).all())
+        rolled_up = db.scalar(select(func.sum(UserDailyMinutes.minutes)))
+    finally:
+        db.close()
+    assert summary["time_entries"] == len(totals) > 0
+    assert per_task == totals and rolled_up == sum(totals.values())
+
+    by_status = Counter(status for _, status, *_ in tasks)
+    assert by_status["DONE"] > by_status["TODO"] > by_status["IN_PROGRESS"] > 0
+    # Skewed ownership: the busiest user owns far more than an even share
+    per_owner = Counter(owner for *_, owner, _, _, _ in tasks)
+    assert max(per_owner.values()) > 3 * (1500 / 20)
+
+    truncate(engine)
+    generate(engine, users=20, tasks=1500, seed=7, batch_size=400, log=lambda _: None)
+    assert _dump()[1] == tasks
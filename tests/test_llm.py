@@ -0,0 +1,124 @@
+"""Tests for the shared LLM client (concurrency cap, deadlines, circuit breaker) and SSE streaming."""
+import asyncio
+import json
+import time
+
+import pytest
+
+import app.api.routes.ai as ai_routes
+from app.core.llm_cache import ResponseCache
+from app.core.llm import CircuitBreaker, CircuitOpenError, FakeProvider, LLMClient, set_llm_client
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Route /ai/suggest to the live path backed by a local fake provider."""
+    provider = FakeProvider(reply="Live plan")
+    client = LLMClient(provider, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    monkeypatch.setattr(ai_routes, "_use_stub", lambda: False)
+    set_llm_client(client)
+    yield client
+    set_llm_client(None)
+
+
+def test_concurrency_is_capped():
+    provider = FakeProvider(delay=0.02)
+    client = LLMClient(provider, max_concurrency=2)
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while provider.calls < 6:
+            peak = max(peak, client.in_flight)
+            await asyncio.sleep(0.001)
+
+    async def main():
+        await asyncio.gather(watch(), *(client.generate("hi") for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert client.calls == 6
+
+
+def test_deadline_trips_breaker():
+    client = LLMClient(FakeProvider(delay=1), timeout=0.02, breaker=CircuitBreaker(failure_threshold=1))
+    with pytest.raises(TimeoutError):
+        asyncio.run(client.generate("hi"))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.generate("hi"))
+    assert client.stats()["timeouts_total"] == 1
+    assert client.stats()["short_circuited_total"] == 1
+
+
+def test_half_open_probe_closes_circuit():
+    provider = FakeProvider(fail=True)
+    client = LLMClient(provider, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.01))
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(client.embed("x"))
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.02)
+    provider.fail = False
+    assert asyncio.run(client.embed("x"))[0] == 1.0
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_serves_stub_without_upstream_call(fake_llm, client, auth_headers):
+    fake_llm.provider.fail = True
+    first = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers)
+    second = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers)
+    assert first.json()["source"] == second.json()["source"] == "stub"
+    assert fake_llm.provider.calls == 1
+
+    fake_llm.breaker.record_success()
+    fake_llm.provider.fail = False
+    live = client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers)
+    assert live.json() == {"mode": "daily_plan", "suggestion": "Live plan", "source": "live"}
+
+
+def _events(resp):
+    """Parse an SSE body into (event, data) pairs."""
+    parsed = []
+    for block in resp.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        parsed.append((lines["event"], json.loads(lines["data"])))
+    return parsed
+
+
+def test_stream_stub_matches_non_streaming(client, auth_headers):
+    body = {"mode": "draft_description", "title": "Login page"}
+    resp = client.post("/ai/suggest/stream", json=body, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+
+    events = _events(resp)
+    chunks = [data["text"] for event, data in events if event == "chunk"]
+    assert len(chunks) > 1
+    assert events[-1] == ("done", {"mode": "draft_description", "source": "stub"})
+
+    full = client.post("/ai/suggest", json=body, headers=auth_headers).json()["suggestion"]
+    assert "".join(chunks) == full
+
+    ttfb = client.get("/metrics").json()["ai_stream_ttfb_seconds"]
+    assert any(series["source"] == "stub" and series["count"] >= 1 for series in ttfb)
+
+
+def test_stream_live_then_cached(fake_llm, client, auth_headers, monkeypatch):
+    monkeypatch.setattr(ai_routes, "draft_cache", ResponseCache())
+    body = {"mode": "draft_description", "title": "Search"}
+
+    live = _events(client.post("/ai/suggest/stream", json=body, headers=auth_headers))
+    assert "".join(data["text"] for event, data in live if event == "chunk") == "Live plan"
+    assert live[-1][1]["source"] == "live"
+
+    cached = _events(client.post("/ai/suggest/stream", json=body, headers=auth_headers))
+    assert cached[-1][1]["source"] == "cache"
+    assert fake_llm.provider.calls == 1
+
+
+def test_stream_falls_back_to_stub_before_first_chunk(fake_llm, client, auth_headers):
+    fake_llm.provider.fail = True
+    events = _events(client.post("/ai/suggest/stream", json={"mode": "daily_plan"}, headers=auth_headers))
+    assert events[-1] == ("done", {"mode": "daily_plan", "source": "stub"})
+    assert "Daily Plan" in "".join(data["text"] for event, data in events if event == "chunk")
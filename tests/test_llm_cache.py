@@ -0,0 +1,95 @@
+"""Tests for the LLM response cache and its use in /ai/suggest."""
+import asyncio
+
+import app.api.routes.ai as ai_routes
+from app.core.llm_cache import ResponseCache, cache_key
+
+
+def test_key_ignores_case_and_whitespace():
+    assert cache_key("m", "Fix  login bug\n") == cache_key("m", "fix login bug")
+    assert cache_key("m", "Fix login bug") != cache_key("other-model", "Fix login bug")
+
+
+def test_single_flight_shares_one_upstream_call():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "drafted"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [value for value, _ in results] == ["drafted"] * 5
+    assert sum(cached for _, cached in results) == 4
+    assert cache.stats()["coalesced_total"] == 4
+
+
+def test_cancelled_leader_hands_over_to_waiters():
+    cache = ResponseCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "drafted"
+
+    async def main():
+        leader = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_compute("k", compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()   # e.g. the client that started the draft disconnected
+        return leader, await asyncio.gather(*waiters)
+
+    leader, results = asyncio.run(main())
+    assert leader.cancelled()
+    assert [value for value, _ in results] == ["drafted"] * 3
+    assert len(calls) == 2     # one waiter took over; the others shared its call
+
+
+def test_async_tiers_read_and_write_disk_off_loop(tmp_path):
+    path = str(tmp_path / "llm.db")
+
+    async def main():
+        await ResponseCache(sqlite_path=path).aput("k", "v")
+        return await ResponseCache(sqlite_path=path).aget("k")
+
+    assert asyncio.run(main()) == "v"
+
+
+def test_disk_tier_survives_new_process(tmp_path):
+    path = str(tmp_path / "llm.db")
+    ResponseCache(sqlite_path=path).put("k", "v")
+    fresh = ResponseCache(sqlite_path=path)
+    assert fresh.get("k") == "v"
+    assert fresh.stats()["disk_hits_total"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(ttl=-1)
+    cache.put("k", "v")
+    assert cache.get("k") is None
+
+
+def test_draft_description_served_from_cache(client, auth_headers, monkeypatch):
+    calls = []
+
+    async def fake_llm(title):
+        calls.append(title)
+        return f"Live draft for {title}"
+
+    monkeypatch.setattr(ai_routes, "_use_stub", lambda: False)
+    monkeypatch.setattr(ai_routes, "_llm_draft_description", fake_llm)
+    monkeypatch.setattr(ai_routes, "draft_cache", ResponseCache())
+
+    first = client.post("/ai/suggest", json={"mode": "draft_description", "title": "Fix login bug"}, headers=auth_headers)
+    second = client.post("/ai/suggest", json={"mode": "draft_description", "title": "fix  LOGIN bug"}, headers=auth_headers)
+    assert first.json()["source"] == "live"
+    assert second.json()["source"] == "cache"
+    assert second.json()["suggestion"] == first.json()["suggestion"]
+    assert len(calls) == 1
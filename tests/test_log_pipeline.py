@@ -0,0 +1,88 @@
+"""Tests for the queue-based structured log writer."""
+import io
+import json
+import time
+import threading
+
+import pytest
+
+import app.core.log_pipeline as log_pipeline
+from app.core.log_pipeline import QueueLogWriter
+
+
+class BlockingStream(io.StringIO):
+    """A stdout stand-in that stalls until released, like a backed-up log shipper."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, s):
+        self.release.wait(5)
+        return super().write(s)
+
+
+def test_records_are_batched_and_serialised_off_thread():
+    stream = io.StringIO()
+    writer = QueueLogWriter(stream=stream, flush_interval=0.01)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError as exc:
+        error = exc
+    writer.submit({"path": "/a", "status_code": 200})
+    writer.submit({"path": "/b", "status_code": 500}, error)
+    writer.flush()
+    writer.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["path"] for line in lines] == ["/a", "/b"]
+    assert "RuntimeError: boom" in lines[1]["stacktrace"]
+    assert writer.stats()["log_records_written_total"] == 2
+
+
+def test_full_queue_drops_and_counts():
+    stream = BlockingStream()
+    writer = QueueLogWriter(stream=stream, max_queue=1, overflow="drop_newest", flush_interval=0.01)
+    writer.submit({"n": 1})
+    while writer.stats()["log_queue_depth"]:  # writer thread now stuck on record 1
+        time.sleep(0.001)
+    assert writer.submit({"n": 2}) is True
+    assert writer.submit({"n": 3}) is False
+    assert writer.stats()["log_records_dropped_total"] == 1
+
+    stream.release.set()
+    writer.flush()
+    writer.stop()
+    assert [json.loads(l)["n"] for l in stream.getvalue().splitlines()] == [1, 2]
+
+
+def test_counters_add_up_under_concurrent_producers():
+    stream = io.StringIO()
+    writer = QueueLogWriter(stream=stream, max_queue=8, overflow="drop_oldest", batch_size=4, flush_interval=0.01)
+    producers = [
+        threading.Thread(target=lambda: [writer.submit({"n": i}) for i in range(2000)]) for _ in range(4)
+    ]
+    for t in producers:
+        t.start()
+    for t in producers:
+        t.join()
+    writer.flush()
+    writer.stop()
+
+    stats = writer.stats()
+    assert stats["log_records_written_total"] + stats["log_records_dropped_total"] == 8000
+    assert stats["log_records_written_total"] == len(stream.getvalue().splitlines())
+
+
+def test_blocking_overflow_policy_is_rejected():
+    # submit() runs on the event loop; a policy that waits would stall it
+    with pytest.raises(ValueError):
+        QueueLogWriter(overflow="block")
+
+
+def test_queue_mode_exposes_counters_in_metrics(client, monkeypatch):
+    monkeypatch.setattr(log_pipeline, "LOG_MODE", "queue")
+    client.get("/")
+    data = client.get("/metrics").json()
+    assert data["log_records_enqueued_total"] >= 1
+    assert "log_records_dropped_total" in data
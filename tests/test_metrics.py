@@ -0,0 +1,154 @@
+"""Tests for the /metrics endpoint and latency histograms."""
+from sqlalchemy import event
+
+from app.core.metrics import Histogram, QuantileSketch
+
+
+def test_metrics_keyed_by_route_template(client, auth_headers):
+    """Raw paths collapse onto their route template; unknown paths share one series."""
+    client.get("/tasks/1", headers=auth_headers)
+    client.get("/tasks/2", headers=auth_headers)
+    client.get("/no-such-page-123")
+
+    data = client.get("/metrics").json()
+    paths = {s["path"] for s in data["http_request_duration_seconds"]}
+    assert "/tasks/{task_id}" in paths
+    assert "<unmatched>" in paths
+    assert not any(p.startswith("/tasks/") and p[7:].isdigit() for p in paths)
+
+    series = next(
+        s for s in data["http_request_duration_seconds"]
+        if s["path"] == "/tasks/{task_id}" and s["status"] == 404
+    )
+    assert series["count"] >= 2
+    assert series["buckets"]["le_inf"] == series["count"]
+    assert series["p50"] is not None
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram()
+    for value in (0.004, 0.01, 0.3, 20.0):
+        hist.observe(value)
+    buckets = hist.cumulative_buckets()
+    assert buckets["le_0.005"] == 1
+    assert buckets["le_0.01"] == 2
+    assert buckets["le_0.5"] == 3
+    assert buckets["le_10"] == 3
+    assert buckets["le_inf"] == 4
+
+
+def test_quantile_sketch_relative_accuracy():
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    values = [i / 1000 for i in range(1, 10001)]  # 1ms .. 10s
+    for v in values:
+        sketch.add(v)
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+    assert len(sketch.bins) < 1000
+
+
+def test_app_gauges_follow_writes_without_requery(client, auth_headers):
+    """After the first scrape, gauges move with the write paths instead of being re-queried."""
+    first = client.post("/tasks/", json={"title": "A"}, headers=auth_headers).json()
+    data = client.get("/metrics").json()
+    assert data["active_users"] == 1
+    assert data["tasks_by_status"] == {"TODO": 1}
+    reconciled_at = data["gauges_reconciled_at"]
+
+    second = client.post("/tasks/", json={"title": "B"}, headers=auth_headers).json()
+    client.patch(f"/tasks/{first['id']}/status", json={"status": "IN_PROGRESS"}, headers=auth_headers)
+    client.delete(f"/tasks/{second['id']}", headers=auth_headers)
+    client.post("/users/", json={"email": "second@example.com", "password": "pw"})
+
+    data = client.get("/metrics").json()
+    assert data["gauges_reconciled_at"] == reconciled_at
+    assert data["active_users"] == 2
+    assert data["tasks_by_status"] == {"IN_PROGRESS": 1}
+
+
+def test_app_gauges_reconcile_replaces_drift(client, auth_headers):
+    from app.core.gauges import app_gauges
+    from tests.conftest import TestingSessionLocal
+
+    client.post("/tasks/", json={"title": "A"}, headers=auth_headers)
+    app_gauges.task_added("DONE", 5)  # e.g. counts from a write another worker saw
+    with TestingSessionLocal() as db:
+        app_gauges.reconcile(db)
+    assert app_gauges.snapshot()["tasks_by_status"] == {"TODO": 1}
+
+
+def test_metrics_scrape_opens_no_session_once_reconciled(client):
+    from app.db.session import get_db
+    from app.main import app
+    from tests.conftest import engine
+
+    client.get("/metrics")  # first scrape reconciles the gauges
+    checkouts = []
+    override = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = lambda: checkouts.append("get_db")
+    listener = lambda *args: checkouts.append("checkout")
+    event.listen(engine.pool, "checkout", listener)
+    try:
+        assert client.get("/metrics").status_code == 200
+    finally:
+        event.remove(engine.pool, "checkout", listener)
+        app.dependency_overrides[get_db] = override
+    assert checkouts == []
+
+
+def test_multiprocess_store_sums_workers(tmp_path):
+    from app.core.metrics_store import MultiProcessMetricsStore
+
+    workers = [MultiProcessMetricsStore(str(tmp_path), pid=pid) for pid in (101, 102)]
+    key = ("GET", "/tasks/{task_id}", 200)
+    for store, durations in zip(workers, ([0.004, 0.02], [0.3])):
+        for value in durations:
+            store.inc("http_requests_total", key)
+            store.observe("http_request_duration_seconds", key, value)
+
+    # Any worker's scrape sees every worker's series
+    series = MultiProcessMetricsStore(str(tmp_path), pid=103).collect()
+    assert series["http_requests_total"][key] == 3
+    hist = series["http_request_duration_seconds"][key]
+    assert hist.count == 3
+    assert abs(hist.sum - 0.324) < 1e-9
+    assert hist.cumulative_buckets()["le_0.005"] == 1
+    assert abs(hist.quantiles()["p50"] - 0.02) / 0.02 <= 0.01
+
+
+def test_mmap_file_grows_and_reopens(tmp_path):
+    from app.core.metrics_store import MmapedValues
+
+    path = str(tmp_path / "metrics_1.db")
+    values = MmapedValues(path)
+    for i in range(30000):  # ~1.4 MB of entries, past the initial 1 MB
+        values.inc(f"series-{i}", i)
+    values.inc("series-7", 1)
+    values.close()
+
+    reopened = MmapedValues(path)
+    reopened.inc("series-7", 1)
+    read = dict(MmapedValues.read(path))
+    assert len(read) == 30000
+    assert read["series-7"] == 9
+    assert read["series-29999"] == 29999
+
+
+def test_prometheus_text_format(client, auth_headers):
+    client.post("/tasks/", json={"title": "A"}, headers=auth_headers)
+    client.get("/tasks/1", headers=auth_headers)
+
+    resp = client.get("/metrics", headers={"Accept": "text/plain;version=0.0.4"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert "# TYPE http_requests_total counter" in text
+    assert 'http_requests_total{method="GET",path="/tasks/{task_id}",status="200"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",path="/tasks/{task_id}",status="200",le="+Inf"} 1' in text
+    assert 'sprintsync_tasks{status="TODO"} 1' in text
+    assert "sprintsync_active_users 1" in text
+    assert "sprintsync_db_pool_sync_checkouts_total" in text
+
+    assert client.get("/metrics?format=prometheus").text.startswith("# TYPE")
+    assert client.get("/metrics?format=json", headers={"Accept": "text/plain"}).json()["active_users"] == 1
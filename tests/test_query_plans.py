@@ -0,0 +1,124 @@
+"""Index consistency, migrations and EXPLAIN-based plan regression checks."""
+import re
+
+from sqlalchemy import create_engine, inspect, text
+
+from tests.conftest import engine
+from tests.query_plans import capture_selects, assert_no_full_scans, full_scans
+from app.db.session import Base
+from app.models.task import Task
+from app.core.gauges import app_gauges
+from app.commands.generate_data import generate
+from app.commands.migrate import MIGRATIONS_DIR, migrate
+
+_CREATE_INDEX = re.compile(r"CREATE INDEX IF NOT EXISTS (\w+) ON tasks \(([^)]*)\)")
+
+
+def _sql_indexes(sql: str) -> dict:
+    return {name: tuple(c.strip() for c in cols.split(",")) for name, cols in _CREATE_INDEX.findall(sql)}
+
+
+def test_model_schema_and_migration_indexes_agree():
+    model = {
+        ix.name: tuple(c.name for c in ix.columns)
+        for ix in Task.__table__.indexes
+        if [c.name for c in ix.columns] != ["id"]
+    }
+    schema = _sql_indexes((MIGRATIONS_DIR.parent / "schema.sql").read_text())
+    migrations = {}
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        migrations.update(_sql_indexes(path.read_text()))
+    assert model == schema == migrations
+
+
+def test_migrate_applies_once():
+    try:
+        assert migrate(engine) == [
+            "0001_task_indexes", "0002_time_entries", "0003_users_active_task_count",
+            "0004_user_skill_embeddings", "0005_task_completed_at",
+        ]
+        assert migrate(engine) == []
+        assert migrate(engine, dry_run=True) == []
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE schema_migrations"))
+
+
+# The schema the project started from (db/schema.sql before any migration), in SQLite terms
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY,
+    email TEXT UNIQUE NOT NULL,
+    hashed_password TEXT NOT NULL,
+    is_admin BOOLEAN DEFAULT FALSE,
+    skills TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE tasks (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'TODO',
+    total_minutes INT DEFAULT 0,
+    user_id INT REFERENCES users(id) ON DELETE CASCADE,
+    assigned_to INT REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def test_migrations_bring_baseline_schema_up_to_models(tmp_path):
+    baseline = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with baseline.begin() as conn:
+        for stmt in BASELINE_SCHEMA.split(";"):
+            if stmt.strip():
+                conn.exec_driver_sql(stmt)
+        conn.exec_driver_sql("INSERT INTO users (email, hashed_password) VALUES ('a@example.com', 'x')")
+        conn.exec_driver_sql(
+            "INSERT INTO tasks (title, status, total_minutes, user_id, assigned_to) VALUES ('A', 'TODO', 30, 1, 1)"
+        )
+
+    migrate(baseline)
+    schema = inspect(baseline)
+    for table in Base.metadata.sorted_tables:
+        assert {c["name"] for c in schema.get_columns(table.name)} == set(table.columns.keys()), table.name
+    assert {ix.name for ix in Task.__table__.indexes} - {"ix_tasks_id"} <= {
+        ix["name"] for ix in schema.get_indexes("tasks")
+    }
+    with baseline.connect() as conn:
+        assert conn.exec_driver_sql("SELECT active_task_count FROM users").scalar() == 1
+        assert conn.exec_driver_sql("SELECT SUM(minutes) FROM time_entries").scalar() == 30
+    baseline.dispose()
+
+
+def test_full_scan_detection():
+    assert full_scans(["SCAN tasks"], ("tasks",)) == ["tasks"]
+    assert full_scans(["SCAN tasks USING COVERING INDEX ix_tasks_status"], ("tasks",)) == []
+    assert full_scans(["Seq Scan on tasks  (cost=0.00..35.50 rows=10 width=4)"], ("tasks",)) == ["tasks"]
+    assert full_scans(["Index Scan using ix_tasks_user_id on tasks"], ("tasks",)) == []
+
+
+def test_hot_task_queries_use_indexes(client, auth_headers):
+    generate(engine, users=30, tasks=3000, seed=1, batch_size=1000, log=lambda _: None)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    task_id = client.post("/tasks/", json={"title": "Write docs"}, headers=auth_headers).json()["id"]
+    me = client.get(f"/tasks/{task_id}", headers=auth_headers).json()["user_id"]
+    app_gauges.reset()
+
+    with capture_selects() as captured:
+        resp = client.get("/tasks/", params={"limit": 1}, headers=auth_headers)
+        assert resp.status_code == 200
+        client.get("/tasks/", params={"sort": "updated_at"}, headers=auth_headers)
+        client.get("/tasks/", params={"status": "todo"}, headers=auth_headers)
+        client.get("/tasks/", params={"assigned_to": me}, headers=auth_headers)
+        client.get(f"/tasks/{task_id}", headers=auth_headers)
+        client.post("/ai/suggest", json={"mode": "daily_plan"}, headers=auth_headers)
+        client.post("/tasks/recommend-user", json={"title": "Build API endpoint"}, headers=auth_headers)
+        client.get("/metrics")
+        client.get("/reports/tasks", params={"start": "2025-06-01", "end": "2025-06-07"}, headers=auth_headers)
+
+    assert any("GROUP BY tasks.assigned_to" in statement for statement, _ in captured)
+    assert_no_full_scans(engine, captured)
@@ -0,0 +1,104 @@
+"""Tests for /tasks/recommend-user and the skill-embedding store."""
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+import app.api.routes.tasks as tasks_routes
+import app.core.embeddings as embeddings
+from app.models.skill_embedding import UserSkillEmbedding
+from app.commands.migrate import MIGRATIONS_DIR, migrate
+
+VOCAB = ["python", "ml", "java", "react", "docker", "aws", "sql", "spark"]
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    """Deterministic bag-of-words embedder that records every call."""
+    calls = []
+
+    async def fake_get_embedding(text: str):
+        calls.append(text)
+        words = text.lower().replace(",", " ").split()
+        return [float(words.count(w)) for w in VOCAB] + [0.01]
+
+    monkeypatch.setattr(embeddings, "get_embedding", fake_get_embedding)
+    monkeypatch.setattr(tasks_routes, "get_embedding", fake_get_embedding)
+    return calls
+
+
+def test_recommend_costs_one_embedding_call(fake_embeddings, client, auth_headers):
+    """Skills are embedded at registration, so a recommendation embeds only the task."""
+    client.post("/users/", json={"email": "ds@example.com", "password": "pw", "skills": "python, ml"})
+    client.post("/users/", json={"email": "ops@example.com", "password": "pw", "skills": "docker, aws"})
+
+    fake_embeddings.clear()
+    resp = client.post("/tasks/recommend-user", json={"title": "Train python ml model"}, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["method"] == "semantic"
+    assert data["recommended_user"]["email"] == "ds@example.com"
+    assert len(fake_embeddings) == 1
+
+
+def test_skill_update_reembeds(fake_embeddings, client, auth_headers):
+    """Changing skills through PATCH /users/me refreshes the stored embedding."""
+    resp = client.patch("/users/me", json={"skills": "docker, aws"}, headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json()["skills"] == "docker, aws"
+
+    fake_embeddings.clear()
+    resp = client.post("/tasks/recommend-user", json={"title": "docker aws rollout"}, headers=auth_headers)
+    assert resp.json()["recommended_user"]["email"] == "testuser@example.com"
+    assert fake_embeddings == ["docker aws rollout: "]
+
+
+def test_recommend_returns_top_k(fake_embeddings, client, auth_headers):
+    """`k` caps the ranked list instead of returning every user in the org."""
+    for i, skills in enumerate(["python, ml", "java, react", "sql, spark", "docker"]):
+        client.post("/users/", json={"email": f"u{i}@example.com", "password": "pw", "skills": skills})
+
+    resp = client.post("/tasks/recommend-user?k=2", json={"title": "spark sql pipeline"}, headers=auth_headers)
+    data = resp.json()
+    assert "all_scores" not in data
+    assert len(data["recommendations"]) == 2
+    assert data["recommended_user"]["email"] == "u2@example.com"
+    scores = [r["score"] for r in data["recommendations"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_failed_skill_embedding_still_ranks_and_retries(fake_embeddings, client, auth_headers, monkeypatch):
+    """A user whose skills can't be embedded scores 0 instead of vanishing, and is retried."""
+    working = embeddings.get_embedding
+
+    async def flaky(text: str):
+        if "java" in text:
+            raise RuntimeError("embedding upstream down")
+        return await working(text)
+
+    monkeypatch.setattr(embeddings, "get_embedding", flaky)
+    client.post("/users/", json={"email": "ds@example.com", "password": "pw", "skills": "python, ml"})
+    client.post("/users/", json={"email": "web@example.com", "password": "pw", "skills": "java, react"})
+
+    resp = client.post("/tasks/recommend-user?k=10", json={"title": "java react app"}, headers=auth_headers)
+    scores = {r["email"]: r["score"] for r in resp.json()["recommendations"]}
+    assert scores["web@example.com"] == 0.0
+
+    monkeypatch.setattr(embeddings, "get_embedding", working)
+    resp = client.post("/tasks/recommend-user", json={"title": "java react app"}, headers=auth_headers)
+    assert resp.json()["recommended_user"]["email"] == "web@example.com"
+
+
+def test_skill_embeddings_migration_stands_alone(tmp_path):
+    """The table's migration applies on the original users table without any other migration."""
+    directory = tmp_path / "migrations"
+    directory.mkdir()
+    shutil.copy(MIGRATIONS_DIR / "0004_user_skill_embeddings.sql", directory)
+    db = create_engine(f"sqlite:///{tmp_path / 'original.db'}")
+    with db.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT UNIQUE NOT NULL)")
+
+    assert migrate(db, directory) == ["0004_user_skill_embeddings"]
+    columns = {c["name"] for c in inspect(db).get_columns(UserSkillEmbedding.__tablename__)}
+    assert columns == set(UserSkillEmbedding.__table__.columns.keys())
+    db.dispose()
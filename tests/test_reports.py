@@ -0,0 +1,128 @@
+"""Tests for /reports and the estimate-vs-actual aggregation."""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from tests.conftest import engine, TestingSessionLocal
+from app.models.task import Task
+from app.core.reports import load_estimates, normalize_title, task_report
+from app.commands.generate_data import generate
+
+
+def _done_task(client, headers, title, minutes):
+    task_id = client.post("/tasks/", json={"title": title, "total_minutes": minutes}, headers=headers).json()["id"]
+    client.patch(f"/tasks/{task_id}/status", json={"status": "IN_PROGRESS"}, headers=headers)
+    client.patch(f"/tasks/{task_id}/status", json={"status": "DONE"}, headers=headers)
+    return task_id
+
+
+def test_load_estimates_reads_sheet():
+    estimates = load_estimates()
+    assert estimates["auth system"] == (180, 300)
+    assert estimates["tests"] == (120, 240)
+
+
+def test_report_throughput_status_and_estimates(client, auth_headers):
+    _done_task(client, auth_headers, "Auth system", 240)      # inside 3-5 h
+    _done_task(client, auth_headers, " tests ", 60)           # under 2-4 h; title matched loosely
+    client.post("/tasks/", json={"title": "Project setup"}, headers=auth_headers)   # not done: not compared
+
+    resp = client.get("/reports/tasks", headers=auth_headers)
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report["source"] == "computed"
+    assert report["window"]["days"] == 30
+    assert report["tasks"] == 3 and report["done"] == 2
+    assert report["by_user"][0]["user_id"] == 1
+    assert report["by_user"][0]["done"] == 2 and report["by_user"][0]["minutes_logged"] == 300
+    assert {s["status"]: s["tasks"] for s in report["by_status"]} == {"DONE": 2, "TODO": 1}
+
+    estimates = report["estimates"]
+    assert estimates["matched"] == 2 and estimates["within_range"] == 1
+    assert [(t["title"], t["error_pct"]) for t in estimates["tasks"]] == [("Auth system", 0.0), (" tests ", -66.7)]
+    assert estimates["mean_abs_error_pct"] == 33.3
+    assert "project setup" in estimates["unmatched_estimates"]
+
+
+def test_report_cached_until_task_write(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "A"}, headers=auth_headers).json()["id"]
+    assert client.get("/reports/tasks", headers=auth_headers).json()["source"] == "computed"
+    assert client.get("/reports/tasks", headers=auth_headers).json()["source"] == "cache"
+    # Different filters are a different entry
+    assert client.get("/reports/tasks", params={"status": "done"}, headers=auth_headers).json()["source"] == "computed"
+
+    client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 5}]}, headers=auth_headers)
+    report = client.get("/reports/tasks", headers=auth_headers).json()
+    assert report["source"] == "computed" and report["by_user"][0]["minutes_logged"] == 5
+
+
+def test_report_window_and_access(client, auth_headers):
+    client.post("/tasks/", json={"title": "A"}, headers=auth_headers)
+    future = (date.today() + timedelta(days=10)).isoformat()
+    assert client.get("/reports/tasks", params={"start": future, "end": future}, headers=auth_headers).json()["tasks"] == 0
+    assert client.get("/reports/tasks", params={"user_id": 99}, headers=auth_headers).status_code == 403
+    assert client.get("/reports/tasks", params={"start": future}, headers=auth_headers).status_code == 400
+
+
+def test_completed_at_follows_status(client, auth_headers):
+    single = _done_task(client, auth_headers, "A", 0)
+    bulk = client.post("/tasks/", json={"title": "B"}, headers=auth_headers).json()["id"]
+    client.patch("/tasks/bulk/status", json={"items": [{"id": bulk, "status": "IN_PROGRESS"}]}, headers=auth_headers)
+    resp = client.patch("/tasks/bulk/status", json={"items": [{"id": bulk, "status": "DONE"}]}, headers=auth_headers)
+    assert resp.json()["results"][0]["task"]["completed_at"] is not None
+    done = client.get(f"/tasks/{single}", headers=auth_headers).json()
+    assert done["completed_at"] is not None
+
+    # Logging time is not an edit: updated_at and completed_at stay put
+    client.post(f"/tasks/{single}/time", json={"entries": [{"minutes": 5}]}, headers=auth_headers)
+    logged = client.get(f"/tasks/{single}", headers=auth_headers).json()
+    assert (logged["updated_at"], logged["completed_at"]) == (done["updated_at"], done["completed_at"])
+
+    reopened = client.patch(f"/tasks/{single}/status", json={"status": "TODO"}, headers=auth_headers).json()
+    assert reopened["completed_at"] is None
+    resp = client.patch("/tasks/bulk/status", json={"items": [{"id": bulk, "status": "TODO"}]}, headers=auth_headers)
+    assert resp.json()["results"][0]["task"]["completed_at"] is None
+
+
+def test_report_window_uses_completion_not_last_update(client, auth_headers):
+    old = _done_task(client, auth_headers, "Old", 0)
+    recent = _done_task(client, auth_headers, "Recent", 0)
+    long_ago = datetime(2020, 1, 1)
+    db = TestingSessionLocal()
+    try:
+        # Finished long ago, then edited today: outside the window
+        db.execute(update(Task).where(Task.id == old).values(created_at=long_ago, completed_at=long_ago))
+        # Created long ago, finished two days after creation: inside, with a 48 h cycle time
+        db.execute(update(Task).where(Task.id == recent).values(
+            created_at=datetime.utcnow() - timedelta(days=2), completed_at=datetime.utcnow(),
+        ))
+        db.commit()
+    finally:
+        db.close()
+    client.patch(f"/tasks/{old}", json={"title": "Old, renamed"}, headers=auth_headers)
+
+    report = client.get("/reports/tasks", headers=auth_headers).json()
+    assert report["tasks"] == 1 and report["done"] == 1
+    assert round(report["cycle_time_hours"]["p50"]) == 48
+
+
+def test_report_matches_sql_on_generated_data():
+    generate(engine, users=15, tasks=2000, seed=3, batch_size=1000, log=lambda _: None)
+    db = TestingSessionLocal()
+    try:
+        report = task_report(db, date(2025, 1, 1), date(2026, 1, 1), estimates={})
+        titles = db.scalars(select(Task.title).distinct().limit(5)).all()
+        estimated = task_report(
+            db, date(2025, 1, 1), date(2026, 1, 1), estimates={normalize_title(t): (60, 120) for t in titles}
+        )
+        expected = dict(db.execute(
+            select(Task.assigned_to, func.count(Task.id)).where(Task.status == "DONE").group_by(Task.assigned_to)
+        ).all())
+    finally:
+        db.close()
+    assert report["tasks"] == 2000
+    assert {u["user_id"]: u["done"] for u in report["by_user"] if u["done"]} == expected
+    cycle = report["cycle_time_hours"]
+    assert 0 <= cycle["p50"] <= cycle["p90"]
+    by_user = [u["user_id"] for u in estimated["estimates"]["by_user"]]
+    assert len(by_user) > 2 and by_user == sorted(by_user)     # numeric, not "10" < "2"
@@ -0,0 +1,53 @@
+"""Tests for token verification shared between the middleware and auth dependency."""
+from jose import jwt
+
+
+def test_token_decoded_once_per_request(client, auth_headers, monkeypatch):
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    resp = client.get("/tasks/", headers=auth_headers)
+    assert resp.status_code == 200
+    assert len(calls) == 1
+
+
+def test_invalid_token_rejected(client):
+    resp = client.get("/tasks/", headers={"Authorization": "Bearer not-a-jwt"})
+    assert resp.status_code == 401
+
+
+def test_principal_cache_saves_user_lookup(client, auth_headers):
+    """After the first call, GET /tasks/{id} only queries the task."""
+    from sqlalchemy import event
+    from tests.conftest import engine
+
+    task_id = client.post("/tasks/", json={"title": "Cached"}, headers=auth_headers).json()["id"]
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = client.get(f"/tasks/{task_id}", headers=auth_headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert resp.status_code == 200
+    assert len(statements) == 1
+    assert "FROM tasks" in statements[0]
+
+
+def test_skill_update_invalidates_principal(client, auth_headers):
+    from app.core.principal_cache import principal_cache
+
+    client.get("/tasks/", headers=auth_headers)
+    assert principal_cache.get(1).skills is None
+    client.patch("/users/me", json={"skills": "go, rust"}, headers=auth_headers)
+    client.get("/tasks/", headers=auth_headers)
+    assert principal_cache.get(1).skills == "go, rust"
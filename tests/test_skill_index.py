@@ -0,0 +1,43 @@
+"""Unit tests for the vectorised skill index."""
+import numpy as np
+
+from app.core.skill_index import SkillIndex, top_k
+
+
+def test_score_matches_cosine_similarity():
+    index = SkillIndex(initial_capacity=1)
+    index.upsert(1, [1.0, 0.0, 0.0], "a")
+    index.upsert(2, [1.0, 1.0, 0.0], "b")
+    index.upsert(3, [0.0, 0.0, 2.0], "c")
+
+    ids, sims = index.score([2.0, 0.0, 0.0])
+    by_id = dict(zip(ids.tolist(), sims.tolist()))
+    assert np.isclose(by_id[1], 1.0)
+    assert np.isclose(by_id[2], 1 / np.sqrt(2))
+    assert np.isclose(by_id[3], 0.0)
+
+
+def test_upsert_and_remove_keep_rows_consistent():
+    index = SkillIndex()
+    for user_id in range(1, 5):
+        index.upsert(user_id, [float(user_id), 1.0], str(user_id))
+    index.remove(2)
+    index.upsert(4, [0.0, 1.0], "new")
+
+    assert len(index) == 3
+    assert index.user_ids == {1, 3, 4}
+    assert index.is_current(4, "new") and not index.is_current(4, "4")
+    ids, sims = index.score([0.0, 1.0])
+    assert np.isclose(dict(zip(ids.tolist(), sims.tolist()))[4], 1.0)
+
+
+def test_zero_vector_is_never_current():
+    index = SkillIndex()
+    index.upsert(1, [0.0, 0.0], "a")
+    assert not index.is_current(1, "a")
+
+
+def test_top_k_orders_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7])
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
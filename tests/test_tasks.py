@@ -33,3 +33,117 @@ def test_status_transition_todo_to_in_progress(client, auth_headers):
     )
     assert resp.status_code == 200
     assert resp.json()["status"] == "IN_PROGRESS"
+
+
+def test_list_tasks_keyset_pagination(client, auth_headers):
+    """Pages follow X-Next-Cursor until exhausted, without repeats."""
+    for i in range(5):
+        client.post("/tasks/", json={"title": f"T{i}"}, headers=auth_headers)
+
+    titles, cursor = [], None
+    for _ in range(5):
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/tasks/", params=params, headers=auth_headers)
+        assert resp.status_code == 200
+        titles += [t["title"] for t in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert titles == ["T0", "T1", "T2", "T3", "T4"]
+
+    resp = client.get("/tasks/", params={"sort": "updated_at", "limit": 10}, headers=auth_headers)
+    assert [t["title"] for t in resp.json()] == ["T4", "T3", "T2", "T1", "T0"]
+
+
+def test_list_tasks_updated_at_pages_cover_every_task_once(client, auth_headers):
+    """Ties on updated_at (same second, or mixed stored formats) break on id without repeats."""
+    from datetime import datetime
+    from sqlalchemy import update
+    from tests.conftest import TestingSessionLocal
+    from app.models.task import Task
+
+    ids = [client.post("/tasks/", json={"title": f"T{i}"}, headers=auth_headers).json()["id"] for i in range(7)]
+    db = TestingSessionLocal()
+    try:
+        # Written from Python, so stored with microseconds, unlike CURRENT_TIMESTAMP
+        db.execute(update(Task).where(Task.id.in_(ids[:2])).values(updated_at=datetime(2020, 1, 1, 12, 0, 0)))
+        db.commit()
+    finally:
+        db.close()
+
+    seen, cursor = [], None
+    for _ in range(10):
+        params = {"sort": "updated_at", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/tasks/", params=params, headers=auth_headers)
+        assert resp.status_code == 200
+        seen += [t["id"] for t in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert sorted(seen) == sorted(ids) and len(seen) == len(ids)
+    assert seen[-2:] == [ids[1], ids[0]]
+
+
+def test_list_tasks_filters_and_fields(client, auth_headers):
+    first = client.post("/tasks/", json={"title": "A"}, headers=auth_headers).json()["id"]
+    client.post("/tasks/", json={"title": "B"}, headers=auth_headers)
+    client.patch(f"/tasks/{first}/status", json={"status": "IN_PROGRESS"}, headers=auth_headers)
+
+    resp = client.get("/tasks/", params={"status": "in_progress", "fields": "id,title"}, headers=auth_headers)
+    assert resp.json() == [{"id": first, "title": "A"}]
+
+    resp = client.get("/tasks/", params={"fields": "title,password"}, headers=auth_headers)
+    assert resp.status_code == 400
+
+    resp = client.get("/tasks/", params={"cursor": "garbage"}, headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_list_tasks_openapi_documents_sparse_items_and_cursor(client):
+    response = client.get("/openapi.json").json()["paths"]["/tasks/"]["get"]["responses"]["200"]
+    assert "X-Next-Cursor" in response["headers"]
+    items = response["content"]["application/json"]["schema"]["items"]
+    assert "title" in items["properties"] and items["required"] == []
+
+
+def test_bulk_create_reports_per_item_results(client, auth_headers):
+    resp = client.post(
+        "/tasks/bulk",
+        json={"items": [{"title": "One"}, {"title": "Ghost", "assigned_to": 999}, {"title": "Two"}]},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["succeeded"], data["failed"]) == (2, 1)
+    assert [r["index"] for r in data["results"]] == [0, 1, 2]
+    assert data["results"][0]["task"]["title"] == "One"
+    assert data["results"][0]["task"]["status"] == "TODO"
+    assert data["results"][1]["status_code"] == 404
+
+    listed = client.get("/tasks/", headers=auth_headers).json()
+    assert [t["title"] for t in listed] == ["One", "Two"]
+
+
+def test_bulk_status_enforces_transitions(client, auth_headers):
+    created = client.post(
+        "/tasks/bulk", json={"items": [{"title": "A"}, {"title": "B"}, {"title": "C"}]}, headers=auth_headers,
+    ).json()["results"]
+    a, b, c = (r["task"]["id"] for r in created)
+
+    resp = client.patch(
+        "/tasks/bulk/status",
+        json={"items": [
+            {"id": a, "status": "IN_PROGRESS"},
+            {"id": b, "status": "DONE"},          # TODO -> DONE is not allowed
+            {"id": c, "status": "in_progress"},
+            {"id": 12345, "status": "DONE"},
+        ]},
+        headers=auth_headers,
+    )
+    data = resp.json()
+    assert (data["succeeded"], data["failed"]) == (2, 2)
+    by_index = {r["index"]: r for r in data["results"]}
+    assert by_index[0]["task"]["status"] == "IN_PROGRESS"
+    assert by_index[1]["status_code"] == 400
+    assert by_index[2]["task"]["status"] == "IN_PROGRESS"
+    assert by_index[3]["status_code"] == 404
@@ -0,0 +1,156 @@
+"""Tests for time entries, their rollups and the derived tasks.total_minutes."""
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+from tests.conftest import TestingSessionLocal
+from tests.query_plans import capture_selects
+from app.models.task import Task
+from app.models.time_entry import TimeEntry, UserDailyMinutes
+from app.core.time_tracking import today, week_start
+
+
+def _login(client, email):
+    user_id = client.post("/users/", json={"email": email, "password": "pw"}).json()["id"]
+    token = client.post("/auth/login", data={"username": email, "password": "pw"}).json()["access_token"]
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+
+def _consistent():
+    """tasks.total_minutes and the rollup both equal the sum of the entries."""
+    db = TestingSessionLocal()
+    try:
+        per_task = dict(db.execute(select(TimeEntry.task_id, func.sum(TimeEntry.minutes)).group_by(TimeEntry.task_id)).all())
+        totals = {task_id: minutes for task_id, minutes in db.execute(select(Task.id, Task.total_minutes)) if minutes}
+        entries = db.scalar(select(func.sum(TimeEntry.minutes))) or 0
+        rolled_up = db.scalar(select(func.sum(UserDailyMinutes.minutes))) or 0
+        return per_task == totals and entries == rolled_up
+    finally:
+        db.close()
+
+
+def test_log_time_appends_entries_and_updates_total(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "A", "total_minutes": 15}, headers=auth_headers).json()["id"]
+    yesterday = today() - timedelta(days=1)
+
+    resp = client.post(f"/tasks/{task_id}/time", json={"entries": [
+        {"minutes": 30, "note": "pairing"},
+        {"minutes": 45, "work_date": yesterday.isoformat()},
+    ]}, headers=auth_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["task"]["total_minutes"] == 90
+    assert [(e["minutes"], e["kind"]) for e in data["entries"]] == [(30, "log"), (45, "log")]
+
+    history = client.get(f"/tasks/{task_id}/time", headers=auth_headers).json()
+    assert [(e["minutes"], e["kind"]) for e in history] == [(15, "adjustment"), (30, "log"), (45, "log")]
+    assert _consistent()
+
+
+def test_owner_and_assignee_both_log_without_lost_updates(client, auth_headers):
+    other_id, other = _login(client, "other@example.com")
+    task_id = client.post("/tasks/", json={"title": "Shared", "assigned_to": other_id}, headers=auth_headers).json()["id"]
+
+    client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 20}]}, headers=auth_headers)
+    client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 25}]}, headers=other)
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).json()["total_minutes"] == 45
+
+    # A third user may not log against it
+    _, stranger = _login(client, "stranger@example.com")
+    assert client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 5}]}, headers=stranger).status_code == 403
+    assert client.post("/tasks/999/time", json={"entries": [{"minutes": 5}]}, headers=auth_headers).status_code == 404
+    assert _consistent()
+
+
+def test_patch_total_minutes_becomes_adjustment(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "A"}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 60}]}, headers=auth_headers)
+
+    resp = client.patch(f"/tasks/{task_id}", json={"total_minutes": 40, "title": "B"}, headers=auth_headers)
+    assert resp.json()["total_minutes"] == 40 and resp.json()["title"] == "B"
+    history = client.get(f"/tasks/{task_id}/time", headers=auth_headers).json()
+    assert history[-1]["minutes"] == -20 and history[-1]["kind"] == "adjustment"
+    assert _consistent()
+
+    # A PATCH of total_minutes alone is still an edit: updated_at (and so the plan version) moves
+    db = TestingSessionLocal()
+    try:
+        db.execute(update(Task).where(Task.id == task_id).values(updated_at=datetime(2020, 1, 1)))
+        db.commit()
+    finally:
+        db.close()
+    resp = client.patch(f"/tasks/{task_id}", json={"total_minutes": 50}, headers=auth_headers)
+    assert not resp.json()["updated_at"].startswith("2020-")
+
+
+def test_adjustments_credited_to_assignee(client, auth_headers):
+    other_id, other = _login(client, "other@example.com")
+    task_id = client.post("/tasks/", json={"title": "A", "total_minutes": 90, "assigned_to": other_id},
+                          headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 30}]}, headers=other)
+    assert client.patch(f"/tasks/{task_id}", json={"total_minutes": 10}, headers=auth_headers).json()["total_minutes"] == 10
+
+    history = client.get(f"/tasks/{task_id}/time", headers=auth_headers).json()
+    assert {e["user_id"] for e in history} == {other_id}
+    summary = client.get("/tasks/time/summary", headers=auth_headers).json()
+    assert summary["users"] == []      # the owner never logged anything
+    assert client.get("/tasks/time/summary", headers=other).json()["users"][0]["total_minutes"] == 10
+
+    assert client.patch(f"/tasks/{task_id}", json={"total_minutes": -5}, headers=auth_headers).status_code == 422
+    assert client.post("/tasks/", json={"title": "B", "total_minutes": -5}, headers=auth_headers).status_code == 422
+    assert _consistent()
+
+
+def test_delete_task_removes_its_minutes(client, auth_headers):
+    other_id, other = _login(client, "other@example.com")
+    kept = client.post("/tasks/", json={"title": "Kept", "total_minutes": 20}, headers=auth_headers).json()["id"]
+    task_id = client.post("/tasks/", json={"title": "Gone", "assigned_to": other_id}, headers=auth_headers).json()["id"]
+    client.post(f"/tasks/{task_id}/time", json={"entries": [{"minutes": 30}]}, headers=auth_headers)
+    client.post(f"/tasks/{task_id}/time", json={"entries": [
+        {"minutes": 25}, {"minutes": 5, "work_date": (today() - timedelta(days=1)).isoformat()},
+    ]}, headers=other)
+
+    assert client.delete(f"/tasks/{task_id}", headers=auth_headers).status_code == 200
+    db = TestingSessionLocal()
+    try:
+        assert db.scalar(select(func.count()).select_from(TimeEntry).where(TimeEntry.task_id == task_id)) == 0
+        assert db.scalar(select(func.count()).select_from(UserDailyMinutes).where(UserDailyMinutes.user_id == other_id)) == 0
+    finally:
+        db.close()
+    summary = client.get("/tasks/time/summary", headers=auth_headers).json()
+    assert summary["users"][0]["total_minutes"] == 20
+    assert client.get(f"/tasks/{kept}/time", headers=auth_headers).json()[0]["minutes"] == 20
+    assert _consistent()
+
+
+def test_bulk_create_logs_initial_minutes(client, auth_headers):
+    resp = client.post("/tasks/bulk", json={"items": [
+        {"title": "A", "total_minutes": 10}, {"title": "B"}, {"title": "C", "total_minutes": 5},
+    ]}, headers=auth_headers)
+    assert resp.json()["succeeded"] == 3
+    assert _consistent()
+
+
+def test_summary_reads_rollups_only(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "A"}, headers=auth_headers).json()["id"]
+    day = week_start(today())
+    client.post(f"/tasks/{task_id}/time", json={"entries": [
+        {"minutes": 30, "work_date": day.isoformat()},
+        {"minutes": 15, "work_date": day.isoformat()},
+        {"minutes": 50, "work_date": (day - timedelta(days=1)).isoformat()},   # last week
+    ]}, headers=auth_headers)
+
+    with capture_selects() as captured:
+        resp = client.get("/tasks/time/summary", headers=auth_headers)
+    assert resp.status_code == 200
+    summary = resp.json()
+    assert summary["start"] == day.isoformat()
+    assert summary["users"] == [{"user_id": 1, "total_minutes": 45, "days": {day.isoformat(): 45}}]
+    assert not any("time_entries" in statement for statement, _ in captured)
+
+    wider = client.get("/tasks/time/summary", params={"start": (day - timedelta(days=7)).isoformat()},
+                       headers=auth_headers).json()
+    assert wider["users"][0]["total_minutes"] == 95
+    assert client.get("/tasks/time/summary", params={"user_id": 2}, headers=auth_headers).status_code == 403
+    assert client.get("/tasks/time/summary", params={"start": date.max.isoformat()},
+                      headers=auth_headers).status_code == 400
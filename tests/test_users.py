@@ -21,3 +21,41 @@ def test_register_duplicate_email(client):
     resp = client.post("/users/", json=payload)
     assert resp.status_code == 400
     assert "already registered" in resp.json()["detail"].lower()
+
+
+def test_login_rehashes_when_cost_changes(client, monkeypatch):
+    """A hash made at another bcrypt cost is upgraded on the next successful login."""
+    import app.core.passwords as passwords
+    from tests.conftest import TestingSessionLocal
+    from app.models.user import User
+
+    client.post("/users/", json={"email": "old@example.com", "password": "pw123"})
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+    monkeypatch.setattr(passwords, "pwd_context", passwords.pwd_context.copy(bcrypt__rounds=5))
+
+    resp = client.post("/auth/login", data={"username": "old@example.com", "password": "pw123"})
+    assert resp.status_code == 200
+
+    db = TestingSessionLocal()
+    try:
+        hashed = db.query(User.hashed_password).filter(User.email == "old@example.com").scalar()
+    finally:
+        db.close()
+    assert hashed.startswith("$2b$05$")
+
+
+def test_needs_rehash_follows_context():
+    from app.core.passwords import hash_password, needs_rehash
+
+    assert not needs_rehash(hash_password("pw"))
+    assert needs_rehash(hash_password("pw", rounds=5))
+    assert needs_rehash("not-a-hash")
+
+
+def test_password_pool_sheds_load_when_full(client, monkeypatch):
+    from app.core.passwords import password_pool
+
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+    resp = client.post("/users/", json={"email": "busy@example.com", "password": "pw"})
+    assert resp.status_code == 503
+    assert client.get("/metrics").json()["password_pool"]["rejected_total"] >= 1
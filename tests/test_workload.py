@@ -0,0 +1,96 @@
+"""Tests for maintained active-task counters and their reconciliation."""
+from sqlalchemy import text
+
+from tests.conftest import TestingSessionLocal, engine
+from app.models.user import User
+from app.core.workload import active_task_counts, reconcile_active_task_counts
+from app.commands.migrate import migrate
+
+
+def _counters():
+    db = TestingSessionLocal()
+    try:
+        return dict(db.query(User.email, User.active_task_count).all())
+    finally:
+        db.close()
+
+
+def test_counters_follow_task_writes(client, auth_headers):
+    """Create, status changes, reassignment and delete keep the counter exact."""
+    other_id = client.post("/users/", json={"email": "other@example.com", "password": "pw"}).json()["id"]
+
+    t1 = client.post("/tasks/", json={"title": "A"}, headers=auth_headers).json()["id"]
+    t2 = client.post("/tasks/", json={"title": "B"}, headers=auth_headers).json()["id"]
+    assert _counters()["testuser@example.com"] == 2
+
+    client.patch(f"/tasks/{t1}/status", json={"status": "IN_PROGRESS"}, headers=auth_headers)
+    client.patch(f"/tasks/{t1}/status", json={"status": "DONE"}, headers=auth_headers)
+    assert _counters()["testuser@example.com"] == 1
+
+    resp = client.patch(f"/tasks/{t2}", json={"assigned_to": other_id}, headers=auth_headers)
+    assert resp.json()["assigned_to"] == other_id
+    assert _counters() == {"testuser@example.com": 0, "other@example.com": 1}
+
+    client.delete(f"/tasks/{t2}", headers=auth_headers)
+    assert _counters()["other@example.com"] == 0
+
+
+def test_bulk_writes_adjust_counters_in_one_statement(client, auth_headers):
+    from sqlalchemy import event
+
+    ids = [
+        client.post("/users/", json={"email": f"u{i}@example.com", "password": "pw"}).json()["id"]
+        for i in range(3)
+    ]
+    counter_updates = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE USERS"):
+            counter_updates.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        created = client.post("/tasks/bulk", json={"items": [
+            {"title": f"T{i}", "assigned_to": user_id} for i, user_id in enumerate(ids * 2)
+        ]}, headers=auth_headers).json()
+        assert len(counter_updates) == 1
+        client.patch("/tasks/bulk/status", json={"items": [
+            {"id": r["task"]["id"], "status": "IN_PROGRESS"} for r in created["results"]
+        ]}, headers=auth_headers)
+        client.patch("/tasks/bulk/status", json={"items": [
+            {"id": r["task"]["id"], "status": "DONE"} for r in created["results"][:4]
+        ]}, headers=auth_headers)
+        assert len(counter_updates) == 2     # TODO -> IN_PROGRESS leaves counts alone
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert [_counters()[f"u{i}@example.com"] for i in range(3)] == [0, 1, 1]
+
+
+def test_reconcile_fixes_drift(client, auth_headers):
+    client.post("/tasks/", json={"title": "A"}, headers=auth_headers)
+
+    db = TestingSessionLocal()
+    try:
+        db.query(User).update({User.active_task_count: 7})
+        db.commit()
+
+        drift = reconcile_active_task_counts(db)
+        assert drift == [{"user_id": 1, "stored": 7, "actual": 1}]
+        assert active_task_counts(db) == {1: 1}
+    finally:
+        db.close()
+    assert _counters()["testuser@example.com"] == 1
+
+
+def test_migration_backfills_counters(client, auth_headers):
+    """0003 adds the column on old databases and recomputes it from the tasks."""
+    client.post("/tasks/", json={"title": "A"}, headers=auth_headers)
+    client.post("/tasks/", json={"title": "B"}, headers=auth_headers)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE users SET active_task_count = 0"))
+    try:
+        assert "0003_users_active_task_count" in migrate(engine)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE schema_migrations"))
+    assert _counters()["testuser@example.com"] == 2